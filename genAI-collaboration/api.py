@@ -6,10 +6,14 @@ This module provides API endpoints to interact with the Artist Collaboration Mat
 
 from flask import Flask, request, jsonify
 from artist_collaboration_matcher import ArtistCollaborationMatcher
+from metrics import instrument_app, timed, SERIALIZATION
 
 app = Flask(__name__)
 matcher = ArtistCollaborationMatcher()
 
+# Request timings and GET /metrics (Prometheus text format)
+instrument_app(app, "api")
+
 @app.route('/api/analyze-profile', methods=['POST'])
 def analyze_profile():
     """Analyze an artist profile."""
@@ -37,10 +41,12 @@ def find_collaborators():
     
     matches = matcher.find_collaborators(artist_profile, project_description, available_artists)
     
-    return jsonify({
-        "matches": matches,
-        "count": len(matches)
-    })
+    with timed(SERIALIZATION):
+        response = jsonify({
+            "matches": matches,
+            "count": len(matches)
+        })
+    return response
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
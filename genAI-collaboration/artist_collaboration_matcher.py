@@ -7,9 +7,11 @@ preferences, and project descriptions using IBM Watson AI services.
 
 import os
 import json
-import requests
 from typing import Dict, List, Any, Tuple
 from config import WATSON_API_KEY, WATSON_API_URL, WATSON_PLATFORM_URL, WATSON_PROJECT_ID
+from http_transport import HTTP_TRANSPORT
+from iam_token_manager import get_token_manager
+from metrics import timed, PREFERENCE_ANALYSIS, FEATURE_EXTRACTION, CANDIDATE_SCORING
 
 class ArtistCollaborationMatcher:
     """
@@ -22,7 +24,22 @@ class ArtistCollaborationMatcher:
         self.api_url = WATSON_API_URL
         self.platform_url = WATSON_PLATFORM_URL
         self.project_id = WATSON_PROJECT_ID
-        self.token = self._get_auth_token()
+        
+        # Pooled keep-alive connections shared by all Watson clients
+        self.http = HTTP_TRANSPORT
+        
+        # Shared, background-refreshed token (fetched now so bad credentials fail early)
+        self.token_manager = get_token_manager(
+            self.api_key,
+            token_url=f"{self.platform_url}/v1/authorize",
+            request_format="json"
+        )
+        self._get_auth_token()
+    
+    @property
+    def token(self) -> str:
+        """Current authentication token, refreshed in the background before it expires."""
+        return self._get_auth_token()
         
     def _get_auth_token(self) -> str:
         """
@@ -31,21 +48,11 @@ class ArtistCollaborationMatcher:
         Returns:
             str: Authentication token
         """
-        auth_url = f"{self.platform_url}/v1/authorize"
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-        auth_data = {
-            "apikey": self.api_key,
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey"
-        }
-        
-        response = requests.post(auth_url, headers=headers, json=auth_data)
-        if response.status_code == 200:
-            return response.json().get("access_token")
+        token = self.token_manager.get_token()
+        if token:
+            return token
         else:
-            raise Exception(f"Authentication failed: {response.text}")
+            raise Exception(f"Authentication failed: {self.token_manager.last_error}")
     
     def analyze_artist_profile(self, artist_profile: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -123,7 +130,7 @@ class ArtistCollaborationMatcher:
             }
         }
         
-        response = requests.post(nlp_url, headers=headers, json=payload)
+        response = self.http.post(nlp_url, headers=headers, json=payload)
         if response.status_code == 200:
             return response.json()
         else:
@@ -145,38 +152,41 @@ class ArtistCollaborationMatcher:
         Returns:
             List: Ranked list of potential collaborators with compatibility scores
         """
-        # Analyze the project description
-        project_analysis = self._analyze_project(project_description)
-        
-        # Analyze the artist's profile
-        analyzed_artist = self.analyze_artist_profile(artist_profile)
-        
-        # Analyze all available artists
-        analyzed_available_artists = [
-            self.analyze_artist_profile(artist) for artist in available_artists
-        ]
-        
-        # Calculate compatibility scores
-        collaborator_matches = []
-        for candidate in analyzed_available_artists:
-            # Skip if the candidate is the same as the requesting artist
-            if candidate.get("id") == artist_profile.get("id"):
-                continue
+        with timed(PREFERENCE_ANALYSIS):
+            # Analyze the project description
+            project_analysis = self._analyze_project(project_description)
+        
+        with timed(FEATURE_EXTRACTION):
+            # Analyze the artist's profile
+            analyzed_artist = self.analyze_artist_profile(artist_profile)
+            
+            # Analyze all available artists
+            analyzed_available_artists = [
+                self.analyze_artist_profile(artist) for artist in available_artists
+            ]
+        
+        with timed(CANDIDATE_SCORING):
+            # Calculate compatibility scores
+            collaborator_matches = []
+            for candidate in analyzed_available_artists:
+                # Skip if the candidate is the same as the requesting artist
+                if candidate.get("id") == artist_profile.get("id"):
+                    continue
+                
+                compatibility_score, insights = self._calculate_compatibility(
+                    analyzed_artist, 
+                    candidate, 
+                    project_analysis
+                )
                 
-            compatibility_score, insights = self._calculate_compatibility(
-                analyzed_artist, 
-                candidate, 
-                project_analysis
-            )
+                collaborator_matches.append({
+                    "artist": candidate,
+                    "compatibility_score": compatibility_score,
+                    "insights": insights
+                })
             
-            collaborator_matches.append({
-                "artist": candidate,
-                "compatibility_score": compatibility_score,
-                "insights": insights
-            })
-        
-        # Sort by compatibility score (highest first)
-        collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
+            # Sort by compatibility score (highest first)
+            collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
         
         return collaborator_matches
     
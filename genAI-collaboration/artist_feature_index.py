@@ -0,0 +1,272 @@
+"""
+Artist Feature Index
+
+This module provides an in-process index of precomputed artist features (extracted tools,
+art types, token sets, experience and portfolio indicators) so that match requests only
+read from it instead of re-analyzing the whole catalog every time.
+
+The features of every artist are computed when the index is built and stay in memory, since
+every scoring engine scans the whole catalog per request. With a SQLite repository only the
+profiles and galleries stay on disk: the catalog's features (about the size of its token
+sets) must still fit in memory, and startup time grows with the catalog.
+"""
+
+import threading
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+from inverted_token_index import InvertedTokenIndex
+from artist_repository import TOOL, ART_TYPE
+
+# Artists whose primary tool and art type facets are written to the repository at once
+FACET_WRITE_BATCH_SIZE = 500
+
+
+class ArtistFeatureIndex:
+    """
+    A persistent feature index keyed by artistId.
+    
+    Features are computed once when the index is built. When an artist's profile or
+    gallery changes, call invalidate() and the entry is recomputed on next access; sync()
+    does the same for artists another process changed in a shared (SQLite) repository.
+    Artists added to the repository later are indexed by either call, at the end of the
+    catalog order.
+    """
+    
+    def __init__(self,
+                 artists: List[Dict[str, Any]],
+                 compute_features: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 repository=None):
+        """
+        Build the feature index.
+        
+        Args:
+            artists: List of artist profiles to index
+            compute_features: Function that extracts the features of a single artist
+            repository: Optional ArtistRepository whose tool and art type indexes are kept
+                        in step with the extracted primary tools and art types; profiles are
+                        then read from it instead of being kept by the index
+        """
+        self.compute_features = compute_features
+        self.repository = repository
+        self._lock = threading.RLock()
+        self._artists = {}
+        self._features = {}
+        self._positions = {}
+        self._stale_ids = set()
+        self._listeners = []
+        # Changes made before this point are covered by the features computed below
+        self._change_version = repository.change_version() if repository is not None else 0
+        
+        # Token -> artist IDs, kept in step with the "tokens" feature of every artist
+        self.token_index = InvertedTokenIndex()
+        
+        pending_facets = []
+        for artist in artists:
+            artist_id = artist["artistId"]
+            if repository is None:
+                self._artists[artist_id] = artist
+            self._positions[artist_id] = len(self._positions)
+            
+            features = compute_features(artist)
+            self._store_features(artist_id, features, index_facets=False)
+            pending_facets.append((artist_id, features))
+            if len(pending_facets) >= FACET_WRITE_BATCH_SIZE:
+                self._index_facets(pending_facets)
+                pending_facets = []
+        self._index_facets(pending_facets)
+    
+    def __len__(self) -> int:
+        return len(self._positions)
+    
+    def __contains__(self, artist_id: str) -> bool:
+        return artist_id in self._positions
+    
+    def artist_ids(self) -> List[str]:
+        """Get the IDs of the indexed artists, in catalog order."""
+        with self._lock:
+            return list(self._positions)
+    
+    def position(self, artist_id: str) -> Optional[int]:
+        """Get the catalog position of an indexed artist (None if it is not indexed)."""
+        return self._positions.get(artist_id)
+    
+    def get_artist(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the raw artist profile for an artist ID.
+        
+        Args:
+            artist_id: ID of the artist
+        
+        Returns:
+            Dict: Artist profile, or None if the artist is not indexed
+        """
+        if self.repository is not None:
+            return self.repository.get(artist_id) if artist_id in self._positions else None
+        return self._artists.get(artist_id)
+    
+    def get(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the precomputed features for an artist, recomputing them if invalidated.
+        
+        Args:
+            artist_id: ID of the artist
+        
+        Returns:
+            Dict: Artist features, or None if the artist is not indexed
+        """
+        features = self._features.get(artist_id)
+        if features is not None:
+            return features
+        
+        with self._lock:
+            artist = self.get_artist(artist_id)
+            if artist is None:
+                return None
+            
+            features = self._features.get(artist_id)
+            if features is None:
+                features = self.compute_features(artist)
+                self._store_features(artist_id, features)
+        
+        return features
+    
+    def _store_features(self, artist_id: str, features: Dict[str, Any], index_facets: bool = True) -> None:
+        """Cache the features of an artist and index its tokens (and, optionally, its facets)."""
+        self._features[artist_id] = features
+        # The token index shares the features' token set instead of copying it
+        self.token_index.replace(artist_id, features["tokens"])
+        self._stale_ids.discard(artist_id)
+        
+        if index_facets:
+            self._index_facets([(artist_id, features)])
+    
+    def _index_facets(self, artist_features: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Write the primary tools and art types of artists to the repository's indexes."""
+        if self.repository is None or not artist_features:
+            return
+        self.repository.index_facets_many(
+            TOOL, [(artist_id, features["primary_tools"]) for artist_id, features in artist_features]
+        )
+        self.repository.index_facets_many(
+            ART_TYPE, [(artist_id, features["primary_art_types"]) for artist_id, features in artist_features]
+        )
+    
+    def items(self, artist_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Get the features of indexed artists, in catalog order.
+        
+        Args:
+            artist_ids: Optional subset of artist IDs (every artist when None);
+                        IDs that are not indexed are ignored
+        
+        Returns:
+            List: (artist_id, features) pairs
+        """
+        if artist_ids is None:
+            selected_ids = self.artist_ids()
+        else:
+            selected_ids = sorted(
+                (artist_id for artist_id in artist_ids if artist_id in self._positions),
+                key=self._positions.get
+            )
+        
+        return [(artist_id, self.get(artist_id)) for artist_id in selected_ids]
+    
+    def keyword_overlap_counts(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """
+        Count how many of the given keywords appear in each artist's tokens.
+        
+        The counts come from merging the posting lists of the keywords, so only artists
+        sharing at least one keyword are touched (and returned).
+        
+        Args:
+            keywords: Preference keywords
+        
+        Returns:
+            Dict: Number of matching keywords per artist ID, for artists with any overlap
+        """
+        # Re-index artists invalidated since their features were last computed
+        for artist_id in list(self._stale_ids):
+            self.get(artist_id)
+        
+        return self.token_index.overlap_counts(keywords)
+    
+    def analyzed_artist(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an artist profile enhanced with its extracted tools and art types.
+        
+        Args:
+            artist_id: ID of the artist
+        
+        Returns:
+            Dict: Artist profile with "extracted_tools" and "extracted_art_types",
+                  or None if the artist is not indexed
+        """
+        artist = self.get_artist(artist_id)
+        features = self.get(artist_id)
+        if artist is None or features is None:
+            return None
+        
+        enhanced_artist = artist.copy()
+        enhanced_artist["extracted_tools"] = {
+            "tools": dict(features["tools"]),
+            "primary_tools": list(features["primary_tools"])
+        }
+        enhanced_artist["extracted_art_types"] = {
+            "art_types": dict(features["art_types"]),
+            "primary_art_types": list(features["primary_art_types"])
+        }
+        
+        return enhanced_artist
+    
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """
+        Register a callback notified with the artist ID whenever an artist is invalidated.
+        
+        Args:
+            callback: Function called with the invalidated artist ID
+        """
+        self._listeners.append(callback)
+    
+    def sync(self) -> List[str]:
+        """
+        Invalidate the artists changed in the repository by other processes (e.g. uploads
+        handled by another server worker) since the last sync, and index the artists added.
+        
+        Returns:
+            List: IDs of the invalidated or added artists
+        """
+        if self.repository is None:
+            return []
+        
+        with self._lock:
+            self._change_version, changed_ids = self.repository.changes_since(self._change_version)
+        
+        for artist_id in changed_ids:
+            self.invalidate(artist_id)
+        return [artist_id for artist_id in changed_ids if artist_id in self._positions]
+    
+    def invalidate(self, artist_id: str) -> None:
+        """
+        Drop the cached features of an artist so they are recomputed on next access.
+        
+        An artist that is not indexed yet but exists in the repository is added at the end of
+        the catalog order, with its features, tokens and facets computed right away.
+        
+        Args:
+            artist_id: ID of the artist whose profile or gallery changed, or who was added
+        """
+        with self._lock:
+            self._features.pop(artist_id, None)
+            added = artist_id not in self._positions
+            if added:
+                if self.repository is None or artist_id not in self.repository:
+                    return
+                self._positions[artist_id] = len(self._positions)
+            self._stale_ids.add(artist_id)
+        
+        if added:
+            self.get(artist_id)
+        
+        for callback in self._listeners:
+            callback(artist_id)
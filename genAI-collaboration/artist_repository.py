@@ -0,0 +1,276 @@
+"""
+Artist Repository
+
+This module provides constant-time access to the artist catalog: a hash index by artistId and
+secondary indexes by location, primary tool and primary art type. The location index is
+built from the profiles; the tool and art type indexes are filled in by the feature index of
+the rule-based matcher, which already extracts those facets.
+
+Set the ARTIST_DB_PATH environment variable to keep the catalog in a SQLite database instead
+(see sqlite_artist_repository.py); it is seeded from DIGITAL_ARTISTS when empty.
+"""
+
+import os
+import threading
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from digital_artist_data import DIGITAL_ARTISTS
+
+# Secondary index names
+LOCATION = "location"
+TOOL = "tool"
+ART_TYPE = "art_type"
+
+# SQLite catalog shared by every process; None keeps the catalog in memory
+ARTIST_DB_PATH = os.environ.get("ARTIST_DB_PATH")
+
+
+def _normalize(value: str) -> str:
+    """Normalize an index value (case and surrounding whitespace)."""
+    return value.strip().lower()
+
+
+def location_terms(location: str) -> List[str]:
+    """
+    Get the terms a location is indexed under: the full location and each of its
+    comma-separated parts, so "Milan, Italy" is found by "milan", "italy" or "milan, italy".
+    
+    Args:
+        location: Location of an artist
+    
+    Returns:
+        List: Normalized location terms
+    """
+    terms = [_normalize(location)] + [_normalize(part) for part in location.split(",")]
+    return list(dict.fromkeys(term for term in terms if term))
+
+
+def gallery_item_id(gallery_size: int) -> str:
+    """Get the id of the next artwork of a gallery (IMG001, IMG002, ...)."""
+    return f"IMG{gallery_size + 1:03d}"
+
+
+class ArtistRepository:
+    """
+    Thread-safe artist catalog with a primary index by artistId and secondary indexes.
+    """
+    
+    def __init__(self, artists: List[Dict[str, Any]]):
+        """
+        Index the catalog.
+        
+        Args:
+            artists: Artist profiles (the list itself is kept as the catalog, in its order)
+        """
+        self._lock = threading.RLock()
+        self._artists = artists
+        self._by_id = {}
+        self._positions = {}
+        self._indexes = {LOCATION: {}, TOOL: {}, ART_TYPE: {}}
+        self._facets = {}
+        
+        for artist in artists:
+            self._add(artist)
+    
+    def _add(self, artist: Dict[str, Any]) -> None:
+        """Index an artist by id and location."""
+        artist_id = artist["artistId"]
+        self._by_id[artist_id] = artist
+        self._positions.setdefault(artist_id, len(self._positions))
+        self.index_facets(artist_id, LOCATION, location_terms(artist.get("basicInfo", {}).get("location", "")))
+    
+    def __len__(self) -> int:
+        return len(self._by_id)
+    
+    def __contains__(self, artist_id: str) -> bool:
+        return artist_id in self._by_id
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._artists)
+    
+    def get(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an artist by ID.
+        
+        Args:
+            artist_id: ID of the artist
+        
+        Returns:
+            Dict: Artist profile, or None if there is no such artist
+        """
+        return self._by_id.get(artist_id)
+    
+    def add(self, artist: Dict[str, Any]) -> None:
+        """
+        Add an artist to the catalog, or re-index it if its artistId is known.
+        
+        Args:
+            artist: Artist profile
+        """
+        with self._lock:
+            artist_id = artist["artistId"]
+            if artist_id in self._by_id:
+                # Replace the profile in place, so iteration and search() see the new one too
+                self._artists[self._positions[artist_id]] = artist
+            else:
+                self._artists.append(artist)
+            self._add(artist)
+    
+    def add_gallery_item(self, artist_id: str, artwork: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Append an artwork to an artist's gallery.
+        
+        Args:
+            artist_id: ID of the artist
+            artwork: Artwork entry; without an "id", the next gallery id (IMG001, ...) is used
+        
+        Returns:
+            Dict: The stored artwork, or None if there is no such artist
+        """
+        with self._lock:
+            artist = self._by_id.get(artist_id)
+            if artist is None:
+                return None
+            
+            gallery = artist.setdefault("completeGallery", [])
+            artwork = dict(artwork)
+            artwork.setdefault("id", gallery_item_id(len(gallery)))
+            gallery.append(artwork)
+        return artwork
+    
+    def change_version(self) -> int:
+        """Get the version of the latest change to the catalog (always 0, see changes_since())."""
+        return 0
+    
+    def changes_since(self, version: int) -> Tuple[int, List[str]]:
+        """
+        Get the artists changed by other processes after a catalog version.
+        
+        The in-memory catalog belongs to a single process, so there are never any; changes
+        made in this process are reported with ArtistFeatureIndex.invalidate().
+        
+        Args:
+            version: Catalog version of the last check
+        
+        Returns:
+            Tuple: The same version and an empty list
+        """
+        return version, []
+    
+    def index_facets(self, artist_id: str, index: str, values: Iterable[str]) -> None:
+        """
+        Replace the values an artist is indexed under in a secondary index.
+        
+        Args:
+            artist_id: ID of the artist
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            values: The artist's values for that index
+        """
+        values = {_normalize(value) for value in values if value}
+        with self._lock:
+            postings = self._indexes[index]
+            artist_facets = self._facets.setdefault(artist_id, {})
+            
+            for value in artist_facets.get(index, set()) - values:
+                ids = postings.get(value)
+                if ids is not None:
+                    ids.discard(artist_id)
+                    if not ids:
+                        del postings[value]
+            for value in values:
+                postings.setdefault(value, set()).add(artist_id)
+            
+            artist_facets[index] = values
+    
+    def index_facets_many(self, index: str, facets: Iterable[Tuple[str, Iterable[str]]]) -> None:
+        """
+        Replace the values of many artists in a secondary index.
+        
+        Args:
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            facets: (artist ID, the artist's values for that index) pairs
+        """
+        for artist_id, values in facets:
+            self.index_facets(artist_id, index, values)
+    
+    def find(self, index: str, value: str) -> List[Dict[str, Any]]:
+        """
+        Get the artists indexed under a value, in catalog order.
+        
+        Args:
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            value: Value to look up (case-insensitive)
+        
+        Returns:
+            List: Matching artist profiles
+        """
+        return [self._by_id[artist_id] for artist_id in self.find_ids(index, value)]
+    
+    def find_ids(self, index: str, value: str) -> List[str]:
+        """
+        Get the IDs of the artists indexed under a value, in catalog order.
+        
+        Args:
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            value: Value to look up (case-insensitive)
+        
+        Returns:
+            List: Matching artist IDs
+        """
+        with self._lock:
+            ids = list(self._indexes[index].get(_normalize(value), ()))
+        return sorted(ids, key=self._positions.get)
+    
+    def search(self, criteria: Dict[str, Optional[str]]) -> List[Dict[str, Any]]:
+        """
+        Get the artists matching every given criterion, in catalog order.
+        
+        Args:
+            criteria: Value per secondary index (empty values are ignored)
+        
+        Returns:
+            List: Matching artist profiles (the whole catalog when no criterion is given)
+        """
+        selected_ids = None
+        for index, value in criteria.items():
+            if not value:
+                continue
+            ids = set(self.find_ids(index, value))
+            selected_ids = ids if selected_ids is None else selected_ids & ids
+        
+        if selected_ids is None:
+            return list(self._artists)
+        return [self._by_id[artist_id] for artist_id in sorted(selected_ids, key=self._positions.get)]
+    
+    def by_location(self, location: str) -> List[Dict[str, Any]]:
+        """Get the artists in a location (full location, city or country)."""
+        return self.find(LOCATION, location)
+    
+    def by_tool(self, tool: str) -> List[Dict[str, Any]]:
+        """Get the artists with a tool among their primary tools."""
+        return self.find(TOOL, tool)
+    
+    def by_art_type(self, art_type: str) -> List[Dict[str, Any]]:
+        """Get the artists with an art type among their primary art types."""
+        return self.find(ART_TYPE, art_type)
+
+
+def create_artist_repository(db_path: Optional[str] = ARTIST_DB_PATH):
+    """
+    Create the artist catalog.
+    
+    Args:
+        db_path: Path of a SQLite catalog database, or None for the in-memory catalog
+    
+    Returns:
+        ArtistRepository or SQLiteArtistRepository: The catalog, holding DIGITAL_ARTISTS
+                                                    when it is new
+    """
+    if db_path:
+        from sqlite_artist_repository import SQLiteArtistRepository
+        return SQLiteArtistRepository(db_path, seed_artists=DIGITAL_ARTISTS)
+    return ArtistRepository(DIGITAL_ARTISTS)
+
+
+# The catalog shared by every matcher and API in this process
+ARTIST_REPOSITORY = create_artist_repository()
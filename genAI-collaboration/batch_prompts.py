@@ -0,0 +1,222 @@
+"""
+Batched Compatibility Prompts
+
+This module builds watsonx.ai prompts that score several candidate collaborators at once.
+The requesting artist and the preference text are sent once per batch instead of once per
+candidate, and the model answers with a JSON array of {artistId, score, insights}. Batches
+are split so that the prompt plus the expected answer fit in the model's context window.
+"""
+
+import json
+from typing import Dict, List, Any
+
+# Default batching settings
+COMPATIBILITY_BATCH_SIZE = 8  # candidates per prompt
+OUTPUT_TOKENS_PER_CANDIDATE = 150  # answer budget of one {artistId, score, insights} entry
+CHARS_PER_TOKEN = 4  # rough token estimate for English prompts
+
+# Context window (prompt + generated tokens) of the watsonx.ai models used in this project
+MODEL_CONTEXT_TOKENS = {
+    "ibm/granite-13b-instruct-v2": 8192,
+    "ibm/granite-3-8b-instruct": 4096,
+    "meta-llama/llama-3-3-70b-instruct": 131072
+}
+DEFAULT_CONTEXT_TOKENS = 4096
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text.
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        int: Estimated token count (rounded up)
+    """
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def context_tokens(model_ids: List[str]) -> int:
+    """
+    Get the context window every given model can handle.
+    
+    Args:
+        model_ids: IDs of the models a prompt may be routed to
+    
+    Returns:
+        int: Smallest context window of the models
+    """
+    return min((MODEL_CONTEXT_TOKENS.get(model_id, DEFAULT_CONTEXT_TOKENS) for model_id in model_ids),
+               default=DEFAULT_CONTEXT_TOKENS)
+
+
+def candidate_profile_text(artist: Dict[str, Any]) -> str:
+    """
+    Format one candidate for a batched prompt.
+    
+    Args:
+        artist: Candidate artist profile
+    
+    Returns:
+        str: Candidate block with ID, name, bio and gallery highlights
+    """
+    gallery_highlights = []
+    for artwork in artist.get("completeGallery", [])[:3]:
+        title = artwork.get("title", "")
+        medium = artwork.get("medium", "")
+        description = artwork.get("description", "")
+        gallery_highlights.append(f"  - {title} ({medium}): {description}")
+    
+    return (
+        f"artistId: {artist.get('artistId', '')}\n"
+        f"Name: {artist.get('basicInfo', {}).get('name', '')}\n"
+        f"Bio: {artist.get('basicInfo', {}).get('bio', '')}\n"
+        f"Recent Work:\n" + "\n".join(gallery_highlights)
+    )
+
+
+def build_batch_compatibility_prompt(artist1: Dict[str, Any],
+                                     candidates: List[Dict[str, Any]],
+                                     preference_text: str) -> str:
+    """
+    Build a prompt scoring several candidates against one requesting artist.
+    
+    Args:
+        artist1: Requesting artist profile
+        candidates: Candidate artist profiles
+        preference_text: Collaboration request text
+    
+    Returns:
+        str: Prompt asking for a JSON array with one entry per candidate
+    """
+    candidate_text = "\n\n".join(candidate_profile_text(candidate) for candidate in candidates)
+    
+    return f"""
+        Evaluate the compatibility between a digital artist and each of several potential collaborators.
+        
+        Artist 1 (Requesting Collaboration):
+        Name: {artist1.get("basicInfo", {}).get("name", "")}
+        Bio: {artist1.get("basicInfo", {}).get("bio", "")}
+        
+        Collaboration Request:
+        "{preference_text}"
+        
+        Potential Collaborators:
+
+{candidate_text}
+        
+        For each potential collaborator, analyze the compatibility based on:
+        1. How well their skills match the collaboration request
+        2. Complementary skills with Artist 1
+        3. Potential synergies in their work styles and mediums
+        4. Overall collaboration potential
+        
+        Provide a compatibility score from 0-100 and 3-5 specific insights for each of them.
+        
+        Format your response as a JSON array with one object per collaborator, with
+        "artistId", "score" and "insights" fields.
+        """
+
+
+def split_into_batches(artist1: Dict[str, Any],
+                       candidates: List[Dict[str, Any]],
+                       preference_text: str,
+                       batch_size: int = COMPATIBILITY_BATCH_SIZE,
+                       max_tokens: int = DEFAULT_CONTEXT_TOKENS,
+                       output_tokens_per_candidate: int = OUTPUT_TOKENS_PER_CANDIDATE) -> List[List[Dict[str, Any]]]:
+    """
+    Split candidates into batches that fit the model's token limit.
+    
+    A batch is closed when it reaches batch_size candidates or when adding the next
+    candidate would make the prompt plus the expected answer exceed max_tokens. A candidate
+    that does not fit even on its own still gets a batch of one.
+    
+    Args:
+        artist1: Requesting artist profile
+        candidates: Candidate artist profiles, in the order they should be scored
+        preference_text: Collaboration request text
+        batch_size: Maximum number of candidates per batch
+        max_tokens: Context window of the model
+        output_tokens_per_candidate: Answer tokens reserved per candidate
+    
+    Returns:
+        List: Batches of candidates
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    
+    base_tokens = estimate_tokens(build_batch_compatibility_prompt(artist1, [], preference_text))
+    
+    batches = []
+    batch, batch_tokens = [], base_tokens
+    for candidate in candidates:
+        candidate_tokens = estimate_tokens(candidate_profile_text(candidate)) + output_tokens_per_candidate
+        if batch and (len(batch) >= batch_size or batch_tokens + candidate_tokens > max_tokens):
+            batches.append(batch)
+            batch, batch_tokens = [], base_tokens
+        batch.append(candidate)
+        batch_tokens += candidate_tokens
+    
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def parse_batch_response(text: str, artist_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse the JSON array answer of a batched prompt.
+    
+    Entries with an unknown artistId or without a numeric score are dropped, so the caller
+    can score the missing candidates one by one.
+    
+    Args:
+        text: Generated text
+        artist_ids: IDs of the candidates in the batch
+    
+    Returns:
+        Dict: {"score", "insights"} per artistId that was answered properly
+    """
+    json_start = text.find('[')
+    json_end = text.rfind(']') + 1
+    if json_start < 0 or json_end <= json_start:
+        return {}
+    
+    try:
+        entries = json.loads(text[json_start:json_end])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+    
+    expected = set(artist_ids)
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.get("artistId") not in expected:
+            continue
+        try:
+            score = min(max(float(entry.get("score")), 0), 100)
+        except (TypeError, ValueError):
+            continue
+        
+        insights = entry.get("insights", [])
+        if isinstance(insights, str):
+            insights = [insights]
+        results[entry["artistId"]] = {"score": score, "insights": insights}
+    
+    return results
+
+
+def batch_max_new_tokens(batch: List[Dict[str, Any]],
+                         output_tokens_per_candidate: int = OUTPUT_TOKENS_PER_CANDIDATE) -> int:
+    """
+    Get the generation budget of a batch (the same budget split_into_batches reserved).
+    
+    Args:
+        batch: Candidates of the batch
+        output_tokens_per_candidate: Answer tokens reserved per candidate
+    
+    Returns:
+        int: max_new_tokens for the batched request
+    """
+    return len(batch) * output_tokens_per_candidate
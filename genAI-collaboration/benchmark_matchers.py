@@ -0,0 +1,394 @@
+"""
+Matcher Benchmark Suite
+
+This script measures how the rule-based matchers scale with the size of the artist catalog.
+For every catalog size it generates a seeded synthetic catalog (synthetic_artists.py), builds
+each matcher on it and runs find_collaborators for a sample of requesting artists, reporting
+build time, throughput, p50/p99 latency and peak memory (tracemalloc). Results are saved as
+JSON so that runs can be compared with --compare.
+
+Each matcher runs in its own forked process, on its own copy of the catalog and with an empty
+preference analysis cache, so results do not depend on the order the matchers run in. Peak
+memory is that of the benchmarking process: the worker processes of digital-parallel are not
+counted.
+
+ArtistCollaborationMatcher calls Watson NLP for every profile; here it runs without those
+calls (empty analyses), so its numbers are the local ranking cost only. It and
+FinalDigitalArtistMatcher rescan every profile per query, so by default they are skipped above
+LINEAR_MATCHER_MAX_SIZE artists; list them with --matchers to run them at any size.
+
+Usage:
+    python benchmark_matchers.py --sizes 1000 100000 --queries 50
+    python benchmark_matchers.py --sizes 1000000 --matchers digital-vectorized digital-parallel
+    python benchmark_matchers.py --sizes 1000 --compare benchmark_results/matchers_20250101-120000.json
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+from typing import Dict, List, Any, Callable, Optional
+
+from artist_repository import ArtistRepository
+from sqlite_artist_repository import SQLiteArtistRepository
+from synthetic_artists import generate_digital_artists, generate_mock_artists
+from preference_cache import PREFERENCE_ANALYSIS_CACHE
+from model_router import LatencyTracker
+
+# Default benchmark settings
+BENCHMARK_SIZES = (1000, 10000)
+BENCHMARK_QUERIES = 50  # find_collaborators calls per matcher and catalog size
+BENCHMARK_TOP_K = 10
+BENCHMARK_SEED = 42
+BENCHMARK_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results")
+
+MATCHERS = ("digital", "digital-vectorized", "digital-parallel", "final-digital", "collaboration")
+
+# Matchers re-analyzing every profile per query, skipped on larger catalogs unless requested
+LINEAR_MATCHERS = ("final-digital", "collaboration")
+LINEAR_MATCHER_MAX_SIZE = 10000
+
+
+def offline_collaboration_matcher() -> Any:
+    """
+    Create an ArtistCollaborationMatcher that needs no credentials and makes no Watson NLP
+    calls (every analysis is empty), to measure its local ranking cost.
+    
+    Returns:
+        ArtistCollaborationMatcher: The offline matcher
+    """
+    from artist_collaboration_matcher import ArtistCollaborationMatcher
+    
+    # Skip __init__, which authenticates against IBM Cloud
+    matcher = ArtistCollaborationMatcher.__new__(ArtistCollaborationMatcher)
+    matcher._call_watson_nlp = lambda text: {}
+    return matcher
+
+
+def _megabytes(size: int) -> float:
+    return round(size / (1024 * 1024), 2)
+
+
+def _sqlite_path(directory: Optional[str]) -> str:
+    """Path of a benchmark SQLite catalog in a directory the caller deletes."""
+    if directory is None:
+        raise ValueError("A SQLite catalog needs a directory to be stored in")
+    return os.path.join(directory, "artists.sqlite3")
+
+
+def build_catalog(size: int, seed: int, store: str, directory: Optional[str] = None) -> Any:
+    """
+    Build a synthetic DIGITAL_ARTISTS-schema catalog.
+    
+    Args:
+        size: Number of artists
+        seed: Random seed
+        store: "memory" for an ArtistRepository, "sqlite" for a SQLiteArtistRepository
+        directory: Directory the SQLite catalog is stored in (required for "sqlite"; the
+                   caller deletes it)
+    
+    Returns:
+        ArtistRepository or SQLiteArtistRepository: The catalog
+    """
+    if store == "sqlite":
+        repository = SQLiteArtistRepository(_sqlite_path(directory))
+        repository.import_artists(generate_digital_artists(size, seed))
+        return repository
+    return ArtistRepository(list(generate_digital_artists(size, seed)))
+
+
+def copy_catalog(repository: Any, directory: Optional[str] = None) -> Any:
+    """
+    Copy a catalog, so the indexes a matcher fills in are not seen by the next matcher.
+    
+    Args:
+        repository: Catalog from build_catalog()
+        directory: Directory a SQLite catalog is copied to (required for SQLite catalogs;
+                   the caller deletes it)
+    
+    Returns:
+        ArtistRepository or SQLiteArtistRepository: A new catalog with the same artists
+    """
+    if isinstance(repository, SQLiteArtistRepository):
+        return repository.backup(_sqlite_path(directory))
+    return ArtistRepository(list(repository))
+
+
+def run_isolated(function: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run a function in a forked child process and return its result, so whatever it builds
+    (matchers, caches, memory) is gone afterwards; where fork is not available it runs in
+    this process.
+    
+    Args:
+        function: Function to run
+        *args: Its arguments (inherited by the child, not pickled)
+    
+    Returns:
+        Any: The function's result (pickled back from the child)
+    
+    Raises:
+        RuntimeError: If the function raised or the child process died
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return function(*args)
+    
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    
+    def run_child():
+        try:
+            sender.send((True, function(*args)))
+        except BaseException as e:
+            sender.send((False, repr(e)))
+    
+    process = context.Process(target=run_child)
+    process.start()
+    sender.close()
+    try:
+        succeeded, result = receiver.recv()
+    except EOFError:
+        succeeded, result = False, "the process died"
+    process.join()
+    
+    if not succeeded:
+        raise RuntimeError(f"Benchmark process failed (exit code {process.exitcode}): {result}")
+    return result
+
+
+def _matcher_factories() -> Dict[str, Callable[[Any], Any]]:
+    """Build functions creating each benchmarked matcher on a catalog."""
+    from digital_artist_matcher import DigitalArtistMatcher
+    from final_digital_artist_matcher import FinalDigitalArtistMatcher
+    
+    return {
+        "digital": lambda repository: DigitalArtistMatcher(repository=repository),
+        "digital-vectorized": lambda repository: DigitalArtistMatcher("vectorized", repository=repository),
+        "digital-parallel": lambda repository: DigitalArtistMatcher("parallel", repository=repository),
+        "final-digital": lambda repository: FinalDigitalArtistMatcher(repository=repository),
+        "collaboration": lambda repository: offline_collaboration_matcher()
+    }
+
+
+def _query_functions(name: str, matcher: Any, size: int, seed: int, top_k: int) -> Callable[[int], Any]:
+    """Build the find_collaborators call of a matcher for a requesting artist index."""
+    if name == "collaboration":
+        # ArtistCollaborationMatcher takes the candidate profiles with every call
+        available_artists = list(generate_mock_artists(size, seed))
+        return lambda index: matcher.find_collaborators(
+            available_artists[index],
+            " ".join(available_artists[index]["collaboration_preferences"]["preferred_skills"]),
+            available_artists
+        )
+    return lambda index: matcher.find_collaborators(f"SYN{index + 1:07d}", top_k=top_k)
+
+
+def benchmark_matcher(name: str,
+                      repository: Any,
+                      size: int,
+                      seed: int = BENCHMARK_SEED,
+                      queries: int = BENCHMARK_QUERIES,
+                      top_k: int = BENCHMARK_TOP_K,
+                      directory: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Benchmark one matcher on one catalog.
+    
+    The matcher gets its own copy of the catalog and an empty preference analysis cache.
+    The build and a first query run under tracemalloc for the memory peak (of this process
+    only); the timed queries run without it, so tracing does not inflate the latencies.
+    
+    Args:
+        name: Matcher name (one of MATCHERS)
+        repository: Catalog to match against
+        size: Number of artists in the catalog
+        seed: Random seed (also picks the requesting artists)
+        queries: Number of timed find_collaborators calls
+        top_k: Matches requested per call (ignored by ArtistCollaborationMatcher)
+        directory: Directory the copy of a SQLite catalog is stored in (see copy_catalog())
+    
+    Returns:
+        Dict: Build time, throughput, latency percentiles and peak memory
+    """
+    # Start from the state a matcher built first would see
+    PREFERENCE_ANALYSIS_CACHE.clear()
+    repository = copy_catalog(repository, directory)
+    
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    
+    start_time = time.perf_counter()
+    matcher = _matcher_factories()[name](repository)
+    query = _query_functions(name, matcher, size, seed, top_k)
+    build_seconds = time.perf_counter() - start_time
+    
+    requesting = random.Random(seed).choices(range(size), k=queries)
+    query(requesting[0])
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+    
+    latencies = LatencyTracker(window=queries)
+    start_time = time.perf_counter()
+    for index in requesting:
+        query_start = time.perf_counter()
+        query(index)
+        latencies.record(time.perf_counter() - query_start)
+    total_seconds = time.perf_counter() - start_time
+    
+    return {
+        "matcher": name,
+        "catalog_size": size,
+        "queries": queries,
+        "top_k": top_k,
+        "build_seconds": round(build_seconds, 4),
+        "throughput_qps": round(queries / total_seconds, 2) if total_seconds else None,
+        "p50_ms": round(latencies.percentile(50) * 1000, 3),
+        "p99_ms": round(latencies.percentile(99) * 1000, 3),
+        "peak_memory_mb": _megabytes(peak)
+    }
+
+
+def run_benchmarks(sizes: List[int],
+                   matchers: List[str],
+                   seed: int = BENCHMARK_SEED,
+                   queries: int = BENCHMARK_QUERIES,
+                   top_k: int = BENCHMARK_TOP_K,
+                   store: str = "memory",
+                   linear_matcher_max_size: Optional[int] = LINEAR_MATCHER_MAX_SIZE) -> Dict[str, Any]:
+    """
+    Benchmark every matcher on every catalog size, each in its own process (see run_isolated()).
+    
+    Args:
+        sizes: Catalog sizes
+        matchers: Matcher names (see MATCHERS)
+        seed: Random seed of the catalogs and requesting artists
+        queries: Timed find_collaborators calls per matcher and size
+        top_k: Matches requested per call
+        store: Catalog store, "memory" or "sqlite"
+        linear_matcher_max_size: Largest catalog the LINEAR_MATCHERS run on (no limit when None)
+    
+    Returns:
+        Dict: Run settings, environment and one result per matcher and size
+    """
+    results = []
+    for size in sizes:
+        # SQLite catalogs (and each matcher's copy) are deleted as soon as they are done with
+        with tempfile.TemporaryDirectory(prefix="artist-benchmark-") as catalog_directory:
+            print(f"Generating {size} artists ({store})...")
+            gc.collect()
+            tracemalloc.start()
+            start_time = time.perf_counter()
+            repository = build_catalog(size, seed, store, catalog_directory)
+            catalog_seconds = time.perf_counter() - start_time
+            catalog_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            print(f"  catalog built in {catalog_seconds:.2f}s, {_megabytes(catalog_memory)} MB")
+            
+            for name in matchers:
+                if name in LINEAR_MATCHERS and linear_matcher_max_size is not None and size > linear_matcher_max_size:
+                    print(f"  {name:20} skipped (more than {linear_matcher_max_size} artists, pass --matchers to run it)")
+                    continue
+                
+                with tempfile.TemporaryDirectory(dir=catalog_directory) as copy_directory:
+                    result = run_isolated(benchmark_matcher, name, repository, size, seed, queries, top_k, copy_directory)
+                result.update(store=store, catalog_seconds=round(catalog_seconds, 4),
+                              catalog_memory_mb=_megabytes(catalog_memory))
+                results.append(result)
+                print(f"  {name:20} build {result['build_seconds']:9.3f}s  {result['throughput_qps']:9.2f} q/s  "
+                      f"p50 {result['p50_ms']:10.3f}ms  p99 {result['p99_ms']:10.3f}ms  "
+                      f"peak {result['peak_memory_mb']:9.2f} MB")
+            
+            del repository
+    
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results
+    }
+
+
+def save_results(report: Dict[str, Any], path: Optional[str] = None) -> str:
+    """
+    Save a benchmark report as JSON.
+    
+    Args:
+        report: Report from run_benchmarks()
+        path: Output file (a timestamped file in BENCHMARK_OUTPUT_DIR when None)
+    
+    Returns:
+        str: Path of the saved file
+    """
+    if path is None:
+        os.makedirs(BENCHMARK_OUTPUT_DIR, exist_ok=True)
+        path = os.path.join(BENCHMARK_OUTPUT_DIR, f"matchers_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def compare_results(previous: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """
+    Print the change of each metric between two reports, for the matcher, size and store
+    combinations both of them ran.
+    
+    Args:
+        previous: Earlier report
+        current: New report
+    """
+    def key(result):
+        return result["matcher"], result["catalog_size"], result.get("store", "memory")
+    
+    previous_results = {key(result): result for result in previous["results"]}
+    print(f"\nCompared with the run of {previous.get('created_at', 'unknown')}:")
+    for result in current["results"]:
+        before = previous_results.get(key(result))
+        if before is None:
+            continue
+        
+        changes = []
+        for metric in ("throughput_qps", "p50_ms", "p99_ms", "peak_memory_mb", "build_seconds"):
+            if before.get(metric):
+                changes.append(f"{metric} {(result[metric] - before[metric]) / before[metric]:+.1%}")
+        print(f"  {result['matcher']:20} {result['catalog_size']:>8}  " + "  ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the artist matchers on synthetic catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES), help="catalog sizes")
+    parser.add_argument("--matchers", nargs="+", choices=MATCHERS,
+                        help=f"matchers to run at every size (default: all, {', '.join(LINEAR_MATCHERS)} "
+                             f"only up to {LINEAR_MATCHER_MAX_SIZE} artists)")
+    parser.add_argument("--queries", type=int, default=BENCHMARK_QUERIES, help="timed queries per matcher and size")
+    parser.add_argument("--top-k", type=int, default=BENCHMARK_TOP_K, help="matches requested per query")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help="random seed")
+    parser.add_argument("--store", choices=("memory", "sqlite"), default="memory", help="catalog store")
+    parser.add_argument("--output", help="JSON file to write (timestamped file in benchmark_results/ by default)")
+    parser.add_argument("--compare", help="earlier JSON report to compare with")
+    args = parser.parse_args()
+    
+    if args.matchers:
+        matchers, linear_matcher_max_size = args.matchers, None
+    else:
+        matchers, linear_matcher_max_size = list(MATCHERS), LINEAR_MATCHER_MAX_SIZE
+    
+    report = run_benchmarks(args.sizes, matchers, args.seed, args.queries, args.top_k, args.store,
+                            linear_matcher_max_size)
+    print(f"\nResults saved to {save_results(report, args.output)}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            compare_results(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Compatibility Matrix
+
+This module materializes DigitalArtistMatcher's compatibility scores for every pair of artists
+in the catalog: row i holds the score of every candidate for artist i's stored chatbot
+preference. Matches for the stored (default) preference then need a row lookup and a top-k
+instead of scoring the catalog.
+
+The matrix is an N x N int8 .npy file, read memory-mapped (server workers forked from one
+process share the pages), with a JSON sidecar listing the artist of each row and a digest of
+the features and preference it was computed from. It is built with a process pool across all
+cores, and when an artist's profile or gallery changes only that artist's row and column are
+recomputed; an artist added to the catalog gets a new row and column at the end. Its size grows with the square of the catalog (10,000 artists take 100 MB).
+
+Usage:
+    python compatibility_matrix.py --output compatibility_matrix.npy --processes 8
+    COMPATIBILITY_MATRIX_PATH=compatibility_matrix.npy python digital_artist_api_updated.py
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from vectorized_scoring import BATCH_CHUNK_SIZE, top_rows
+
+# Matrix file used by the APIs when set
+COMPATIBILITY_MATRIX_PATH = os.environ.get("COMPATIBILITY_MATRIX_PATH")
+COMPATIBILITY_MATRIX_PROCESSES = os.cpu_count() or 1
+
+# Value of the diagonal (an artist is never its own candidate)
+SELF_SCORE = -1
+
+# State of the matrix being built, inherited by the forked pool workers
+_build_state = {}
+
+
+def _score_rows(bounds: Tuple[int, int]) -> int:
+    """Score a block of rows into the matrix file (runs in a pool worker)."""
+    start, stop = bounds
+    engine = _build_state["engine"]
+    analyses = _build_state["analyses"]
+    matrix = np.load(_build_state["path"], mmap_mode="r+")
+    
+    for chunk_start in range(start, stop, BATCH_CHUNK_SIZE):
+        chunk_stop = min(chunk_start + BATCH_CHUNK_SIZE, stop)
+        total_scores, _ = engine.score_batch(analyses[chunk_start:chunk_stop])
+        matrix[chunk_start:chunk_stop] = total_scores
+        rows = np.arange(chunk_start, chunk_stop)
+        matrix[rows, rows] = SELF_SCORE
+    
+    matrix.flush()
+    return stop - start
+
+
+def _ids_path(path: str) -> str:
+    """Path of the JSON sidecar of a matrix file."""
+    return os.path.splitext(path)[0] + ".ids.json"
+
+
+class CompatibilityMatrix:
+    """
+    All-pairs compatibility scores of a DigitalArtistMatcher's catalog for the stored preferences.
+    """
+    
+    def __init__(self, matcher, path: str, processes: int = COMPATIBILITY_MATRIX_PROCESSES):
+        """
+        Open the matrix file, bringing the rows of changed and added artists up to date, or
+        build it.
+        
+        Args:
+            matcher: DigitalArtistMatcher whose catalog and scoring the matrix materializes
+            path: Path of the .npy matrix file (its sidecar is stored next to it)
+            processes: Number of processes used to build the matrix
+        """
+        self.matcher = matcher
+        self.feature_index = matcher.feature_index
+        self.path = path
+        self.processes = processes
+        
+        self._lock = threading.RLock()
+        self._dirty_artist_ids = set()
+        self._analyses = None
+        self.feature_index.add_listener(self._on_invalidate)
+        
+        artist_ids = self.feature_index.artist_ids()
+        stored = self._read_ids()
+        if stored is None or stored["artist_ids"] != artist_ids[:len(stored["artist_ids"])]:
+            self._set_artists(artist_ids)
+            self.build()
+        else:
+            # A matrix of an earlier catalog grows by the artists added since
+            self._set_artists(stored["artist_ids"])
+            self.matrix = np.load(path, mmap_mode="r+")
+            changed_ids = [
+                artist_id for artist_id, digest, stored_digest in zip(self.artist_ids, self._digests, stored["digests"])
+                if digest != stored_digest
+            ]
+            for artist_id in changed_ids:
+                self.update_artist(artist_id)
+            added_ids = artist_ids[len(self.artist_ids):]
+            if added_ids:
+                self._add_artists(added_ids)
+            if changed_ids or added_ids:
+                self._write_ids()
+    
+    def _set_artists(self, artist_ids: List[str]) -> None:
+        """Set the artist of each row and the digests of their current features."""
+        self.artist_ids = list(artist_ids)
+        self.rows = {artist_id: row for row, artist_id in enumerate(self.artist_ids)}
+        self._digests = [self._digest(artist_id) for artist_id in self.artist_ids]
+    
+    def _on_invalidate(self, artist_id: str) -> None:
+        """Remember an artist whose row and column must be recomputed before the next lookup."""
+        with self._lock:
+            self._dirty_artist_ids.add(artist_id)
+    
+    def _preference_text(self, artist_id: str) -> str:
+        """Get the stored chatbot preference of an artist."""
+        artist = self.feature_index.get_artist(artist_id) or {}
+        return artist.get("chatbotPreferences", {}).get("preferenceText", "")
+    
+    def _digest(self, artist_id: str) -> str:
+        """Fingerprint the features and stored preference a row and column are computed from."""
+        payload = json.dumps(
+            [self.feature_index.get(artist_id), self._preference_text(artist_id)],
+            sort_keys=True, default=sorted, ensure_ascii=False
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    
+    def _preference_analyses(self) -> List[Dict[str, Any]]:
+        """Get the analyzed stored preference of every artist, in row order."""
+        if self._analyses is None:
+            self._analyses = [
+                self.matcher.analyze_chatbot_preference(self._preference_text(artist_id))
+                for artist_id in self.artist_ids
+            ]
+        return self._analyses
+    
+    def _read_ids(self) -> Optional[Dict[str, Any]]:
+        """Read the sidecar of the matrix file, or None if there is no usable matrix."""
+        try:
+            with open(_ids_path(self.path)) as f:
+                stored = json.load(f)
+            shape = np.load(self.path, mmap_mode="r").shape
+        except (OSError, ValueError) as e:
+            print(f"No usable compatibility matrix at {self.path}: {e}")
+            return None
+        
+        if shape != (len(stored["artist_ids"]), len(stored["artist_ids"])):
+            return None
+        return stored
+    
+    def _write_ids(self) -> None:
+        """Write the sidecar (row artists and their digests) next to the matrix file."""
+        temporary_path = _ids_path(self.path) + ".tmp"
+        with open(temporary_path, "w") as f:
+            json.dump({"artist_ids": self.artist_ids, "digests": self._digests}, f)
+        os.replace(temporary_path, _ids_path(self.path))
+    
+    def build(self) -> None:
+        """
+        Compute the whole matrix, sharding the rows across a process pool.
+        
+        The pool is forked, so the workers share the feature matrices instead of receiving
+        them; where fork is not available, the rows are scored in this process.
+        """
+        with self._lock:
+            start_time = time.perf_counter()
+            artist_count = len(self.artist_ids)
+            temporary_path = self.path + ".tmp.npy"
+            
+            matrix = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=np.int8, shape=(artist_count, artist_count))
+            del matrix
+            
+            _build_state.update(
+                engine=self.matcher.batch_scoring_engine(),
+                analyses=self._preference_analyses(),
+                path=temporary_path
+            )
+            # The engine encodes invalidated rows before the pool forks
+            _build_state["engine"].score_batch([])
+            
+            # A few blocks per process, so uneven blocks do not leave processes idle
+            block_size = max(1, -(-artist_count // (self.processes * 4)))
+            blocks = [(start, min(start + block_size, artist_count)) for start in range(0, artist_count, block_size)]
+            try:
+                if self.processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+                    with multiprocessing.get_context("fork").Pool(self.processes) as pool:
+                        pool.map(_score_rows, blocks)
+                else:
+                    for block in blocks:
+                        _score_rows(block)
+            finally:
+                _build_state.clear()
+            
+            os.replace(temporary_path, self.path)
+            self.matrix = np.load(self.path, mmap_mode="r+")
+            self._dirty_artist_ids.clear()
+            self._write_ids()
+            print(f"Compatibility matrix of {artist_count} artists built in {time.perf_counter() - start_time:.2f}s")
+    
+    def update_artist(self, artist_id: str) -> None:
+        """
+        Recompute an artist's row (its stored preference against every candidate) and column
+        (it as a candidate for every stored preference).
+        
+        Args:
+            artist_id: ID of the artist whose profile or gallery changed
+        """
+        with self._lock:
+            row = self.rows.get(artist_id)
+            features = self.feature_index.get(artist_id)
+            if row is None or features is None:
+                return
+            
+            analyses = self._preference_analyses()
+            analyses[row] = self.matcher.analyze_chatbot_preference(self._preference_text(artist_id))
+            
+            # The engine may already hold artists added after the matrix last grew
+            total_scores, _ = self.matcher.batch_scoring_engine().score_batch([analyses[row]])
+            self.matrix[row] = total_scores[0][:len(self.artist_ids)]
+            self.matrix[:, row] = [self.matcher._score_features(features, analysis)[0] for analysis in analyses]
+            self.matrix[row, row] = SELF_SCORE
+            self.matrix.flush()
+            
+            self._digests[row] = self._digest(artist_id)
+    
+    def _add_artists(self, artist_ids: List[str]) -> None:
+        """
+        Grow the matrix by a row and a column per artist added to the catalog, and score them.
+        
+        The matrix file is copied into a larger one, which replaces it.
+        
+        Args:
+            artist_ids: IDs of the added artists, in catalog order
+        """
+        with self._lock:
+            old_count = len(self.artist_ids)
+            artist_count = old_count + len(artist_ids)
+            temporary_path = f"{self.path}.{os.getpid()}.tmp.npy"
+            
+            matrix = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=np.int8, shape=(artist_count, artist_count))
+            matrix[:old_count, :old_count] = self.matrix
+            matrix.flush()
+            del matrix
+            os.replace(temporary_path, self.path)
+            self.matrix = np.load(self.path, mmap_mode="r+")
+            
+            analyses = self._preference_analyses()
+            for artist_id in artist_ids:
+                self.rows[artist_id] = len(self.artist_ids)
+                self.artist_ids.append(artist_id)
+                self._digests.append(None)
+                analyses.append(self.matcher.analyze_chatbot_preference(self._preference_text(artist_id)))
+            
+            # Every new row and column is complete once all the added artists have theirs
+            for artist_id in artist_ids:
+                self.update_artist(artist_id)
+            self._dirty_artist_ids.difference_update(artist_ids)
+    
+    def _sync(self) -> None:
+        """Add rows and columns for added artists and recompute those of artists invalidated since the last lookup."""
+        with self._lock:
+            added = len(self.feature_index) > len(self.artist_ids)
+            if not added and not self._dirty_artist_ids:
+                return
+            
+            if added:
+                self._add_artists(self.feature_index.artist_ids()[len(self.artist_ids):])
+            for artist_id in list(self._dirty_artist_ids):
+                self.update_artist(artist_id)
+            self._dirty_artist_ids.clear()
+            self._write_ids()
+    
+    def rank(self, artist_id: str, top_k: Optional[int] = None) -> Optional[List[Tuple[str, int]]]:
+        """
+        Rank the candidates for an artist's stored preference, highest score first.
+        
+        Args:
+            artist_id: ID of the requesting artist
+            top_k: Optional maximum number of candidates to return
+        
+        Returns:
+            List: (candidate ID, compatibility score) pairs, or None if the artist has no row
+        """
+        self._sync()
+        
+        with self._lock:
+            row = self.rows.get(artist_id)
+            if row is None:
+                return None
+            scores = np.array(self.matrix[row])
+        
+        candidates = np.flatnonzero(np.arange(len(scores)) != row)
+        return [(self.artist_ids[candidate], int(scores[candidate])) for candidate in top_rows(scores, candidates, top_k)]
+
+
+def main():
+    from digital_artist_matcher import DigitalArtistMatcher
+    
+    parser = argparse.ArgumentParser(description="Build the all-pairs compatibility matrix of the artist catalog")
+    parser.add_argument("--output", default=COMPATIBILITY_MATRIX_PATH or "compatibility_matrix.npy", help="matrix file")
+    parser.add_argument("--processes", type=int, default=COMPATIBILITY_MATRIX_PROCESSES, help="processes scoring rows")
+    args = parser.parse_args()
+    
+    # Builds the matrix, or brings the rows of artists changed since the last build up to date
+    CompatibilityMatrix(DigitalArtistMatcher(), args.output, args.processes)
+
+
+if __name__ == "__main__":
+    main()
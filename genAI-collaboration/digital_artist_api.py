@@ -4,17 +4,33 @@ API for Digital Artist Collaboration Matcher
 
 from flask import Flask, request, jsonify
 from digital_artist_matcher import DigitalArtistMatcher
-from digital_artist_data import DIGITAL_ARTISTS
+from compatibility_matrix import COMPATIBILITY_MATRIX_PATH
+from artist_repository import ARTIST_REPOSITORY, LOCATION, TOOL, ART_TYPE
+from metrics import instrument_app, timed, SERIALIZATION
 
 app = Flask(__name__)
-matcher = DigitalArtistMatcher()
+# Default-preference matches come from the compatibility matrix when COMPATIBILITY_MATRIX_PATH is set
+matcher = DigitalArtistMatcher(compatibility_matrix_path=COMPATIBILITY_MATRIX_PATH)
+
+# Request timings and GET /metrics (Prometheus text format)
+instrument_app(app, "digital_artist_api")
+
+# Most queries accepted by POST /api/match/batch
+MAX_BATCH_QUERIES = 100
 
 @app.route('/api/artists', methods=['GET'])
 def get_artists():
-    """Get all artists"""
+    """Get all artists, optionally filtered by ?location=, ?tool= and ?artType="""
+    # Filters are answered from the repository's secondary indexes
+    artists = ARTIST_REPOSITORY.search({
+        LOCATION: request.args.get('location'),
+        TOOL: request.args.get('tool'),
+        ART_TYPE: request.args.get('artType')
+    })
+    
     # Return simplified artist data (without analysis)
     simplified_artists = []
-    for artist in DIGITAL_ARTISTS:
+    for artist in artists:
         simplified_artists.append({
             "artistId": artist["artistId"],
             "basicInfo": artist["basicInfo"],
@@ -26,15 +42,11 @@ def get_artists():
 @app.route('/api/artists/<artist_id>', methods=['GET'])
 def get_artist(artist_id):
     """Get a specific artist by ID"""
-    artist = next((a for a in DIGITAL_ARTISTS if a["artistId"] == artist_id), None)
-    if not artist:
+    # Tools and art types come precomputed from the matcher's feature index
+    analyzed_artist = matcher.feature_index.analyzed_artist(artist_id)
+    if not analyzed_artist:
         return jsonify({"error": "Artist not found"}), 404
     
-    # Analyze the artist's tools and art types
-    analyzed_artist = matcher.extract_art_types(
-        matcher.extract_tools_and_skills(artist)
-    )
-    
     return jsonify(analyzed_artist)
 
 @app.route('/api/match', methods=['POST'])
@@ -45,12 +57,16 @@ def find_matches():
     
     artist_id = request.json.get('artistId')
     chatbot_preference = request.json.get('chatbotPreference')
+    limit = request.json.get('limit')
     
     if not artist_id:
         return jsonify({"error": "Artist ID is required"}), 400
     
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "Limit must be a positive integer"}), 400
+    
     # Find the requesting artist
-    requesting_artist = next((a for a in DIGITAL_ARTISTS if a["artistId"] == artist_id), None)
+    requesting_artist = ARTIST_REPOSITORY.get(artist_id)
     if not requesting_artist:
         return jsonify({"error": "Artist not found"}), 404
     
@@ -58,15 +74,61 @@ def find_matches():
     if not chatbot_preference:
         chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
     
-    # Find matches
-    matches = matcher.find_collaborators(artist_id, chatbot_preference)
+    # Find matches (only the top `limit` when provided)
+    matches = matcher.find_collaborators(artist_id, chatbot_preference, top_k=limit)
     
     # Return the matches
-    return jsonify({
-        "requestingArtist": requesting_artist,
-        "chatbotPreference": chatbot_preference,
-        "matches": matches
-    })
+    with timed(SERIALIZATION):
+        response = jsonify({
+            "requestingArtist": requesting_artist,
+            "chatbotPreference": chatbot_preference,
+            "matches": matches
+        })
+    return response
+
+@app.route('/api/match/batch', methods=['POST'])
+def find_matches_batch():
+    """Find matches for several (artist ID, chatbot preference) requests at once"""
+    if not request.json:
+        return jsonify({"error": "No data provided"}), 400
+    
+    queries = request.json.get('queries')
+    limit = request.json.get('limit')
+    
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "Queries must be a non-empty list"}), 400
+    
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 400
+    
+    if not all(isinstance(query, dict) and query.get('artistId') for query in queries):
+        return jsonify({"error": "Every query needs an artist ID"}), 400
+    
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "Limit must be a positive integer"}), 400
+    
+    # Score all queries together (stored preferences are used for empty ones)
+    batch_matches = matcher.find_collaborators_batch(
+        [(query['artistId'], query.get('chatbotPreference') or None) for query in queries], top_k=limit
+    )
+    
+    results = []
+    for query, matches in zip(queries, batch_matches):
+        requesting_artist = ARTIST_REPOSITORY.get(query['artistId'])
+        if not requesting_artist:
+            results.append({"artistId": query['artistId'], "error": "Artist not found"})
+            continue
+        
+        chatbot_preference = query.get('chatbotPreference')
+        if not chatbot_preference:
+            chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
+        
+        results.append({"artistId": query['artistId'], "chatbotPreference": chatbot_preference, "matches": matches})
+    
+    # Return the matches
+    with timed(SERIALIZATION):
+        response = jsonify({"results": results})
+    return response
 
 @app.route('/api/analyze-preference', methods=['POST'])
 def analyze_preference():
@@ -87,7 +149,10 @@ def analyze_preference():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "ok"})
+    return jsonify({
+        "status": "ok",
+        "preferenceCache": matcher.preference_cache.stats()
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8080)
@@ -2,15 +2,27 @@
 API for Digital Artist Collaboration Matcher
 """
 
-from flask import Flask, request, jsonify, render_template, url_for
+from flask import Flask, Response, request, jsonify, render_template, url_for, stream_with_context
 import os
+import json
 import uuid
+import threading
 from werkzeug.utils import secure_filename
 from digital_artist_matcher import DigitalArtistMatcher
-from digital_artist_data import DIGITAL_ARTISTS
+from compatibility_matrix import COMPATIBILITY_MATRIX_PATH
+from artist_repository import ARTIST_REPOSITORY, LOCATION, TOOL, ART_TYPE
+from job_queue import JobQueue, JobQueueFullError, DONE, FAILED
+from metrics import instrument_app, timed, SERIALIZATION
 
 app = Flask(__name__)
-matcher = DigitalArtistMatcher()
+# Default-preference matches come from the compatibility matrix when COMPATIBILITY_MATRIX_PATH is set
+matcher = DigitalArtistMatcher(compatibility_matrix_path=COMPATIBILITY_MATRIX_PATH)
+
+# Request timings and GET /metrics (Prometheus text format)
+instrument_app(app, "digital_artist_api_updated")
+
+# Most queries accepted by POST /api/match/batch
+MAX_BATCH_QUERIES = 100
 
 # Configure upload settings
 UPLOAD_FOLDER = 'static/uploads'
@@ -22,6 +34,45 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 
+# watsonx.ai matcher of the streaming endpoint, created on first use (needs ibm_watsonx_ai)
+watsonx_matcher = None
+watsonx_matcher_lock = threading.Lock()
+
+def get_watsonx_matcher():
+    """Get the shared watsonx.ai matcher, or None if the watsonx.ai SDK is not installed"""
+    global watsonx_matcher
+    with watsonx_matcher_lock:
+        if watsonx_matcher is None:
+            try:
+                from final_watsonx_artist_matcher import FinalWatsonXArtistMatcher
+            except ImportError as e:
+                print(f"watsonx.ai matcher not available: {e}")
+                return None
+            watsonx_matcher = FinalWatsonXArtistMatcher()
+        return watsonx_matcher
+
+def run_match_job(params):
+    """Run a watsonx.ai match request in the job queue"""
+    job_matcher = get_watsonx_matcher()
+    if job_matcher is None:
+        raise RuntimeError("watsonx.ai is not available")
+    
+    matches = job_matcher.find_collaborators(
+        params["artistId"], params.get("chatbotPreference") or None, top_k=params.get("limit")
+    )
+    return {
+        "artistId": params["artistId"],
+        "chatbotPreference": params.get("chatbotPreference"),
+        "matches": matches
+    }
+
+# Slow watsonx.ai match requests run here, off the request threads (the job store at
+# JOB_STORE_PATH is opened by the first job request)
+match_jobs = JobQueue(run_match_job)
+
+# Longest long-poll wait of GET /api/jobs/<job_id>
+MAX_JOB_WAIT = 30
+
 @app.route('/')
 def index():
     """Render the main page"""
@@ -29,10 +80,17 @@ def index():
 
 @app.route('/api/artists', methods=['GET'])
 def get_artists():
-    """Get all artists"""
+    """Get all artists, optionally filtered by ?location=, ?tool= and ?artType="""
+    # Filters are answered from the repository's secondary indexes
+    artists = ARTIST_REPOSITORY.search({
+        LOCATION: request.args.get('location'),
+        TOOL: request.args.get('tool'),
+        ART_TYPE: request.args.get('artType')
+    })
+    
     # Return simplified artist data (without analysis)
     simplified_artists = []
-    for artist in DIGITAL_ARTISTS:
+    for artist in artists:
         simplified_artists.append({
             "artistId": artist["artistId"],
             "basicInfo": artist["basicInfo"],
@@ -44,15 +102,11 @@ def get_artists():
 @app.route('/api/artists/<artist_id>', methods=['GET'])
 def get_artist(artist_id):
     """Get a specific artist by ID"""
-    artist = next((a for a in DIGITAL_ARTISTS if a["artistId"] == artist_id), None)
-    if not artist:
+    # Tools and art types come precomputed from the matcher's feature index
+    analyzed_artist = matcher.feature_index.analyzed_artist(artist_id)
+    if not analyzed_artist:
         return jsonify({"error": "Artist not found"}), 404
     
-    # Analyze the artist's tools and art types
-    analyzed_artist = matcher.extract_art_types(
-        matcher.extract_tools_and_skills(artist)
-    )
-    
     return jsonify(analyzed_artist)
 
 @app.route('/api/match', methods=['POST'])
@@ -63,12 +117,16 @@ def find_matches():
     
     artist_id = request.json.get('artistId')
     chatbot_preference = request.json.get('chatbotPreference')
+    limit = request.json.get('limit')
     
     if not artist_id:
         return jsonify({"error": "Artist ID is required"}), 400
     
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "Limit must be a positive integer"}), 400
+    
     # Find the requesting artist
-    requesting_artist = next((a for a in DIGITAL_ARTISTS if a["artistId"] == artist_id), None)
+    requesting_artist = ARTIST_REPOSITORY.get(artist_id)
     if not requesting_artist:
         return jsonify({"error": "Artist not found"}), 404
     
@@ -76,15 +134,186 @@ def find_matches():
     if not chatbot_preference:
         chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
     
-    # Find matches
-    matches = matcher.find_collaborators(artist_id, chatbot_preference)
+    # Find matches (only the top `limit` when provided)
+    matches = matcher.find_collaborators(artist_id, chatbot_preference, top_k=limit)
     
     # Return the matches
-    return jsonify({
-        "requestingArtist": requesting_artist,
-        "chatbotPreference": chatbot_preference,
-        "matches": matches
-    })
+    with timed(SERIALIZATION):
+        response = jsonify({
+            "requestingArtist": requesting_artist,
+            "chatbotPreference": chatbot_preference,
+            "matches": matches
+        })
+    return response
+
+@app.route('/api/match/batch', methods=['POST'])
+def find_matches_batch():
+    """Find matches for several (artist ID, chatbot preference) requests at once"""
+    if not request.json:
+        return jsonify({"error": "No data provided"}), 400
+    
+    queries = request.json.get('queries')
+    limit = request.json.get('limit')
+    
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "Queries must be a non-empty list"}), 400
+    
+    if len(queries) > MAX_BATCH_QUERIES:
+        return jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}), 400
+    
+    if not all(isinstance(query, dict) and query.get('artistId') for query in queries):
+        return jsonify({"error": "Every query needs an artist ID"}), 400
+    
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "Limit must be a positive integer"}), 400
+    
+    # Score all queries together (stored preferences are used for empty ones)
+    batch_matches = matcher.find_collaborators_batch(
+        [(query['artistId'], query.get('chatbotPreference') or None) for query in queries], top_k=limit
+    )
+    
+    results = []
+    for query, matches in zip(queries, batch_matches):
+        requesting_artist = ARTIST_REPOSITORY.get(query['artistId'])
+        if not requesting_artist:
+            results.append({"artistId": query['artistId'], "error": "Artist not found"})
+            continue
+        
+        chatbot_preference = query.get('chatbotPreference')
+        if not chatbot_preference:
+            chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
+        
+        results.append({"artistId": query['artistId'], "chatbotPreference": chatbot_preference, "matches": matches})
+    
+    # Return the matches
+    with timed(SERIALIZATION):
+        response = jsonify({"results": results})
+    return response
+
+def validate_match_params(params):
+    """Validate the artistId and limit of a match request, returning an error response or None"""
+    artist_id = params.get('artistId')
+    limit = params.get('limit')
+    
+    if not artist_id:
+        return jsonify({"error": "Artist ID is required"}), 400
+    
+    if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 1):
+        return jsonify({"error": "Limit must be a positive integer"}), 400
+    
+    if artist_id not in ARTIST_REPOSITORY:
+        return jsonify({"error": "Artist not found"}), 404
+    
+    return None
+
+@app.route('/api/match/stream', methods=['GET', 'POST'])
+def stream_matches():
+    """
+    Stream matches as Server-Sent Events: the rule-based ranking first, then the AI
+    insights of each match as they complete, then a final "done" event.
+    
+    Accepts the /api/match JSON body on POST, or artistId, chatbotPreference and limit
+    query parameters on GET (for EventSource clients).
+    """
+    if request.method == 'POST':
+        if not request.json:
+            return jsonify({"error": "No data provided"}), 400
+        params = request.json
+    else:
+        params = request.args.to_dict()
+        if 'limit' in params:
+            params['limit'] = request.args.get('limit', type=int) or 0
+    
+    error = validate_match_params(params)
+    if error:
+        return error
+    
+    artist_id = params.get('artistId')
+    chatbot_preference = params.get('chatbotPreference')
+    limit = params.get('limit')
+    
+    streaming_matcher = get_watsonx_matcher()
+    if streaming_matcher is None:
+        return jsonify({"error": "watsonx.ai is not available"}), 503
+    
+    def generate_events():
+        for event in streaming_matcher.stream_collaborators(artist_id, chatbot_preference or None, top_k=limit):
+            with timed(SERIALIZATION):
+                data = json.dumps(event)
+            yield f"event: {event['event']}\ndata: {data}\n\n"
+    
+    return Response(
+        stream_with_context(generate_events()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route('/api/jobs/match', methods=['POST'])
+def submit_match_job():
+    """
+    Queue a watsonx.ai match request and return its job right away (202). An identical
+    request that is still queued, running or finished returns the existing job.
+    """
+    if not request.json:
+        return jsonify({"error": "No data provided"}), 400
+    
+    error = validate_match_params(request.json)
+    if error:
+        return error
+    
+    if get_watsonx_matcher() is None:
+        return jsonify({"error": "watsonx.ai is not available"}), 503
+    
+    params = {
+        "artistId": request.json.get('artistId'),
+        "chatbotPreference": request.json.get('chatbotPreference') or None,
+        "limit": request.json.get('limit')
+    }
+    
+    try:
+        job = match_jobs.submit(params)
+    except JobQueueFullError as e:
+        return jsonify({"error": f"Too many queued jobs: {e}"}), 503
+    
+    return jsonify(job), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a job's status and result; ?wait=<seconds> waits for it to finish (long polling)"""
+    wait = request.args.get('wait', type=float)
+    if wait:
+        job = match_jobs.wait(job_id, min(max(wait, 0), MAX_JOB_WAIT))
+    else:
+        job = match_jobs.get(job_id)
+    
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    return jsonify(job)
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job(job_id):
+    """Stream a job's status changes as Server-Sent Events until it is done or failed"""
+    job = match_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    
+    def generate_events():
+        current = job
+        last_status = None
+        while current is not None:
+            if current["status"] != last_status:
+                last_status = current["status"]
+                yield f"event: {last_status}\ndata: {json.dumps(current)}\n\n"
+            if last_status in (DONE, FAILED):
+                return
+            current = match_jobs.wait(job_id, MAX_JOB_WAIT)
+    
+    return Response(
+        stream_with_context(generate_events()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.route('/api/analyze-preference', methods=['POST'])
 def analyze_preference():
@@ -105,7 +334,11 @@ def analyze_preference():
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "ok"})
+    return jsonify({
+        "status": "ok",
+        "preferenceCache": matcher.preference_cache.stats(),
+        "jobs": match_jobs.stats()
+    })
 
 def allowed_file(filename):
     """Check if file has an allowed extension"""
@@ -134,8 +367,7 @@ def upload_artwork():
         return jsonify({"error": "Title, year, and medium are required"}), 400
     
     # Find the artist
-    artist = next((a for a in DIGITAL_ARTISTS if a["artistId"] == artist_id), None)
-    if not artist:
+    if artist_id not in ARTIST_REPOSITORY:
         return jsonify({"error": "Artist not found"}), 404
     
     if file and allowed_file(file.filename):
@@ -152,7 +384,6 @@ def upload_artwork():
         
         # Create a new artwork entry
         new_artwork = {
-            "id": f"IMG{len(artist['completeGallery']) + 1:03d}",
             "title": title,
             "year": int(year) if year.isdigit() else year,
             "medium": medium,
@@ -160,8 +391,11 @@ def upload_artwork():
             "description": description or ""
         }
         
-        # Add to the artist's gallery
-        artist["completeGallery"].append(new_artwork)
+        # Add to the artist's gallery (gets the next gallery id)
+        new_artwork = ARTIST_REPOSITORY.add_gallery_item(artist_id, new_artwork)
+        
+        # Re-extract this artist's features on the next match request
+        matcher.feature_index.invalidate(artist_id)
         
         return jsonify({
             "success": True,
@@ -6,21 +6,135 @@ artwork gallery, and chatbot preferences.
 """
 
 import re
+import copy
+import heapq
 import string
-from typing import Dict, List, Any, Tuple
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 from collections import Counter
-from digital_artist_data import DIGITAL_ARTISTS
+from artist_repository import ARTIST_REPOSITORY
+from keyword_matcher import KeywordMatcher
+from preference_cache import PREFERENCE_ANALYSIS_CACHE, normalize_preference_text
+from metrics import timed, PREFERENCE_ANALYSIS, FEATURE_EXTRACTION, CANDIDATE_SCORING
+from artist_feature_index import ArtistFeatureIndex
+from vectorized_scoring import VectorizedScoringEngine
+from compatibility_matrix import CompatibilityMatrix
+from parallel_scoring import ParallelScoringPool
 
 class DigitalArtistMatcher:
     """
     A class to match digital artists for collaboration based on their profiles and preferences.
     """
     
-    def __init__(self):
-        """Initialize the DigitalArtistMatcher."""
-        self.artists = DIGITAL_ARTISTS
+    # Common digital art tools and software
+    KNOWN_TOOLS = {
+        "procreate", "photoshop", "illustrator", "after effects", "premiere", "indesign",
+        "blender", "zbrush", "substance painter", "maya", "3ds max", "cinema 4d", "c4d",
+        "lightroom", "capture one", "figma", "sketch", "xd", "clip studio", "toonboom",
+        "spine", "unity", "unreal", "touchdesigner", "resolume", "ableton", "ar", "vr",
+        "spark ar", "lens studio", "nft"
+    }
+    
+    # Keywords that identify art types in bios and gallery entries
+    ART_TYPE_KEYWORDS = {
+        "illustration": ["illustration", "illustrator", "illustrate"],
+        "animation": ["animation", "animator", "animate"],
+        "3d": ["3d", "blender", "zbrush", "maya", "substance", "model"],
+        "photography": ["photo", "photography", "photographer"],
+        "ui/ux": ["ui", "ux", "interface", "figma", "sketch", "xd"],
+        "concept art": ["concept art", "concept artist"],
+        "mural": ["mural", "street art"],
+        "nft": ["nft", "blockchain", "crypto"],
+        "ar/vr": ["ar", "vr", "augmented", "virtual", "filter"],
+        "motion graphics": ["motion", "motion graphics", "after effects"],
+        "video": ["video", "film", "cinema"],
+        "music visual": ["music", "audio", "sound", "spotify", "ableton"]
+    }
+    
+    # Keywords that identify requested art types in chatbot preferences
+    PREFERENCE_ART_TYPE_KEYWORDS = {
+        "illustration": ["illustration", "illustrator", "illustrate"],
+        "animation": ["animation", "animator", "animate", "2d animation"],
+        "3d": ["3d", "3d model", "3d artist", "sculptor"],
+        "photography": ["photo", "photography", "photographer"],
+        "ui/ux": ["ui", "ux", "interface", "ui/ux"],
+        "concept art": ["concept art", "concept artist"],
+        "mural": ["mural", "street art"],
+        "nft": ["nft"],
+        "ar/vr": ["ar", "vr", "augmented reality", "virtual reality", "filter"],
+        "motion graphics": ["motion", "motion graphics"],
+        "video": ["video", "film", "cinema"],
+        "music visual": ["music", "audio", "sound", "visual"]
+    }
+    
+    # Indicators of portfolio quality in artwork descriptions
+    QUALITY_INDICATORS = ["featured", "award", "exhibition", "museum", "published", "viral", 
+                          "1m", "million", "k+", "downloads", "views", "sold"]
+    
+    SCORING_ENGINES = ("python", "vectorized", "parallel")
+    
+    def __init__(self,
+                 scoring_engine: str = "python",
+                 repository=None,
+                 compatibility_matrix_path: str = None,
+                 feature_index: ArtistFeatureIndex = None):
+        """
+        Initialize the DigitalArtistMatcher.
+        
+        Args:
+            scoring_engine: "python" to score candidates one at a time, "vectorized" to
+                            score the whole catalog at once with NumPy, or "parallel" to
+                            score shards of large catalogs in a pool of worker processes
+            repository: Artist catalog to match against (the shared ARTIST_REPOSITORY when None)
+            compatibility_matrix_path: Optional all-pairs compatibility matrix file, used for
+                                       requests with the artist's stored preference (built
+                                       when missing or made for another catalog)
+            feature_index: Optional feature index of another DigitalArtistMatcher on the same
+                           catalog, shared instead of extracting the features again
+        """
+        if scoring_engine not in self.SCORING_ENGINES:
+            raise ValueError(f"Unknown scoring engine: {scoring_engine}")
+        
+        self.scoring_engine = scoring_engine
+        self.repository = repository if repository is not None else ARTIST_REPOSITORY
+        # Iterating the catalog streams it when it is stored in SQLite
+        self.artists = self.repository
         self.stopwords = self._get_stopwords()
         
+        # Compile every tool and art type keyword into a single-pass matcher
+        self.keyword_matcher = KeywordMatcher(
+            list(self.KNOWN_TOOLS)
+            + [keyword for keywords in self.ART_TYPE_KEYWORDS.values() for keyword in keywords]
+            + [keyword for keywords in self.PREFERENCE_ART_TYPE_KEYWORDS.values() for keyword in keywords]
+        )
+        
+        # Analyzed preferences, shared with every other preference analysis entry point
+        self.preference_cache = PREFERENCE_ANALYSIS_CACHE
+        
+        # Extract tools, art types and keywords once per artist, not once per request
+        # (also fills the repository's primary tool and art type indexes)
+        if feature_index is None:
+            feature_index = ArtistFeatureIndex(self.artists, self.compute_artist_features, self.repository)
+        self.feature_index = feature_index
+        
+        self.vectorized_engine = None
+        if scoring_engine == "vectorized":
+            self.vectorized_engine = VectorizedScoringEngine(
+                self.feature_index, self.KNOWN_TOOLS, self.ART_TYPE_KEYWORDS
+            )
+        
+        self.parallel_pool = None
+        if scoring_engine == "parallel":
+            self.parallel_pool = ParallelScoringPool(self.feature_index, self._score_features)
+        # Encoding used by find_collaborators_batch() with the python engine, built on first use
+        self._batch_engine = None
+        self._batch_engine_lock = threading.Lock()
+        
+        # Precomputed scores for every artist's stored preference
+        self.compatibility_matrix = None
+        if compatibility_matrix_path:
+            self.compatibility_matrix = CompatibilityMatrix(self, compatibility_matrix_path)
+        
     def _get_stopwords(self) -> set:
         """Get a set of common stopwords to filter out from text analysis."""
         return {
@@ -43,6 +157,21 @@ class DigitalArtistMatcher:
         Returns:
             Dict: Artist with extracted tools and skills
         """
+        enhanced_artist = artist.copy()
+        enhanced_artist["extracted_tools"] = self._extract_tool_profile(artist)
+        
+        return enhanced_artist
+    
+    def _extract_tool_profile(self, artist: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract tool frequencies and primary tools from an artist's bio and gallery.
+        
+        Args:
+            artist: Dictionary containing artist information
+            
+        Returns:
+            Dict: Tool counts and the three most used tools
+        """
         bio = artist.get("basicInfo", {}).get("bio", "")
         gallery = artist.get("completeGallery", [])
         
@@ -64,14 +193,10 @@ class DigitalArtistMatcher:
         # Count tool frequencies
         tool_counts = Counter(all_tools)
         
-        # Add tools to artist profile
-        enhanced_artist = artist.copy()
-        enhanced_artist["extracted_tools"] = {
+        return {
             "tools": dict(tool_counts),
             "primary_tools": [tool for tool, _ in tool_counts.most_common(3)]
         }
-        
-        return enhanced_artist
     
     def _extract_tools_from_text(self, text: str) -> List[str]:
         """
@@ -83,25 +208,8 @@ class DigitalArtistMatcher:
         Returns:
             List: Extracted tools
         """
-        # List of common digital art tools and software
-        known_tools = {
-            "procreate", "photoshop", "illustrator", "after effects", "premiere", "indesign",
-            "blender", "zbrush", "substance painter", "maya", "3ds max", "cinema 4d", "c4d",
-            "lightroom", "capture one", "figma", "sketch", "xd", "clip studio", "toonboom",
-            "spine", "unity", "unreal", "touchdesigner", "resolume", "ableton", "ar", "vr",
-            "spark ar", "lens studio", "nft"
-        }
-        
-        # Normalize text
-        text = text.lower()
-        
-        # Find all tools
-        found_tools = []
-        for tool in known_tools:
-            if tool in text:
-                found_tools.append(tool)
-        
-        return found_tools
+        # Find all tools in a single pass over the text
+        return [keyword for keyword in self.keyword_matcher.find(text) if keyword in self.KNOWN_TOOLS]
     
     def extract_art_types(self, artist: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -113,65 +221,133 @@ class DigitalArtistMatcher:
         Returns:
             Dict: Artist with extracted art types
         """
+        enhanced_artist = artist.copy()
+        enhanced_artist["extracted_art_types"] = self._extract_art_type_profile(artist)
+        
+        return enhanced_artist
+    
+    def _extract_art_type_profile(self, artist: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract weighted art type counts and primary art types from an artist's bio and gallery.
+        
+        Args:
+            artist: Dictionary containing artist information
+            
+        Returns:
+            Dict: Art type counts and the three strongest art types
+        """
         gallery = artist.get("completeGallery", [])
         bio = artist.get("basicInfo", {}).get("bio", "")
         
-        # Art types to look for
-        art_types = {
-            "illustration": ["illustration", "illustrator", "illustrate"],
-            "animation": ["animation", "animator", "animate"],
-            "3d": ["3d", "blender", "zbrush", "maya", "substance", "model"],
-            "photography": ["photo", "photography", "photographer"],
-            "ui/ux": ["ui", "ux", "interface", "figma", "sketch", "xd"],
-            "concept art": ["concept art", "concept artist"],
-            "mural": ["mural", "street art"],
-            "nft": ["nft", "blockchain", "crypto"],
-            "ar/vr": ["ar", "vr", "augmented", "virtual", "filter"],
-            "motion graphics": ["motion", "motion graphics", "after effects"],
-            "video": ["video", "film", "cinema"],
-            "music visual": ["music", "audio", "sound", "spotify", "ableton"]
-        }
-        
         # Count art type occurrences
-        art_type_counts = {art_type: 0 for art_type in art_types}
+        art_type_counts = {art_type: 0 for art_type in self.ART_TYPE_KEYWORDS}
         
         # Check bio
-        bio_lower = bio.lower()
-        for art_type, keywords in art_types.items():
+        bio_keywords = set(self.keyword_matcher.find(bio))
+        for art_type, keywords in self.ART_TYPE_KEYWORDS.items():
             for keyword in keywords:
-                if keyword in bio_lower:
+                if keyword in bio_keywords:
                     art_type_counts[art_type] += 3  # Higher weight for bio mentions
         
         # Check gallery
         for artwork in gallery:
-            title = artwork.get("title", "").lower()
-            medium = artwork.get("medium", "").lower()
-            description = artwork.get("description", "").lower()
+            title = artwork.get("title", "")
+            medium = artwork.get("medium", "")
+            description = artwork.get("description", "")
             
-            combined_text = f"{title} {medium} {description}"
+            combined_keywords = set(self.keyword_matcher.find(f"{title} {medium} {description}"))
             
-            for art_type, keywords in art_types.items():
+            for art_type, keywords in self.ART_TYPE_KEYWORDS.items():
                 for keyword in keywords:
-                    if keyword in combined_text:
+                    if keyword in combined_keywords:
                         art_type_counts[art_type] += 1
         
         # Filter to only art types with counts > 0
         active_art_types = {k: v for k, v in art_type_counts.items() if v > 0}
         
-        # Add art types to artist profile
-        enhanced_artist = artist.copy()
-        enhanced_artist["extracted_art_types"] = {
+        return {
             "art_types": active_art_types,
             "primary_art_types": [art_type for art_type, _ in 
                                  sorted(active_art_types.items(), key=lambda x: x[1], reverse=True)[:3]]
         }
+    
+    def compute_artist_features(self, artist: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compute the features used for compatibility scoring of a single artist.
         
-        return enhanced_artist
+        Args:
+            artist: Dictionary containing artist information
+            
+        Returns:
+            Dict: Extracted tools, art types, token set, experience years and portfolio counts
+        """
+        with timed(FEATURE_EXTRACTION):
+            tool_profile = self._extract_tool_profile(artist)
+            art_type_profile = self._extract_art_type_profile(artist)
+            
+            bio = artist.get("basicInfo", {}).get("bio", "")
+            gallery = artist.get("completeGallery", [])
+            
+            # Words from the bio and gallery descriptions, used for keyword relevance
+            tokens = set(self._preprocess_text(bio))
+            for artwork in gallery:
+                tokens.update(self._preprocess_text(artwork.get("description", "")))
+            
+            # Look for years of experience
+            experience_years = None
+            experience_match = re.search(r'(\d+)\+?\s*years?', bio)
+            if experience_match:
+                experience_years = int(experience_match.group(1))
+            
+            # Count artworks with at least one indicator of quality in the description
+            quality_count = 0
+            for artwork in gallery:
+                description = artwork.get("description", "").lower()
+                for indicator in self.QUALITY_INDICATORS:
+                    if indicator in description:
+                        quality_count += 1
+                        break
+        
+        return {
+            "tools": tool_profile["tools"],
+            "primary_tools": tool_profile["primary_tools"],
+            "art_types": art_type_profile["art_types"],
+            "primary_art_types": art_type_profile["primary_art_types"],
+            "tokens": tokens,
+            "experience_years": experience_years,
+            "gallery_size": len(gallery),
+            "quality_count": quality_count
+        }
     
     def analyze_chatbot_preference(self, preference_text: str) -> Dict[str, Any]:
         """
         Analyze chatbot preference text to extract requirements.
         
+        Results are cached per normalized preference text, so repeated preferences
+        are only analyzed once.
+        
+        Args:
+            preference_text: Chatbot preference text
+            
+        Returns:
+            Dict: Extracted requirements
+        """
+        with timed(PREFERENCE_ANALYSIS):
+            normalized_text = normalize_preference_text(preference_text)
+            analysis = self.preference_cache.get_or_compute(
+                (type(self).__name__, normalized_text),
+                lambda: self._analyze_preference_text(normalized_text)
+            )
+            
+            # Hand out a copy so callers cannot modify the cached entry
+            analysis = copy.deepcopy(analysis)
+            analysis["original_text"] = preference_text
+        return analysis
+    
+    def _analyze_preference_text(self, preference_text: str) -> Dict[str, Any]:
+        """
+        Extract tools, art types and keywords from chatbot preference text.
+        
         Args:
             preference_text: Chatbot preference text
             
@@ -180,29 +356,17 @@ class DigitalArtistMatcher:
         """
         text = preference_text.lower()
         
+        # Find every tool and art type keyword in one pass
+        found_keywords = self.keyword_matcher.find(text)
+        
         # Extract tools mentioned
-        tools = self._extract_tools_from_text(text)
+        tools = [keyword for keyword in found_keywords if keyword in self.KNOWN_TOOLS]
         
         # Extract art types mentioned
         art_types = []
-        art_type_keywords = {
-            "illustration": ["illustration", "illustrator", "illustrate"],
-            "animation": ["animation", "animator", "animate", "2d animation"],
-            "3d": ["3d", "3d model", "3d artist", "sculptor"],
-            "photography": ["photo", "photography", "photographer"],
-            "ui/ux": ["ui", "ux", "interface", "ui/ux"],
-            "concept art": ["concept art", "concept artist"],
-            "mural": ["mural", "street art"],
-            "nft": ["nft"],
-            "ar/vr": ["ar", "vr", "augmented reality", "virtual reality", "filter"],
-            "motion graphics": ["motion", "motion graphics"],
-            "video": ["video", "film", "cinema"],
-            "music visual": ["music", "audio", "sound", "visual"]
-        }
-        
-        for art_type, keywords in art_type_keywords.items():
+        for art_type, keywords in self.PREFERENCE_ART_TYPE_KEYWORDS.items():
             for keyword in keywords:
-                if keyword in text:
+                if keyword in found_keywords:
                     art_types.append(art_type)
                     break
         
@@ -239,51 +403,175 @@ class DigitalArtistMatcher:
     
     def find_collaborators(self, 
                           artist_id: str, 
-                          chatbot_preference: str = None) -> List[Dict[str, Any]]:
+                          chatbot_preference: str = None,
+                          top_k: int = None,
+                          require_keyword_overlap: bool = False) -> List[Dict[str, Any]]:
         """
         Find suitable collaborators for an artist based on their profile and chatbot preference.
         
         Args:
             artist_id: ID of the artist seeking collaborators
             chatbot_preference: Optional custom chatbot preference text
+            top_k: Optional maximum number of matches to return (all candidates when None)
+            require_keyword_overlap: Skip candidates sharing none of the preference keywords
+                                     (ignored when the preference has no keywords)
             
         Returns:
             List: Ranked list of potential collaborators with compatibility scores
         """
+        # Pick up profile and gallery changes made by other server workers
+        self.feature_index.sync()
+        
         # Find the requesting artist
-        requesting_artist = next((a for a in self.artists if a["artistId"] == artist_id), None)
+        requesting_artist = self.feature_index.get_artist(artist_id)
         if not requesting_artist:
             return []
         
         # Use provided chatbot preference or the one from the artist profile
+        stored_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
         if chatbot_preference is None:
-            chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
+            chatbot_preference = stored_preference
         
         # Analyze the chatbot preference
         preference_analysis = self.analyze_chatbot_preference(chatbot_preference)
         
-        # Enhance the requesting artist with tool and art type analysis
-        analyzed_requesting_artist = self.extract_art_types(
-            self.extract_tools_and_skills(requesting_artist)
-        )
+        # Candidates come pre-analyzed from the feature index
+        with timed(CANDIDATE_SCORING):
+            # Matches for the stored preference are a row of the compatibility matrix
+            matrix_ranking = None
+            if self.compatibility_matrix is not None and chatbot_preference == stored_preference and not require_keyword_overlap:
+                matrix_ranking = self.compatibility_matrix.rank(artist_id, top_k)
+            
+            if matrix_ranking is not None:
+                ranked_candidates = []
+                for candidate_id, _ in matrix_ranking:
+                    features = self.feature_index.get(candidate_id)
+                    ranked_candidates.append((self._score_features(features, preference_analysis), candidate_id, features))
+            elif self.parallel_pool is not None and self.parallel_pool.should_parallelize():
+                # Score shards of the catalog in the worker processes and merge their top_k
+                ranked_candidates = [
+                    (scored, candidate_id, self.feature_index.get(candidate_id))
+                    for scored, candidate_id in self.parallel_pool.rank(
+                        preference_analysis, top_k=top_k, exclude_artist_id=artist_id,
+                        require_keyword_overlap=require_keyword_overlap
+                    )
+                ]
+            elif self.vectorized_engine is not None:
+                # Score the whole catalog at once and select the top_k from the score array
+                ranked_candidates = self._ranked_features(self.vectorized_engine.rank(
+                    preference_analysis, top_k=top_k, exclude_artist_id=artist_id,
+                    require_keyword_overlap=require_keyword_overlap
+                ))
+            else:
+                # Keyword overlap for the whole catalog from the inverted token index
+                keyword_overlaps = self.feature_index.keyword_overlap_counts(preference_analysis.get("keywords", []))
+                if require_keyword_overlap and preference_analysis.get("keywords"):
+                    candidate_items = self.feature_index.items(keyword_overlaps)
+                else:
+                    candidate_items = self.feature_index.items()
+                
+                # Score every candidate numerically, keeping only the best top_k on a bounded heap
+                scored_candidates = (
+                    (
+                        self._score_features(features, preference_analysis, keyword_overlaps.get(candidate_id, 0)),
+                        candidate_id,
+                        features
+                    )
+                    for candidate_id, features in candidate_items
+                    if candidate_id != artist_id
+                )
+                if top_k is None:
+                    ranked_candidates = sorted(scored_candidates, key=lambda x: x[0][0], reverse=True)
+                else:
+                    ranked_candidates = heapq.nlargest(top_k, scored_candidates, key=lambda x: x[0][0])
         
-        # Analyze all available artists
-        analyzed_available_artists = []
-        for artist in self.artists:
-            if artist["artistId"] != artist_id:
-                analyzed_artist = self.extract_art_types(
-                    self.extract_tools_and_skills(artist)
+        return self._build_matches(ranked_candidates, preference_analysis, chatbot_preference)
+    
+    def find_collaborators_batch(self,
+                                 queries: List[Tuple[str, Optional[str]]],
+                                 top_k: int = None,
+                                 require_keyword_overlap: bool = False) -> List[List[Dict[str, Any]]]:
+        """
+        Find collaborators for several requests at once.
+        
+        All requests are scored together by the vectorized engine (one query-matrix by
+        artist-matrix product per chunk of requests) over the shared catalog features, and
+        each gets the same matches as a find_collaborators() call.
+        
+        Args:
+            queries: (artist ID, chatbot preference) pairs; a None preference uses the
+                     artist's stored one
+            top_k: Optional maximum number of matches per request (all candidates when None)
+            require_keyword_overlap: Skip candidates sharing none of a preference's keywords
+            
+        Returns:
+            List: Ranked matches per request, in request order (empty for unknown artists)
+        """
+        # Pick up profile and gallery changes made by other server workers
+        self.feature_index.sync()
+        
+        results = [[] for _ in queries]
+        requests = []
+        for position, (artist_id, chatbot_preference) in enumerate(queries):
+            requesting_artist = self.feature_index.get_artist(artist_id)
+            if not requesting_artist:
+                continue
+            
+            if chatbot_preference is None:
+                chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
+            requests.append((position, artist_id, chatbot_preference, self.analyze_chatbot_preference(chatbot_preference)))
+        
+        with timed(CANDIDATE_SCORING):
+            rankings = self.batch_scoring_engine().rank_batch(
+                [preference_analysis for _, _, _, preference_analysis in requests],
+                top_k=top_k,
+                exclude_artist_ids=[artist_id for _, artist_id, _, _ in requests],
+                require_keyword_overlap=require_keyword_overlap
+            )
+        
+        for (position, _, chatbot_preference, preference_analysis), ranking in zip(requests, rankings):
+            results[position] = self._build_matches(
+                self._ranked_features(ranking), preference_analysis, chatbot_preference
+            )
+        return results
+    
+    def batch_scoring_engine(self) -> VectorizedScoringEngine:
+        """Get the vectorized engine scoring batches (encoded on first use with the python engine)."""
+        if self.vectorized_engine is not None:
+            return self.vectorized_engine
+        with self._batch_engine_lock:
+            if self._batch_engine is None:
+                self._batch_engine = VectorizedScoringEngine(
+                    self.feature_index, self.KNOWN_TOOLS, self.ART_TYPE_KEYWORDS
                 )
-                analyzed_available_artists.append(analyzed_artist)
+            return self._batch_engine
+    
+    def _ranked_features(self, ranking: List[Tuple[str, int, Dict[str, int]]]) -> List[Tuple[Any, str, Dict[str, Any]]]:
+        """Pair a vectorized engine ranking with the candidates' features."""
+        return [
+            ((compatibility_score, score_breakdown), candidate_id, self.feature_index.get(candidate_id))
+            for candidate_id, compatibility_score, score_breakdown in ranking
+        ]
+    
+    def _build_matches(self,
+                       ranked_candidates: List[Tuple[Tuple[float, Dict[str, float]], str, Dict[str, Any]]],
+                       preference_analysis: Dict[str, Any],
+                       chatbot_preference: str) -> List[Dict[str, Any]]:
+        """
+        Build full match entries for ranked candidates.
         
-        # Calculate compatibility scores
+        Args:
+            ranked_candidates: ((score, score breakdown), candidate ID, features) tuples
+            preference_analysis: Analyzed chatbot preference
+            chatbot_preference: Chatbot preference text
+            
+        Returns:
+            List: Match entries
+        """
         collaborator_matches = []
-        for candidate in analyzed_available_artists:
-            compatibility_score, score_breakdown, insights = self._calculate_compatibility(
-                analyzed_requesting_artist, 
-                candidate, 
-                preference_analysis
-            )
+        for (compatibility_score, score_breakdown), candidate_id, features in ranked_candidates:
+            candidate = self.feature_index.analyzed_artist(candidate_id)
+            insights = self._build_insights(candidate, features, preference_analysis)
             
             collaborator_matches.append({
                 "artist": candidate,
@@ -293,15 +581,13 @@ class DigitalArtistMatcher:
                 "preference_text": chatbot_preference
             })
         
-        # Sort by compatibility score (highest first)
-        collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
-        
         return collaborator_matches
     
     def _calculate_compatibility(self, 
                                artist1: Dict[str, Any], 
                                artist2: Dict[str, Any], 
-                               preference_analysis: Dict[str, Any]) -> Tuple[float, Dict[str, float], List[str]]:
+                               preference_analysis: Dict[str, Any],
+                               artist2_features: Dict[str, Any] = None) -> Tuple[float, Dict[str, float], List[str]]:
         """
         Calculate compatibility score between two artists based on preference analysis.
         
@@ -309,118 +595,120 @@ class DigitalArtistMatcher:
             artist1: First artist profile with analysis
             artist2: Second artist profile with analysis
             preference_analysis: Analyzed chatbot preference
+            artist2_features: Optional precomputed features of artist2 (looked up in the
+                              feature index, or computed, when not provided)
             
         Returns:
             Tuple: Compatibility score (0-100), score breakdown, and list of insights
         """
-        insights = []
+        if artist2_features is None:
+            artist2_features = self.feature_index.get(artist2.get("artistId"))
+            if artist2_features is None:
+                artist2_features = self.compute_artist_features(artist2)
+        
+        total_score, score_breakdown = self._score_features(artist2_features, preference_analysis)
+        insights = self._build_insights(artist2, artist2_features, preference_analysis)
+        
+        return total_score, score_breakdown, insights
+    
+    @staticmethod
+    def _score_features(features: Dict[str, Any], 
+                        preference_analysis: Dict[str, Any],
+                        keyword_overlap: int = None) -> Tuple[float, Dict[str, float]]:
+        """
+        Calculate the numeric compatibility score of a candidate from its precomputed features.
+        
+        Args:
+            features: Precomputed features of the candidate artist
+            preference_analysis: Analyzed chatbot preference
+            keyword_overlap: Optional number of preference keywords found in the candidate's
+                             tokens (from the inverted token index); computed when not provided
+            
+        Returns:
+            Tuple: Compatibility score (0-100) and score breakdown
+        """
         score_breakdown = {}
         
         # 1. Tool match (30%)
-        requested_tools = set(preference_analysis.get("tools", []))
-        artist2_tools = set(artist2.get("extracted_tools", {}).get("primary_tools", []))
-        
-        tool_match_score = 0
+        requested_tools = preference_analysis.get("tools", [])
         if requested_tools:
-            matching_tools = requested_tools.intersection(artist2_tools)
-            tool_match_score = min(len(matching_tools) * 10, 30)
-            
-            if matching_tools:
-                insights.append(f"Uses requested tools: {', '.join(matching_tools)}")
+            matching_tools = set(requested_tools).intersection(features["primary_tools"])
+            score_breakdown["tool_match"] = min(len(matching_tools) * 10, 30)
         else:
             # If no specific tools requested, give partial score for having digital tools
-            tool_match_score = min(len(artist2_tools) * 5, 15)
-        
-        score_breakdown["tool_match"] = tool_match_score
+            score_breakdown["tool_match"] = min(len(features["primary_tools"]) * 5, 15)
         
         # 2. Art type match (30%)
-        requested_art_types = set(preference_analysis.get("art_types", []))
-        artist2_art_types = set(artist2.get("extracted_art_types", {}).get("primary_art_types", []))
-        
-        art_type_match_score = 0
+        requested_art_types = preference_analysis.get("art_types", [])
         if requested_art_types:
-            matching_art_types = requested_art_types.intersection(artist2_art_types)
-            art_type_match_score = min(len(matching_art_types) * 10, 30)
-            
-            if matching_art_types:
-                insights.append(f"Specializes in requested art types: {', '.join(matching_art_types)}")
+            matching_art_types = set(requested_art_types).intersection(features["primary_art_types"])
+            score_breakdown["art_type_match"] = min(len(matching_art_types) * 10, 30)
         else:
             # If no specific art types requested, give partial score for having digital art types
-            art_type_match_score = min(len(artist2_art_types) * 5, 15)
-        
-        score_breakdown["art_type_match"] = art_type_match_score
+            score_breakdown["art_type_match"] = min(len(features["primary_art_types"]) * 5, 15)
         
         # 3. Keyword relevance (20%)
-        preference_keywords = set(preference_analysis.get("keywords", []))
+        if keyword_overlap is None:
+            preference_keywords = set(preference_analysis.get("keywords", []))
+            keyword_overlap = len(preference_keywords.intersection(features["tokens"]))
+        score_breakdown["keyword_relevance"] = min(keyword_overlap * 5, 20)
         
-        # Extract keywords from artist2's bio and gallery descriptions
-        artist2_bio = artist2.get("basicInfo", {}).get("bio", "")
-        artist2_bio_words = set(self._preprocess_text(artist2_bio))
+        # 4. Experience level (10%)
+        years = features["experience_years"]
+        score_breakdown["experience"] = min(years * 2, 10) if years is not None else 0
         
-        artist2_descriptions = []
-        for artwork in artist2.get("completeGallery", []):
-            artist2_descriptions.append(artwork.get("description", ""))
+        # 5. Portfolio quality (10%)
+        # More artworks = better portfolio, plus artworks with indicators of quality
+        score_breakdown["portfolio_quality"] = (
+            min(features["gallery_size"] * 2, 5) + min(features["quality_count"], 5)
+        )
         
-        artist2_desc_words = set()
-        for desc in artist2_descriptions:
-            artist2_desc_words.update(self._preprocess_text(desc))
+        # Calculate total score
+        total_score = sum(score_breakdown.values())
         
-        artist2_words = artist2_bio_words.union(artist2_desc_words)
+        return total_score, score_breakdown
+    
+    def _build_insights(self, 
+                        artist: Dict[str, Any], 
+                        features: Dict[str, Any], 
+                        preference_analysis: Dict[str, Any]) -> List[str]:
+        """
+        Build the human-readable insights explaining a candidate's score.
         
-        keyword_match_score = 0
-        if preference_keywords:
-            matching_keywords = preference_keywords.intersection(artist2_words)
-            keyword_match_score = min(len(matching_keywords) * 5, 20)
+        Args:
+            artist: Candidate artist profile
+            features: Precomputed features of the candidate artist
+            preference_analysis: Analyzed chatbot preference
             
-            if matching_keywords:
-                insights.append(f"Profile matches key terms: {', '.join(list(matching_keywords)[:3])}")
-        
-        score_breakdown["keyword_relevance"] = keyword_match_score
-        
-        # 4. Experience level (10%)
-        experience_score = 0
-        bio = artist2.get("basicInfo", {}).get("bio", "")
-        
-        # Look for years of experience
-        experience_match = re.search(r'(\d+)\+?\s*years?', bio)
-        if experience_match:
-            years = int(experience_match.group(1))
-            experience_score = min(years * 2, 10)
-            insights.append(f"Has {years}+ years of experience")
-        
-        score_breakdown["experience"] = experience_score
-        
-        # 5. Portfolio quality (10%)
-        portfolio_score = 0
-        gallery = artist2.get("completeGallery", [])
+        Returns:
+            List: Insights about the match
+        """
+        insights = []
         
-        # More artworks = better portfolio
-        portfolio_score += min(len(gallery) * 2, 5)
+        matching_tools = set(preference_analysis.get("tools", [])).intersection(features["primary_tools"])
+        if matching_tools:
+            insights.append(f"Uses requested tools: {', '.join(matching_tools)}")
         
-        # Look for indicators of quality in descriptions
-        quality_indicators = ["featured", "award", "exhibition", "museum", "published", "viral", 
-                             "1m", "million", "k+", "downloads", "views", "sold"]
+        matching_art_types = set(preference_analysis.get("art_types", [])).intersection(
+            features["primary_art_types"]
+        )
+        if matching_art_types:
+            insights.append(f"Specializes in requested art types: {', '.join(matching_art_types)}")
         
-        quality_count = 0
-        for artwork in gallery:
-            description = artwork.get("description", "").lower()
-            for indicator in quality_indicators:
-                if indicator in description:
-                    quality_count += 1
-                    break
+        matching_keywords = set(preference_analysis.get("keywords", [])).intersection(features["tokens"])
+        if matching_keywords:
+            insights.append(f"Profile matches key terms: {', '.join(list(matching_keywords)[:3])}")
         
-        portfolio_score += min(quality_count, 5)
-        score_breakdown["portfolio_quality"] = portfolio_score
+        years = features["experience_years"]
+        if years is not None:
+            insights.append(f"Has {years}+ years of experience")
         
         # Add location insight
-        artist2_location = artist2.get("basicInfo", {}).get("location", "")
-        if artist2_location:
-            insights.append(f"Based in {artist2_location}")
+        artist_location = artist.get("basicInfo", {}).get("location", "")
+        if artist_location:
+            insights.append(f"Based in {artist_location}")
         
-        # Calculate total score
-        total_score = sum(score_breakdown.values())
-        
-        return total_score, score_breakdown, insights
+        return insights
 
 
 def format_match_output(match):
@@ -495,10 +783,10 @@ def run_example():
     chatbot_preference = "Looking for digital artists who work in Blender and After Effects for an animated NFT project. Need someone with experience in 3D and motion graphics."
     
     # Find collaborators
-    matches = matcher.find_collaborators(artist_id, chatbot_preference)
+    matches = matcher.find_collaborators(artist_id, chatbot_preference, top_k=3)
     
     # Get the requesting artist
-    requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+    requesting_artist = matcher.feature_index.get_artist(artist_id)
     
     # Print the requesting artist
     print("\n" + "="*80)
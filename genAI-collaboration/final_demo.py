@@ -42,7 +42,7 @@ def run_final_demo():
         
         # Get the requesting artist
         artist_id = scenario["artist_id"]
-        requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+        requesting_artist = matcher.repository.get(artist_id)
         
         # Analyze the preference
         preference = scenario["preference"]
@@ -58,7 +58,7 @@ def run_final_demo():
         print(format_project_requirements(preference, preference_analysis))
         
         # Find collaborators
-        matches = matcher.find_collaborators(artist_id, preference)
+        matches = matcher.find_collaborators(artist_id, preference, top_k=2)
         
         # Print the top 2 matches with detailed formatting
         if matches:
@@ -6,10 +6,15 @@ artwork gallery, and chatbot preferences, with enhanced detailed descriptions.
 """
 
 import re
+import copy
+import heapq
 import string
 from typing import Dict, List, Any, Tuple
 from collections import Counter
-from digital_artist_data import DIGITAL_ARTISTS
+from artist_repository import ARTIST_REPOSITORY
+from keyword_matcher import KeywordMatcher
+from preference_cache import PREFERENCE_ANALYSIS_CACHE, normalize_preference_text
+from metrics import timed, PREFERENCE_ANALYSIS, FEATURE_EXTRACTION, CANDIDATE_SCORING
 from detailed_match_formatter import format_detailed_match, format_project_requirements
 
 class FinalDigitalArtistMatcher:
@@ -18,11 +23,68 @@ class FinalDigitalArtistMatcher:
     with enhanced detailed descriptions.
     """
     
-    def __init__(self):
-        """Initialize the FinalDigitalArtistMatcher."""
-        self.artists = DIGITAL_ARTISTS
+    # Common digital art tools and software
+    KNOWN_TOOLS = {
+        "procreate", "photoshop", "illustrator", "after effects", "premiere", "indesign",
+        "blender", "zbrush", "substance painter", "maya", "3ds max", "cinema 4d", "c4d",
+        "lightroom", "capture one", "figma", "sketch", "xd", "clip studio", "toonboom",
+        "spine", "unity", "unreal", "touchdesigner", "resolume", "ableton", "ar", "vr",
+        "spark ar", "lens studio", "nft", "v-ray", "vray"
+    }
+    
+    # Keywords that identify art types in bios and gallery entries
+    ART_TYPE_KEYWORDS = {
+        "illustration": ["illustration", "illustrator", "illustrate"],
+        "animation": ["animation", "animator", "animate"],
+        "3d": ["3d", "blender", "zbrush", "maya", "substance", "model"],
+        "photography": ["photo", "photography", "photographer"],
+        "ui/ux": ["ui", "ux", "interface", "figma", "sketch", "xd"],
+        "concept art": ["concept art", "concept artist"],
+        "mural": ["mural", "street art"],
+        "nft": ["nft", "blockchain", "crypto"],
+        "ar/vr": ["ar", "vr", "augmented", "virtual", "filter"],
+        "motion graphics": ["motion", "motion graphics", "after effects"],
+        "video": ["video", "film", "cinema"],
+        "music visual": ["music", "audio", "sound", "spotify", "ableton"]
+    }
+    
+    # Keywords that identify requested art types in chatbot preferences
+    PREFERENCE_ART_TYPE_KEYWORDS = {
+        "illustration": ["illustration", "illustrator", "illustrate"],
+        "animation": ["animation", "animator", "animate", "2d animation"],
+        "3d": ["3d", "3d model", "3d artist", "sculptor"],
+        "photography": ["photo", "photography", "photographer"],
+        "ui/ux": ["ui", "ux", "interface", "ui/ux"],
+        "concept art": ["concept art", "concept artist"],
+        "mural": ["mural", "street art"],
+        "nft": ["nft"],
+        "ar/vr": ["ar", "vr", "augmented reality", "virtual reality", "filter"],
+        "motion graphics": ["motion", "motion graphics"],
+        "video": ["video", "film", "cinema"],
+        "music visual": ["music", "audio", "sound", "visual"]
+    }
+    
+    def __init__(self, repository=None):
+        """
+        Initialize the FinalDigitalArtistMatcher.
+        
+        Args:
+            repository: Artist catalog to match against (the shared ARTIST_REPOSITORY when None)
+        """
+        self.repository = repository if repository is not None else ARTIST_REPOSITORY
+        self.artists = self.repository
         self.stopwords = self._get_stopwords()
         
+        # Compile every tool and art type keyword into a single-pass matcher
+        self.keyword_matcher = KeywordMatcher(
+            list(self.KNOWN_TOOLS)
+            + [keyword for keywords in self.ART_TYPE_KEYWORDS.values() for keyword in keywords]
+            + [keyword for keywords in self.PREFERENCE_ART_TYPE_KEYWORDS.values() for keyword in keywords]
+        )
+        
+        # Analyzed preferences, shared with every other preference analysis entry point
+        self.preference_cache = PREFERENCE_ANALYSIS_CACHE
+        
     def _get_stopwords(self) -> set:
         """Get a set of common stopwords to filter out from text analysis."""
         return {
@@ -85,25 +147,8 @@ class FinalDigitalArtistMatcher:
         Returns:
             List: Extracted tools
         """
-        # List of common digital art tools and software
-        known_tools = {
-            "procreate", "photoshop", "illustrator", "after effects", "premiere", "indesign",
-            "blender", "zbrush", "substance painter", "maya", "3ds max", "cinema 4d", "c4d",
-            "lightroom", "capture one", "figma", "sketch", "xd", "clip studio", "toonboom",
-            "spine", "unity", "unreal", "touchdesigner", "resolume", "ableton", "ar", "vr",
-            "spark ar", "lens studio", "nft", "v-ray", "vray"
-        }
-        
-        # Normalize text
-        text = text.lower()
-        
-        # Find all tools
-        found_tools = []
-        for tool in known_tools:
-            if tool in text:
-                found_tools.append(tool)
-        
-        return found_tools
+        # Find all tools in a single pass over the text
+        return [keyword for keyword in self.keyword_matcher.find(text) if keyword in self.KNOWN_TOOLS]
     
     def extract_art_types(self, artist: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -118,43 +163,27 @@ class FinalDigitalArtistMatcher:
         gallery = artist.get("completeGallery", [])
         bio = artist.get("basicInfo", {}).get("bio", "")
         
-        # Art types to look for
-        art_types = {
-            "illustration": ["illustration", "illustrator", "illustrate"],
-            "animation": ["animation", "animator", "animate"],
-            "3d": ["3d", "blender", "zbrush", "maya", "substance", "model"],
-            "photography": ["photo", "photography", "photographer"],
-            "ui/ux": ["ui", "ux", "interface", "figma", "sketch", "xd"],
-            "concept art": ["concept art", "concept artist"],
-            "mural": ["mural", "street art"],
-            "nft": ["nft", "blockchain", "crypto"],
-            "ar/vr": ["ar", "vr", "augmented", "virtual", "filter"],
-            "motion graphics": ["motion", "motion graphics", "after effects"],
-            "video": ["video", "film", "cinema"],
-            "music visual": ["music", "audio", "sound", "spotify", "ableton"]
-        }
-        
         # Count art type occurrences
-        art_type_counts = {art_type: 0 for art_type in art_types}
+        art_type_counts = {art_type: 0 for art_type in self.ART_TYPE_KEYWORDS}
         
         # Check bio
-        bio_lower = bio.lower()
-        for art_type, keywords in art_types.items():
+        bio_keywords = set(self.keyword_matcher.find(bio))
+        for art_type, keywords in self.ART_TYPE_KEYWORDS.items():
             for keyword in keywords:
-                if keyword in bio_lower:
+                if keyword in bio_keywords:
                     art_type_counts[art_type] += 3  # Higher weight for bio mentions
         
         # Check gallery
         for artwork in gallery:
-            title = artwork.get("title", "").lower()
-            medium = artwork.get("medium", "").lower()
-            description = artwork.get("description", "").lower()
+            title = artwork.get("title", "")
+            medium = artwork.get("medium", "")
+            description = artwork.get("description", "")
             
-            combined_text = f"{title} {medium} {description}"
+            combined_keywords = set(self.keyword_matcher.find(f"{title} {medium} {description}"))
             
-            for art_type, keywords in art_types.items():
+            for art_type, keywords in self.ART_TYPE_KEYWORDS.items():
                 for keyword in keywords:
-                    if keyword in combined_text:
+                    if keyword in combined_keywords:
                         art_type_counts[art_type] += 1
         
         # Filter to only art types with counts > 0
@@ -174,6 +203,31 @@ class FinalDigitalArtistMatcher:
         """
         Analyze chatbot preference text to extract requirements.
         
+        Results are cached per normalized preference text, so repeated preferences
+        are only analyzed once.
+        
+        Args:
+            preference_text: Chatbot preference text
+            
+        Returns:
+            Dict: Extracted requirements
+        """
+        with timed(PREFERENCE_ANALYSIS):
+            normalized_text = normalize_preference_text(preference_text)
+            analysis = self.preference_cache.get_or_compute(
+                (type(self).__name__, normalized_text),
+                lambda: self._analyze_preference_text(normalized_text)
+            )
+            
+            # Hand out a copy so callers cannot modify the cached entry
+            analysis = copy.deepcopy(analysis)
+            analysis["original_text"] = preference_text
+        return analysis
+    
+    def _analyze_preference_text(self, preference_text: str) -> Dict[str, Any]:
+        """
+        Extract tools, art types and keywords from chatbot preference text.
+        
         Args:
             preference_text: Chatbot preference text
             
@@ -182,29 +236,17 @@ class FinalDigitalArtistMatcher:
         """
         text = preference_text.lower()
         
+        # Find every tool and art type keyword in one pass
+        found_keywords = self.keyword_matcher.find(text)
+        
         # Extract tools mentioned
-        tools = self._extract_tools_from_text(text)
+        tools = [keyword for keyword in found_keywords if keyword in self.KNOWN_TOOLS]
         
         # Extract art types mentioned
         art_types = []
-        art_type_keywords = {
-            "illustration": ["illustration", "illustrator", "illustrate"],
-            "animation": ["animation", "animator", "animate", "2d animation"],
-            "3d": ["3d", "3d model", "3d artist", "sculptor"],
-            "photography": ["photo", "photography", "photographer"],
-            "ui/ux": ["ui", "ux", "interface", "ui/ux"],
-            "concept art": ["concept art", "concept artist"],
-            "mural": ["mural", "street art"],
-            "nft": ["nft"],
-            "ar/vr": ["ar", "vr", "augmented reality", "virtual reality", "filter"],
-            "motion graphics": ["motion", "motion graphics"],
-            "video": ["video", "film", "cinema"],
-            "music visual": ["music", "audio", "sound", "visual"]
-        }
-        
-        for art_type, keywords in art_type_keywords.items():
+        for art_type, keywords in self.PREFERENCE_ART_TYPE_KEYWORDS.items():
             for keyword in keywords:
-                if keyword in text:
+                if keyword in found_keywords:
                     art_types.append(art_type)
                     break
         
@@ -241,19 +283,21 @@ class FinalDigitalArtistMatcher:
     
     def find_collaborators(self, 
                           artist_id: str, 
-                          chatbot_preference: str = None) -> List[Dict[str, Any]]:
+                          chatbot_preference: str = None,
+                          top_k: int = None) -> List[Dict[str, Any]]:
         """
         Find suitable collaborators for an artist based on their profile and chatbot preference.
         
         Args:
             artist_id: ID of the artist seeking collaborators
             chatbot_preference: Optional custom chatbot preference text
+            top_k: Optional maximum number of matches to return (all candidates when None)
             
         Returns:
             List: Ranked list of potential collaborators with compatibility scores
         """
         # Find the requesting artist
-        requesting_artist = next((a for a in self.artists if a["artistId"] == artist_id), None)
+        requesting_artist = self.repository.get(artist_id)
         if not requesting_artist:
             return []
         
@@ -264,41 +308,48 @@ class FinalDigitalArtistMatcher:
         # Analyze the chatbot preference
         preference_analysis = self.analyze_chatbot_preference(chatbot_preference)
         
-        # Enhance the requesting artist with tool and art type analysis
-        analyzed_requesting_artist = self.extract_art_types(
-            self.extract_tools_and_skills(requesting_artist)
-        )
-        
-        # Analyze all available artists
-        analyzed_available_artists = []
-        for artist in self.artists:
-            if artist["artistId"] != artist_id:
-                analyzed_artist = self.extract_art_types(
-                    self.extract_tools_and_skills(artist)
-                )
-                analyzed_available_artists.append(analyzed_artist)
-        
-        # Calculate compatibility scores
-        collaborator_matches = []
-        for candidate in analyzed_available_artists:
-            compatibility_score, score_breakdown, insights = self._calculate_compatibility(
-                analyzed_requesting_artist, 
-                candidate, 
-                preference_analysis
+        with timed(FEATURE_EXTRACTION):
+            # Enhance the requesting artist with tool and art type analysis
+            analyzed_requesting_artist = self.extract_art_types(
+                self.extract_tools_and_skills(requesting_artist)
             )
             
+            # Analyze all available artists
+            analyzed_available_artists = []
+            for artist in self.artists:
+                if artist["artistId"] != artist_id:
+                    analyzed_artist = self.extract_art_types(
+                        self.extract_tools_and_skills(artist)
+                    )
+                    analyzed_available_artists.append(analyzed_artist)
+        
+        with timed(CANDIDATE_SCORING):
+            # Score every candidate once, keeping only the best top_k on a bounded heap
+            scored_candidates = (
+                (self._score_compatibility(
+                    analyzed_requesting_artist, 
+                    candidate, 
+                    preference_analysis
+                ), candidate)
+                for candidate in analyzed_available_artists
+            )
+            if top_k is None:
+                ranked_candidates = sorted(scored_candidates, key=lambda x: x[0][0], reverse=True)
+            else:
+                ranked_candidates = heapq.nlargest(top_k, scored_candidates, key=lambda x: x[0][0])
+        
+        # Build insights and match entries only for the surviving candidates
+        collaborator_matches = []
+        for (compatibility_score, score_breakdown, matches), candidate in ranked_candidates:
             collaborator_matches.append({
                 "artist": candidate,
                 "compatibility_score": compatibility_score,
                 "score_breakdown": score_breakdown,
-                "insights": insights,
+                "insights": self._build_insights(candidate, matches),
                 "preference_text": chatbot_preference,
                 "preference_analysis": preference_analysis
             })
         
-        # Sort by compatibility score (highest first)
-        collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
-        
         return collaborator_matches
     
     def _calculate_compatibility(self, 
@@ -316,8 +367,27 @@ class FinalDigitalArtistMatcher:
         Returns:
             Tuple: Compatibility score (0-100), score breakdown, and list of insights
         """
-        insights = []
+        total_score, score_breakdown, matches = self._score_compatibility(artist1, artist2, preference_analysis)
+        return total_score, score_breakdown, self._build_insights(artist2, matches)
+    
+    def _score_compatibility(self, 
+                             artist1: Dict[str, Any], 
+                             artist2: Dict[str, Any], 
+                             preference_analysis: Dict[str, Any]) -> Tuple[float, Dict[str, float], Dict[str, Any]]:
+        """
+        Score two artists' compatibility, keeping what matched for _build_insights().
+        
+        Args:
+            artist1: First artist profile with analysis
+            artist2: Second artist profile with analysis
+            preference_analysis: Analyzed chatbot preference
+            
+        Returns:
+            Tuple: Compatibility score (0-100), score breakdown, and the matched tools, art
+                   types, keywords and years of experience
+        """
         score_breakdown = {}
+        matches = {"tools": set(), "art_types": set(), "keywords": set(), "years": None}
         
         # 1. Tool match (30%)
         requested_tools = set(preference_analysis.get("tools", []))
@@ -325,11 +395,8 @@ class FinalDigitalArtistMatcher:
         
         tool_match_score = 0
         if requested_tools:
-            matching_tools = requested_tools.intersection(artist2_tools)
-            tool_match_score = min(len(matching_tools) * 10, 30)
-            
-            if matching_tools:
-                insights.append(f"Uses requested tools: {', '.join(matching_tools)}")
+            matches["tools"] = requested_tools.intersection(artist2_tools)
+            tool_match_score = min(len(matches["tools"]) * 10, 30)
         else:
             # If no specific tools requested, give partial score for having digital tools
             tool_match_score = min(len(artist2_tools) * 5, 15)
@@ -342,11 +409,8 @@ class FinalDigitalArtistMatcher:
         
         art_type_match_score = 0
         if requested_art_types:
-            matching_art_types = requested_art_types.intersection(artist2_art_types)
-            art_type_match_score = min(len(matching_art_types) * 10, 30)
-            
-            if matching_art_types:
-                insights.append(f"Specializes in requested art types: {', '.join(matching_art_types)}")
+            matches["art_types"] = requested_art_types.intersection(artist2_art_types)
+            art_type_match_score = min(len(matches["art_types"]) * 10, 30)
         else:
             # If no specific art types requested, give partial score for having digital art types
             art_type_match_score = min(len(artist2_art_types) * 5, 15)
@@ -372,11 +436,8 @@ class FinalDigitalArtistMatcher:
         
         keyword_match_score = 0
         if preference_keywords:
-            matching_keywords = preference_keywords.intersection(artist2_words)
-            keyword_match_score = min(len(matching_keywords) * 5, 20)
-            
-            if matching_keywords:
-                insights.append(f"Profile matches key terms: {', '.join(list(matching_keywords)[:3])}")
+            matches["keywords"] = preference_keywords.intersection(artist2_words)
+            keyword_match_score = min(len(matches["keywords"]) * 5, 20)
         
         score_breakdown["keyword_relevance"] = keyword_match_score
         
@@ -387,9 +448,8 @@ class FinalDigitalArtistMatcher:
         # Look for years of experience
         experience_match = re.search(r'(\d+)\+?\s*years?', bio)
         if experience_match:
-            years = int(experience_match.group(1))
-            experience_score = min(years * 2, 10)
-            insights.append(f"Has {years}+ years of experience")
+            matches["years"] = int(experience_match.group(1))
+            experience_score = min(matches["years"] * 2, 10)
         
         score_breakdown["experience"] = experience_score
         
@@ -415,15 +475,38 @@ class FinalDigitalArtistMatcher:
         portfolio_score += min(quality_count, 5)
         score_breakdown["portfolio_quality"] = portfolio_score
         
+        # Calculate total score
+        total_score = sum(score_breakdown.values())
+        
+        return total_score, score_breakdown, matches
+    
+    def _build_insights(self, artist2: Dict[str, Any], matches: Dict[str, Any]) -> List[str]:
+        """
+        Describe why a candidate matches, from what _score_compatibility() found.
+        
+        Args:
+            artist2: Candidate artist profile
+            matches: Matched tools, art types, keywords and years of experience
+            
+        Returns:
+            List: Insights about the match
+        """
+        insights = []
+        if matches["tools"]:
+            insights.append(f"Uses requested tools: {', '.join(matches['tools'])}")
+        if matches["art_types"]:
+            insights.append(f"Specializes in requested art types: {', '.join(matches['art_types'])}")
+        if matches["keywords"]:
+            insights.append(f"Profile matches key terms: {', '.join(list(matches['keywords'])[:3])}")
+        if matches["years"] is not None:
+            insights.append(f"Has {matches['years']}+ years of experience")
+        
         # Add location insight
         artist2_location = artist2.get("basicInfo", {}).get("location", "")
         if artist2_location:
             insights.append(f"Based in {artist2_location}")
         
-        # Calculate total score
-        total_score = sum(score_breakdown.values())
-        
-        return total_score, score_breakdown, insights
+        return insights
 
 
 def run_example():
@@ -440,10 +523,10 @@ def run_example():
     chatbot_preference = "Looking for a 3D artist who specializes in architectural visualization using Blender and V-Ray. Need someone with experience in photorealistic rendering and environment design for a luxury real estate project. Must have at least 3 years of experience and a portfolio that demonstrates attention to lighting, materials, and spatial composition."
     
     # Find collaborators
-    matches = matcher.find_collaborators(artist_id, chatbot_preference)
+    matches = matcher.find_collaborators(artist_id, chatbot_preference, top_k=1)
     
     # Get the requesting artist
-    requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+    requesting_artist = matcher.repository.get(artist_id)
     
     # Analyze the preference
     preference_analysis = matcher.analyze_chatbot_preference(chatbot_preference)
@@ -3,22 +3,37 @@ Final Digital Artist Collaboration Matcher with IBM watsonx.ai integration
 """
 
 import json
-from typing import Dict, List, Any
-from ibm_watsonx_ai import APIClient
+import copy
+import time
+import heapq
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Any, Iterator, Tuple
 from ibm_watsonx_ai import Credentials
-from ibm_watsonx_ai.foundation_models import ModelInference
-from digital_artist_data import DIGITAL_ARTISTS
+from artist_repository import ARTIST_REPOSITORY
 from config_updated import WATSON_API_KEY, WATSON_PROJECT_ID
+from llm_response_cache import LLM_RESPONSE_CACHE
+from model_initializer import BackgroundModelInitializer
 from detailed_match_formatter import format_detailed_match, format_project_requirements
+from preference_cache import PREFERENCE_ANALYSIS_CACHE, normalize_preference_text
+from metrics import timed, log_sampled, PREFERENCE_ANALYSIS, CANDIDATE_SCORING, LLM_CALL, INSIGHT_PARSING
 
 class FinalWatsonXArtistMatcher:
     """
     Final implementation of digital artist matcher with IBM watsonx.ai integration.
     """
     
+    # Minimum rule-based score for a candidate to get AI-generated insights
+    AI_INSIGHT_MIN_SCORE = 45
+    
+    # Concurrent AI insight requests, and seconds to wait for them before falling back
+    # to rule-based insights
+    INSIGHT_WORKERS = 8
+    INSIGHT_TIMEOUT = 20.0
+    
     def __init__(self):
         """Initialize the FinalWatsonXArtistMatcher with IBM watsonx credentials."""
-        self.artists = DIGITAL_ARTISTS
+        self.repository = ARTIST_REPOSITORY
+        self.artists = self.repository
         self.api_key = WATSON_API_KEY
         self.project_id = WATSON_PROJECT_ID
         
@@ -28,8 +43,6 @@ class FinalWatsonXArtistMatcher:
             url="https://us-south.ml.cloud.ibm.com"  # Using the US South region endpoint
         )
         
-        self.client = APIClient(self.credentials)
-        
         # List of supported models to try
         self.models = [
             "ibm/granite-13b-instruct-v2",
@@ -37,45 +50,131 @@ class FinalWatsonXArtistMatcher:
             "meta-llama/llama-3-3-70b-instruct"
         ]
         
-        # Try to initialize with a working model
-        self.model = None
-        for model_id in self.models:
-            try:
-                print(f"Trying to initialize with model: {model_id}")
-                self.model = ModelInference(
-                    model_id=model_id,
-                    api_client=self.client,
-                    project_id=self.project_id,
-                    params={
-                        "decoding_method": "greedy",
-                        "max_new_tokens": 500,
-                        "min_new_tokens": 50
-                    }
-                )
-                # Test the model with a simple prompt
-                test_response = self.model.generate_text("Hello watsonx!")
-                print(f"Model {model_id} initialized successfully")
-                break
-            except Exception as e:
-                print(f"Error initializing model {model_id}: {e}")
-                self.model = None
+        # Analyzed preferences, shared with every other preference analysis entry point
+        self.preference_cache = PREFERENCE_ANALYSIS_CACHE
         
-        if self.model is None:
-            print("WARNING: Could not initialize any watsonx.ai model. Using fallback methods.")
+        # Greedy decoding, so responses can be cached per model, parameters and prompt
+        self.model_params = {
+            "decoding_method": "greedy",
+            "max_new_tokens": 500,
+            "min_new_tokens": 50
+        }
+        self.llm_cache = LLM_RESPONSE_CACHE
+        
+        # Long-lived pool for insight requests, shared by all find_collaborators calls
+        self.insight_executor = ThreadPoolExecutor(
+            max_workers=self.INSIGHT_WORKERS,
+            thread_name_prefix="watsonx-insights"
+        )
+        
+        # Probe the models in the background and route requests across them; until one is
+        # confirmed healthy, self.model is None and the rule-based fallbacks are used
+        self.model_initializer = BackgroundModelInitializer(
+            self.credentials, self.project_id, self.models, self.model_params
+        )
+    
+    @property
+    def model(self):
+        """
+        Router over the watsonx.ai models, or None until one is confirmed healthy or while
+        every model's circuit breaker is open (the rule-based fallbacks are used then).
+        """
+        model = self.model_initializer.model
+        if model is None or not model.available():
+            return None
+        return model
+    
+    @property
+    def model_id(self) -> str:
+        """ID of the watsonx.ai model requests are currently routed to, or None."""
+        return self.model_initializer.model_id
+    
+    @property
+    def client(self):
+        """The watsonx.ai API client, or None until it has been created."""
+        return self.model_initializer.client
+    
+    def _generate_text(self, prompt: str) -> str:
+        """
+        Generate text with the fastest healthy model, reusing a cached response when a
+        routable model was sent the same decoding parameters and prompt before.
+        
+        Args:
+            prompt: Prompt text
+            
+        Returns:
+            str: Generated text
+        """
+        return self._generate_text_with_model(prompt)[0]
+    
+    def _generate_text_with_model(self, prompt: str) -> Tuple[str, str]:
+        """
+        Generate text like _generate_text, also telling which model answered.
+        
+        Args:
+            prompt: Prompt text
+            
+        Returns:
+            Tuple: Generated text and the ID of the model that produced it
+        """
+        router = self.model_initializer.model
+        for model_id in router.route():
+            cached_response = self.llm_cache.get(model_id, self.model_params, prompt)
+            if cached_response is not None:
+                return cached_response, model_id
+        
+        # Raises ModelUnavailableError when every breaker is open; callers fall back to rules
+        with timed(LLM_CALL):
+            response, model_id = router.generate(prompt)
+        self.llm_cache.set(model_id, self.model_params, prompt, response)
+        return response, model_id
     
     def analyze_chatbot_preference(self, preference_text: str) -> Dict[str, Any]:
         """
         Analyze chatbot preference using watsonx.ai or fallback to rule-based analysis.
         
+        Successful watsonx.ai analyses are cached per model and normalized preference text,
+        so a repeated preference does not cost another LLM round trip. A cached analysis is
+        reused only from a model the request could currently be routed to.
+        
         Args:
             preference_text: Chatbot preference text
             
         Returns:
             Dict: Structured preference analysis
         """
-        if self.model is None:
-            return self._analyze_preference_rule_based(preference_text)
+        with timed(PREFERENCE_ANALYSIS):
+            if self.model is None:
+                return self._analyze_preference_rule_based(preference_text)
+            
+            normalized_text = normalize_preference_text(preference_text)
+            analysis = None
+            for model_id in self.model_initializer.model.route():
+                analysis = self.preference_cache.get((f"watsonx:{model_id}", normalized_text))
+                if analysis is not None:
+                    break
+            
+            if analysis is None:
+                analysis, model_id = self._analyze_preference_with_model(preference_text)
+                if analysis is None:
+                    # Fallback results are not cached, so the model is asked again next time
+                    return self._analyze_preference_rule_based(preference_text)
+                self.preference_cache.set((f"watsonx:{model_id}", normalized_text), analysis)
+            
+            # Hand out a copy so callers cannot modify the cached entry
+            return copy.deepcopy(analysis)
+    
+    def _analyze_preference_with_model(self, preference_text: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Analyze chatbot preference with watsonx.ai.
         
+        Args:
+            preference_text: Chatbot preference text
+            
+        Returns:
+            Tuple: Structured preference analysis and the ID of the model that produced it;
+                   (None, None) if the model call or parsing failed
+        """
         prompt = f"""
         Analyze the following digital artist collaboration preference and extract key requirements:
         
@@ -92,9 +191,8 @@ class FinalWatsonXArtistMatcher:
         """
         
         try:
-            response = self.model.generate_text(prompt)
-            print("Raw response from watsonx.ai:")
-            print(response)
+            response, model_id = self._generate_text_with_model(prompt)
+            log_sampled("watsonx_raw_response", request="preference_analysis", response=response)
             
             # Try to extract JSON from the response
             try:
@@ -149,18 +247,18 @@ class FinalWatsonXArtistMatcher:
                         "art_types": art_types,
                         "keywords": keywords,
                         "raw_analysis": analysis
-                    }
+                    }, model_id
                 else:
-                    # Fallback to rule-based analysis
-                    return self._analyze_preference_rule_based(preference_text)
+                    # No JSON in the response; the caller falls back to rule-based analysis
+                    return None, None
             
             except json.JSONDecodeError:
                 print("Error parsing JSON from watsonx response")
-                return self._analyze_preference_rule_based(preference_text)
+                return None, None
         
         except Exception as e:
             print(f"Error calling watsonx.ai: {e}")
-            return self._analyze_preference_rule_based(preference_text)
+            return None, None
     
     def _analyze_preference_rule_based(self, preference_text: str) -> Dict[str, Any]:
         """
@@ -225,9 +323,24 @@ class FinalWatsonXArtistMatcher:
         Returns:
             Dict: Compatibility score and breakdown
         """
+        compatibility = self._score_compatibility(artist, preference_analysis)
+        return self._describe_compatibility(compatibility, artist, preference_analysis)
+    
+    def _score_compatibility(self, 
+                             artist: Dict[str, Any], 
+                             preference_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Calculate only the numeric compatibility score and breakdown, for ranking candidates.
+        
+        Args:
+            artist: Artist profile
+            preference_analysis: Analyzed preference
+            
+        Returns:
+            Dict: Compatibility score and breakdown, without level and insights
+        """
         # Extract artist information
         artist_bio = artist.get("basicInfo", {}).get("bio", "").lower()
-        artist_name = artist.get("basicInfo", {}).get("name", "")
         
         # Initialize scores
         tool_score = 0
@@ -279,6 +392,40 @@ class FinalWatsonXArtistMatcher:
         # Calculate total score
         total_score = tool_score + art_type_score + keyword_score + experience_score + portfolio_score
         
+        return {
+            "score": total_score,
+            "tool_score": tool_score,
+            "art_type_score": art_type_score,
+            "keyword_score": keyword_score,
+            "experience_score": experience_score,
+            "portfolio_score": portfolio_score
+        }
+    
+    def _describe_compatibility(self, 
+                                compatibility: Dict[str, Any], 
+                                artist: Dict[str, Any], 
+                                preference_analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add the compatibility level and rule-based insights to a numeric compatibility.
+        
+        Args:
+            compatibility: Numeric compatibility from _score_compatibility
+            artist: Artist profile
+            preference_analysis: Analyzed preference
+            
+        Returns:
+            Dict: Compatibility score, breakdown, level and insights
+        """
+        artist_bio = artist.get("basicInfo", {}).get("bio", "").lower()
+        tools = preference_analysis.get("tools", [])
+        art_types = preference_analysis.get("art_types", [])
+        keywords = preference_analysis.get("keywords", [])
+        total_score = compatibility["score"]
+        tool_score = compatibility["tool_score"]
+        art_type_score = compatibility["art_type_score"]
+        keyword_score = compatibility["keyword_score"]
+        experience_score = compatibility["experience_score"]
+        
         # Generate compatibility level
         compatibility_level = ""
         if total_score >= 75:
@@ -329,16 +476,7 @@ class FinalWatsonXArtistMatcher:
         if artist_location:
             insights.append(f"Based in {artist_location}")
         
-        return {
-            "score": total_score,
-            "tool_score": tool_score,
-            "art_type_score": art_type_score,
-            "keyword_score": keyword_score,
-            "experience_score": experience_score,
-            "portfolio_score": portfolio_score,
-            "compatibility_level": compatibility_level,
-            "insights": insights
-        }
+        return dict(compatibility, compatibility_level=compatibility_level, insights=insights)
     
     def generate_ai_insights(self, 
                           artist1: Dict[str, Any], 
@@ -401,27 +539,27 @@ class FinalWatsonXArtistMatcher:
         """
         
         try:
-            response = self.model.generate_text(prompt)
-            print("Raw response from watsonx.ai:")
-            print(response)
+            response = self._generate_text(prompt)
+            log_sampled("watsonx_raw_response", request="insights", response=response)
             
-            # Try to extract JSON from the response
-            try:
-                # Find JSON in the response
-                json_start = response.find('[')
-                json_end = response.rfind(']') + 1
+            with timed(INSIGHT_PARSING):
+                # Try to extract JSON from the response
+                try:
+                    # Find JSON in the response
+                    json_start = response.find('[')
+                    json_end = response.rfind(']') + 1
+                    
+                    if json_start >= 0 and json_end > json_start:
+                        json_str = response[json_start:json_end]
+                        insights = json.loads(json_str)
+                        return insights
+                    else:
+                        # Extract insights manually
+                        return self._extract_insights_from_text(response)
                 
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    insights = json.loads(json_str)
-                    return insights
-                else:
-                    # Extract insights manually
+                except json.JSONDecodeError:
+                    print("Error parsing JSON from watsonx response")
                     return self._extract_insights_from_text(response)
-            
-            except json.JSONDecodeError:
-                print("Error parsing JSON from watsonx response")
-                return self._extract_insights_from_text(response)
         
         except Exception as e:
             print(f"Error calling watsonx.ai: {e}")
@@ -461,21 +599,119 @@ class FinalWatsonXArtistMatcher:
         
         return unique_insights if unique_insights else ["Compatible based on skills and experience"]
     
+    def _rank_candidates(self, 
+                         artist_id: str, 
+                         preference_analysis: Dict[str, Any],
+                         top_k: int = None) -> List[Any]:
+        """
+        Rule-based score for every candidate, keeping only the best top_k on a bounded heap.
+        
+        Candidates are ranked on their numeric score; the compatibility level and insights are
+        built only for the candidates that are kept.
+        
+        Args:
+            artist_id: ID of the artist seeking collaborators
+            preference_analysis: Analyzed chatbot preference
+            top_k: Optional maximum number of candidates to keep (all candidates when None)
+            
+        Returns:
+            List: (compatibility, artist) pairs, best first
+        """
+        with timed(CANDIDATE_SCORING):
+            scored_candidates = (
+                (self._score_compatibility(artist, preference_analysis), artist)
+                for artist in self.artists
+                if artist["artistId"] != artist_id
+            )
+            if top_k is None:
+                ranked_candidates = sorted(scored_candidates, key=lambda x: x[0]["score"], reverse=True)
+            else:
+                ranked_candidates = heapq.nlargest(top_k, scored_candidates, key=lambda x: x[0]["score"])
+        
+        return [
+            (self._describe_compatibility(compatibility, artist, preference_analysis), artist)
+            for compatibility, artist in ranked_candidates
+        ]
+    
+    def _build_match(self, 
+                     compatibility: Dict[str, Any], 
+                     artist: Dict[str, Any], 
+                     ai_insights: List[str] = None) -> Dict[str, Any]:
+        """
+        Create the match entry of a ranked candidate.
+        
+        Args:
+            compatibility: Rule-based compatibility of the candidate
+            artist: Candidate artist profile
+            ai_insights: Optional AI insights, replacing the rule-based insights
+            
+        Returns:
+            Dict: Match entry
+        """
+        # Combine rule-based insights with AI insights
+        insights = compatibility["insights"]
+        if ai_insights:
+            insights = ai_insights
+        
+        # Create portfolio highlights
+        portfolio_highlights = []
+        for artwork in artist.get("completeGallery", [])[:3]:
+            portfolio_highlights.append({
+                "title": artwork.get("title", ""),
+                "year": artwork.get("year", ""),
+                "medium": artwork.get("medium", ""),
+                "description": artwork.get("description", "")
+            })
+        
+        # Create match object
+        return {
+            "artist": {
+                "artistId": artist["artistId"],
+                "name": artist.get("basicInfo", {}).get("name", ""),
+                "location": artist.get("basicInfo", {}).get("location", ""),
+                "bio": artist.get("basicInfo", {}).get("bio", "")
+            },
+            "compatibility_score": compatibility["score"],
+            "compatibility_breakdown": {
+                "tool_expertise": f"{compatibility['tool_score']}/30",
+                "art_type_alignment": f"{compatibility['art_type_score']}/30",
+                "project_relevance": f"{compatibility['keyword_score']}/20",
+                "experience_level": f"{compatibility['experience_score']}/10",
+                "portfolio_quality": f"{compatibility['portfolio_score']}/10"
+            },
+            "compatibility_level": compatibility["compatibility_level"],
+            "insights": insights,
+            "portfolio_highlights": portfolio_highlights,
+            "contact_info": {
+                "website": artist.get("basicInfo", {}).get("website", ""),
+                "email": artist.get("basicInfo", {}).get("email", ""),
+                "social": artist.get("basicInfo", {}).get("social", [])
+            }
+        }
+    
     def find_collaborators(self, 
                          artist_id: str, 
-                         chatbot_preference: str = None) -> List[Dict[str, Any]]:
+                         chatbot_preference: str = None,
+                         top_k: int = None,
+                         concurrent_insights: bool = True,
+                         insight_timeout: float = None) -> List[Dict[str, Any]]:
         """
         Find suitable collaborators for an artist.
         
         Args:
             artist_id: ID of the artist seeking collaborators
             chatbot_preference: Optional custom chatbot preference text
+            top_k: Optional maximum number of matches to return (all candidates when None)
+            concurrent_insights: Request AI insights for all good matches at once instead of
+                                 one after another
+            insight_timeout: Seconds to wait for concurrent AI insights (INSIGHT_TIMEOUT when
+                             None); matches whose insights are late keep rule-based insights
             
         Returns:
             List: Ranked list of potential collaborators with compatibility scores and insights
         """
         # Find the requesting artist
-        requesting_artist = next((a for a in self.artists if a["artistId"] == artist_id), None)
+        requesting_artist = self.repository.get(artist_id)
         if not requesting_artist:
             return []
         
@@ -485,72 +721,129 @@ class FinalWatsonXArtistMatcher:
         
         # Analyze the chatbot preference
         preference_analysis = self.analyze_chatbot_preference(chatbot_preference)
-        
-        # Find potential collaborators
+        ranked_candidates = self._rank_candidates(artist_id, preference_analysis, top_k)
+        
+        # Fire the AI insight requests of all good matches at once
+        insight_futures = {}
+        if concurrent_insights and self.model is not None:
+            for rank, (compatibility, artist) in enumerate(ranked_candidates):
+                if compatibility["score"] >= self.AI_INSIGHT_MIN_SCORE:
+                    insight_futures[rank] = self.insight_executor.submit(
+                        self.generate_ai_insights, requesting_artist, artist, chatbot_preference
+                    )
+        
+        if insight_timeout is None:
+            insight_timeout = self.INSIGHT_TIMEOUT
+        insight_deadline = time.monotonic() + insight_timeout
+        
+        # Generate insights, highlights and match entries only for the surviving candidates
         collaborator_matches = []
-        for artist in self.artists:
-            if artist["artistId"] != artist_id:
-                # Calculate compatibility score
-                compatibility = self.calculate_compatibility_score(artist, preference_analysis)
-                
-                # Generate AI insights if score is high enough
-                ai_insights = []
-                if compatibility["score"] >= 45:  # Only generate AI insights for good matches
-                    ai_insights = self.generate_ai_insights(requesting_artist, artist, chatbot_preference)
-                
-                # Combine rule-based insights with AI insights
-                insights = compatibility["insights"]
-                if ai_insights:
-                    insights = ai_insights
-                
-                # Create portfolio highlights
-                portfolio_highlights = []
-                for artwork in artist.get("completeGallery", [])[:3]:
-                    portfolio_highlights.append({
-                        "title": artwork.get("title", ""),
-                        "year": artwork.get("year", ""),
-                        "medium": artwork.get("medium", ""),
-                        "description": artwork.get("description", "")
-                    })
-                
-                # Create match object
-                match = {
-                    "artist": {
-                        "name": artist.get("basicInfo", {}).get("name", ""),
-                        "location": artist.get("basicInfo", {}).get("location", ""),
-                        "bio": artist.get("basicInfo", {}).get("bio", "")
-                    },
-                    "compatibility_score": compatibility["score"],
-                    "compatibility_breakdown": {
-                        "tool_expertise": f"{compatibility['tool_score']}/30",
-                        "art_type_alignment": f"{compatibility['art_type_score']}/30",
-                        "project_relevance": f"{compatibility['keyword_score']}/20",
-                        "experience_level": f"{compatibility['experience_score']}/10",
-                        "portfolio_quality": f"{compatibility['portfolio_score']}/10"
-                    },
-                    "compatibility_level": compatibility["compatibility_level"],
-                    "insights": insights,
-                    "portfolio_highlights": portfolio_highlights,
-                    "contact_info": {
-                        "website": artist.get("basicInfo", {}).get("website", ""),
-                        "email": artist.get("basicInfo", {}).get("email", ""),
-                        "social": artist.get("basicInfo", {}).get("social", [])
-                    }
-                }
-                
-                collaborator_matches.append(match)
-        
-        # Sort by compatibility score (highest first)
-        collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
+        for rank, (compatibility, artist) in enumerate(ranked_candidates):
+            # Generate AI insights if score is high enough
+            ai_insights = []
+            if rank in insight_futures:
+                future = insight_futures[rank]
+                try:
+                    ai_insights = future.result(timeout=max(insight_deadline - time.monotonic(), 0))
+                except FutureTimeoutError:
+                    future.cancel()
+                    print(f"AI insights for {artist['artistId']} timed out, using rule-based insights")
+            elif not concurrent_insights and compatibility["score"] >= self.AI_INSIGHT_MIN_SCORE:
+                ai_insights = self.generate_ai_insights(requesting_artist, artist, chatbot_preference)
+            
+            collaborator_matches.append(self._build_match(compatibility, artist, ai_insights))
         
         return collaborator_matches
-
+    
+    def stream_collaborators(self, 
+                             artist_id: str, 
+                             chatbot_preference: str = None,
+                             top_k: int = None,
+                             insight_timeout: float = None) -> Iterator[Dict[str, Any]]:
+        """
+        Find suitable collaborators, yielding results as soon as they are available.
+        
+        The first event carries the rule-based ranking (with rule-based insights), computed
+        without waiting for watsonx.ai. An "insights" event follows for every good match
+        whose AI insights complete, in completion order, and a final "done" event lists the
+        matches whose insights failed or did not arrive within insight_timeout.
+        
+        Args:
+            artist_id: ID of the artist seeking collaborators
+            chatbot_preference: Optional custom chatbot preference text
+            top_k: Optional maximum number of matches (all candidates when None)
+            insight_timeout: Seconds to wait for the AI insights (INSIGHT_TIMEOUT when None)
+            
+        Yields:
+            Dict: Events with an "event" field of "ranking", "insights" or "done"
+        """
+        # Find the requesting artist
+        requesting_artist = self.repository.get(artist_id)
+        if not requesting_artist:
+            yield {"event": "done", "missingInsights": []}
+            return
+        
+        # Use provided chatbot preference or the one from the artist profile
+        if chatbot_preference is None:
+            chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
+        
+        # Rank with the rule-based analysis, so the first event does not wait for an LLM call
+        preference_analysis = self._analyze_preference_rule_based(chatbot_preference)
+        ranked_candidates = self._rank_candidates(artist_id, preference_analysis, top_k)
+        
+        # Start the AI insight requests before sending the ranking
+        insight_futures = {}
+        if self.model is not None:
+            for rank, (compatibility, artist) in enumerate(ranked_candidates):
+                if compatibility["score"] >= self.AI_INSIGHT_MIN_SCORE:
+                    future = self.insight_executor.submit(
+                        self.generate_ai_insights, requesting_artist, artist, chatbot_preference
+                    )
+                    insight_futures[future] = rank
+        
+        yield {
+            "event": "ranking",
+            "chatbotPreference": chatbot_preference,
+            "matches": [self._build_match(compatibility, artist) for compatibility, artist in ranked_candidates],
+            "pendingInsights": sorted(ranked_candidates[rank][1]["artistId"] for rank in insight_futures.values())
+        }
+        
+        if insight_timeout is None:
+            insight_timeout = self.INSIGHT_TIMEOUT
+        
+        # Futures whose insights failed or did not arrive; those matches keep rule-based insights
+        missing = set(insight_futures)
+        try:
+            for future in as_completed(insight_futures, timeout=insight_timeout):
+                rank = insight_futures[future]
+                ai_insights = future.result()
+                if not ai_insights:
+                    continue
+                missing.discard(future)
+                yield {
+                    "event": "insights",
+                    "rank": rank,
+                    "artistId": ranked_candidates[rank][1]["artistId"],
+                    "insights": ai_insights
+                }
+        except FutureTimeoutError:
+            for future in missing:
+                future.cancel()
+            print("Some AI insights timed out, using rule-based insights")
+        
+        yield {
+            "event": "done",
+            "missingInsights": sorted(ranked_candidates[insight_futures[future]][1]["artistId"] for future in missing)
+        }
 
 def run_demo():
     """Run a demonstration of the Final WatsonX Artist Matcher"""
     # Create the matcher
     matcher = FinalWatsonXArtistMatcher()
     
+    # The demo wants watsonx.ai results, so wait for model selection to finish
+    matcher.model_initializer.wait_until_ready()
+    
     # Define test scenarios
     scenarios = [
         {
@@ -573,7 +866,7 @@ def run_demo():
         
         # Get the requesting artist
         artist_id = scenario["artist_id"]
-        requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+        requesting_artist = matcher.repository.get(artist_id)
         
         # Analyze the preference
         preference = scenario["preference"]
@@ -589,7 +882,7 @@ def run_demo():
         print(format_project_requirements(preference, preference_analysis))
         
         # Find collaborators
-        matches = matcher.find_collaborators(artist_id, preference)
+        matches = matcher.find_collaborators(artist_id, preference, top_k=2)
         
         # Print the top 2 matches with detailed formatting
         if matches:
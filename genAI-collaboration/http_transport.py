@@ -0,0 +1,159 @@
+"""
+HTTP Transport
+
+This module provides the shared HTTP transport of the Watson/watsonx REST clients: one pooled
+keep-alive requests.Session per host, default connect/read timeouts, and metrics on how
+often pooled connections are reused instead of paying a new TCP + TLS handshake.
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Default transport settings
+HTTP_POOL_MAXSIZE = 10  # keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = 5  # seconds
+HTTP_READ_TIMEOUT = 120  # seconds, LLM generation can be slow
+
+
+class HTTPTransport:
+    """
+    Pooled HTTP client shared by the REST clients.
+    
+    Each scheme and host gets its own session with a connection pool of pool_maxsize
+    connections (overridable per host with host_pool_sizes). Sessions are recreated after a
+    fork, so worker processes never share sockets.
+    """
+    
+    def __init__(self,
+                 pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                 host_pool_sizes: Optional[Dict[str, int]] = None,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT):
+        """
+        Initialize the transport. Sessions are created on first use of each host.
+        
+        Args:
+            pool_maxsize: Default number of keep-alive connections per host
+            host_pool_sizes: Optional pool size per host name (e.g. {"iam.cloud.ibm.com": 2})
+            connect_timeout: Default seconds to wait for a connection
+            read_timeout: Default seconds to wait for a response
+        """
+        self.pool_maxsize = pool_maxsize
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._pid = os.getpid()
+        self._metrics = {}
+    
+    def _session(self, url: str) -> requests.Session:
+        """Get the session of a URL's scheme and host, creating it on first use."""
+        parts = urlsplit(url)
+        base_url = f"{parts.scheme}://{parts.netloc}"
+        
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: drop the parent's sessions and their sockets
+                self._sessions = {}
+                self._metrics = {}
+                self._pid = os.getpid()
+            
+            session = self._sessions.get(base_url)
+            if session is None:
+                pool_size = self.host_pool_sizes.get(parts.hostname, self.pool_maxsize)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount(f"{base_url}/", adapter)
+                self._sessions[base_url] = session
+                self._metrics[base_url] = {"requests": 0, "errors": 0, "total_seconds": 0.0}
+            return session
+    
+    def request(self, method: str, url: str, timeout: Any = None, **kwargs) -> requests.Response:
+        """
+        Send a request over a pooled connection.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            timeout: Optional timeout in seconds, or (connect, read) tuple; the transport
+                     defaults are used when None
+            **kwargs: Other arguments accepted by requests (headers, json, data, ...)
+        
+        Returns:
+            requests.Response: Response of the request
+        """
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        
+        session = self._session(url)
+        base_url = "{0.scheme}://{0.netloc}".format(urlsplit(url))
+        start_time = time.perf_counter()
+        try:
+            return session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                if base_url in self._metrics:
+                    self._metrics[base_url]["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                if base_url in self._metrics:
+                    self._metrics[base_url]["requests"] += 1
+                    self._metrics[base_url]["total_seconds"] += time.perf_counter() - start_time
+    
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request (see request())."""
+        return self.request("GET", url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Send a POST request (see request())."""
+        return self.request("POST", url, **kwargs)
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-host transport metrics.
+        
+        Returns:
+            Dict: For each scheme and host, requests sent, errors, new connections opened,
+                  requests served over a reused connection, and mean latency in seconds
+        """
+        with self._lock:
+            stats = {}
+            for base_url, session in self._sessions.items():
+                metrics = self._metrics[base_url]
+                
+                # urllib3 counts the connections each pool had to open
+                connections = 0
+                for adapter in session.adapters.values():
+                    pools = adapter.poolmanager.pools
+                    for key in pools.keys():
+                        connections += pools[key].num_connections
+                
+                stats[base_url] = {
+                    "requests": metrics["requests"],
+                    "errors": metrics["errors"],
+                    "connections_opened": connections,
+                    "connections_reused": max(metrics["requests"] - metrics["errors"] - connections, 0),
+                    "mean_seconds": round(metrics["total_seconds"] / metrics["requests"], 4) if metrics["requests"] else 0.0
+                }
+            return stats
+    
+    def close(self) -> None:
+        """Close every session and its pooled connections."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            self._metrics = {}
+
+
+# Shared by every Watson/watsonx REST client in this process
+HTTP_TRANSPORT = HTTPTransport()
@@ -0,0 +1,282 @@
+"""
+IAM Token Manager
+
+This module provides a shared IBM Cloud IAM token provider. Tokens are refreshed by a
+background thread before they expire, so requests never wait on the IAM service, and are
+shared between processes (e.g. server workers) through a small cache file, so starting N
+workers does not cost N token requests.
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+
+from http_transport import HTTP_TRANSPORT
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, each process may fetch its own token
+    fcntl = None
+
+IAM_TOKEN_URL = "https://iam.cloud.ibm.com/identity/token"
+
+# Refresh tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 600
+
+# Seconds to wait before retrying a failed background refresh
+TOKEN_RETRY_INTERVAL = 30
+
+
+class IAMTokenManager:
+    """
+    Thread-safe IAM token provider with refresh-ahead and a cross-process file cache.
+    
+    get_token() only blocks when no unexpired token is available (the very first call, or
+    after the background refresher has failed for a whole token lifetime). The cache file
+    is only readable by the current user and is keyed by a hash of the API key and token URL.
+    """
+    
+    def __init__(self,
+                 api_key: str,
+                 token_url: str = IAM_TOKEN_URL,
+                 request_format: str = "form",
+                 cache_path: Optional[str] = None,
+                 refresh_margin: float = TOKEN_REFRESH_MARGIN,
+                 background_refresh: bool = True):
+        """
+        Initialize the token manager. No token is requested until first use.
+        
+        Args:
+            api_key: IBM Cloud API key
+            token_url: URL of the token endpoint
+            request_format: "form" to send the API key form-encoded (IAM), or "json"
+            cache_path: Path of the shared token cache file (derived from the API key
+                        and token URL in the temp directory when None)
+            refresh_margin: Seconds before expiry at which the token is refreshed
+            background_refresh: Refresh the token in a background thread
+        """
+        if request_format not in ("form", "json"):
+            raise ValueError(f"Unknown request format: {request_format}")
+        
+        self.api_key = api_key
+        self.token_url = token_url
+        self.request_format = request_format
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        
+        if cache_path is None:
+            cache_id = hashlib.sha256(f"{token_url}\n{api_key}".encode("utf-8")).hexdigest()[:16]
+            cache_path = os.path.join(tempfile.gettempdir(), f"watsonx_iam_token_{cache_id}.json")
+        self.cache_path = cache_path
+        
+        self.last_error = None
+        self._token = None
+        self._expires_at = 0.0
+        self._lock = threading.RLock()
+        self._refresher = None
+        self._refresher_pid = None
+        self._stop_event = threading.Event()
+    
+    def get_token(self) -> Optional[str]:
+        """
+        Get a valid access token.
+        
+        Returns:
+            str: Access token, or None if no token could be obtained (see last_error)
+        """
+        self._ensure_refresher()
+        
+        if self._token and time.time() < self._expires_at:
+            return self._token
+        
+        with self._lock:
+            if not (self._token and time.time() < self._expires_at):
+                self._refresh(force=False)
+            return self._token if time.time() < self._expires_at else None
+    
+    def invalidate(self) -> None:
+        """Drop the current token (e.g. after a 401), so the next call fetches a new one."""
+        with self._lock:
+            self._token = None
+            self._expires_at = 0.0
+            try:
+                os.remove(self.cache_path)
+            except OSError:
+                pass
+    
+    def stop(self) -> None:
+        """Stop the background refresher."""
+        self._stop_event.set()
+    
+    def _needs_refresh(self, expires_at: float) -> bool:
+        """Whether a token expiring at expires_at is within the refresh margin."""
+        return time.time() >= expires_at - self.refresh_margin
+    
+    def _refresh(self, force: bool) -> None:
+        """
+        Adopt a fresh token from the cache file, or fetch one from the token endpoint.
+        
+        Args:
+            force: Fetch even if the current token is still outside the refresh margin
+        """
+        with self._lock, self._file_lock():
+            # Another process may already have refreshed the token
+            cached = self._read_cache()
+            if cached and cached["expires_at"] > self._expires_at:
+                self._token = cached["access_token"]
+                self._expires_at = cached["expires_at"]
+            
+            if self._token and not self._needs_refresh(self._expires_at) and not force:
+                return
+            
+            token_data = self._fetch_token()
+            if token_data is not None:
+                self._token = token_data["access_token"]
+                self._expires_at = token_data["expires_at"]
+                self._write_cache(token_data)
+    
+    def _fetch_token(self) -> Optional[Dict[str, Any]]:
+        """Request a new token from the token endpoint."""
+        print("Getting new IAM token...")
+        auth_data = {
+            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
+            "apikey": self.api_key
+        }
+        
+        try:
+            if self.request_format == "json":
+                response = HTTP_TRANSPORT.post(
+                    self.token_url,
+                    headers={"Content-Type": "application/json", "Accept": "application/json"},
+                    json=auth_data,
+                    timeout=30
+                )
+            else:
+                response = HTTP_TRANSPORT.post(
+                    self.token_url,
+                    headers={"Content-Type": "application/x-www-form-urlencoded", "Accept": "application/json"},
+                    data=auth_data,
+                    timeout=30
+                )
+        except requests.RequestException as e:
+            self.last_error = str(e)
+            print(f"Error getting IAM token: {e}")
+            return None
+        
+        if response.status_code != 200:
+            self.last_error = response.text
+            print(f"Error getting IAM token: {response.status_code}")
+            print(response.text)
+            return None
+        
+        result = response.json()
+        self.last_error = None
+        return {
+            "access_token": result.get("access_token"),
+            "expires_at": time.time() + result.get("expires_in", 3600)
+        }
+    
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        """Read the shared token cache file, ignoring missing or corrupt files."""
+        try:
+            with open(self.cache_path, "r") as f:
+                cached = json.load(f)
+            if cached.get("access_token") and time.time() < cached.get("expires_at", 0):
+                return cached
+        except (OSError, ValueError):
+            pass
+        return None
+    
+    def _write_cache(self, token_data: Dict[str, Any]) -> None:
+        """Atomically write the shared token cache file (readable by the current user only)."""
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            file_descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(file_descriptor, "w") as f:
+                json.dump(token_data, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write IAM token cache: {e}")
+    
+    def _file_lock(self):
+        """Lock held across processes while refreshing, so only one of them calls IAM."""
+        return _FileLock(f"{self.cache_path}.lock")
+    
+    def _ensure_refresher(self) -> None:
+        """Start the background refresher (again, after a fork) if enabled."""
+        if not self.background_refresh or self._refresher_pid == os.getpid():
+            return
+        
+        with self._lock:
+            if self._refresher_pid == os.getpid():
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="iam-token-refresher", daemon=True)
+            self._refresher_pid = os.getpid()
+            self._refresher.start()
+    
+    def _refresh_loop(self) -> None:
+        """Refresh the token shortly before it enters the refresh margin."""
+        while not self._stop_event.is_set():
+            if self._token and not self._needs_refresh(self._expires_at):
+                # Jitter spreads the refreshes of several processes over a few seconds
+                delay = self._expires_at - self.refresh_margin - time.time() + random.uniform(0, min(5, self.refresh_margin / 4))
+            else:
+                self._refresh(force=False)
+                delay = 1 if self._token and not self._needs_refresh(self._expires_at) else TOKEN_RETRY_INTERVAL
+            
+            self._stop_event.wait(max(delay, 1))
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file, a no-op where fcntl is unavailable."""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+    
+    def __enter__(self):
+        if fcntl is not None:
+            try:
+                self._file = open(self.path, "a")
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            except OSError:
+                self._file = None
+        return self
+    
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+_token_managers = {}
+_token_managers_lock = threading.Lock()
+
+
+def get_token_manager(api_key: str, token_url: str = IAM_TOKEN_URL, request_format: str = "form") -> IAMTokenManager:
+    """
+    Get the token manager shared by every caller in this process for an API key and endpoint.
+    
+    Args:
+        api_key: IBM Cloud API key
+        token_url: URL of the token endpoint
+        request_format: "form" or "json" (see IAMTokenManager)
+    
+    Returns:
+        IAMTokenManager: Shared token manager
+    """
+    key = (api_key, token_url, request_format)
+    with _token_managers_lock:
+        manager = _token_managers.get(key)
+        if manager is None:
+            manager = IAMTokenManager(api_key, token_url=token_url, request_format=request_format)
+            _token_managers[key] = manager
+        return manager
@@ -2,32 +2,15 @@
 IBM Cloud example script based on official documentation
 """
 
-import requests
 import json
 from config_updated import WATSON_API_KEY, WATSON_PROJECT_ID
+from http_transport import HTTP_TRANSPORT
+from iam_token_manager import get_token_manager
 
 def get_iam_token(api_key):
     """Get an IAM token from IBM Cloud"""
     print("Getting IAM token...")
-    url = "https://iam.cloud.ibm.com/identity/token"
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Accept": "application/json"
-    }
-    data = {
-        "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-        "apikey": api_key
-    }
-    
-    response = requests.post(url, headers=headers, data=data)
-    
-    if response.status_code == 200:
-        result = response.json()
-        return result.get("access_token")
-    else:
-        print(f"Error getting IAM token: {response.status_code}")
-        print(response.text)
-        return None
+    return get_token_manager(api_key).get_token()
 
 def test_foundation_models():
     """Test IBM Foundation Models API"""
@@ -72,7 +55,7 @@ def test_foundation_models():
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = HTTP_TRANSPORT.post(url, headers=headers, json=payload)
             print(f"Response status code: {response.status_code}")
             
             if response.status_code == 200:
@@ -131,7 +114,7 @@ def analyze_artist_preference(token, model_id):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = HTTP_TRANSPORT.post(url, headers=headers, json=payload)
         print(f"Response status code: {response.status_code}")
         
         if response.status_code == 200:
@@ -215,7 +198,7 @@ def generate_compatibility_score(token, model_id):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = HTTP_TRANSPORT.post(url, headers=headers, json=payload)
         print(f"Response status code: {response.status_code}")
         
         if response.status_code == 200:
@@ -4,9 +4,10 @@ IBM Cloud SDK approach for watsonx integration
 
 import os
 import json
-import requests
 from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
 from config_updated import WATSON_API_KEY, WATSON_PROJECT_ID
+from http_transport import HTTP_TRANSPORT
+from iam_token_manager import get_token_manager
 
 class IBMWatsonXIntegration:
     """Class to handle IBM watsonx integration using the official SDK approach"""
@@ -16,31 +17,13 @@ class IBMWatsonXIntegration:
         self.api_key = WATSON_API_KEY
         self.project_id = WATSON_PROJECT_ID
         self.authenticator = IAMAuthenticator(self.api_key)
-        self.token = None
+        # Shared, background-refreshed IAM token
+        self.token_manager = get_token_manager(self.api_key)
+        self.http = HTTP_TRANSPORT
     
     def get_token(self):
         """Get IAM token"""
-        if not self.token:
-            url = "https://iam.cloud.ibm.com/identity/token"
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "Accept": "application/json"
-            }
-            data = {
-                "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-                "apikey": self.api_key
-            }
-            
-            response = requests.post(url, headers=headers, data=data)
-            
-            if response.status_code == 200:
-                result = response.json()
-                self.token = result.get("access_token")
-            else:
-                print(f"Error getting IAM token: {response.status_code}")
-                print(response.text)
-        
-        return self.token
+        return self.token_manager.get_token()
     
     def list_instances(self):
         """List watsonx instances"""
@@ -56,7 +39,7 @@ class IBMWatsonXIntegration:
         }
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url, headers=headers)
             print(f"List instances response code: {response.status_code}")
             
             if response.status_code == 200:
@@ -82,7 +65,7 @@ class IBMWatsonXIntegration:
         }
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url, headers=headers)
             print(f"List projects response code: {response.status_code}")
             
             if response.status_code == 200:
@@ -108,7 +91,7 @@ class IBMWatsonXIntegration:
         }
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.http.get(url, headers=headers)
             print(f"Project details response code: {response.status_code}")
             
             if response.status_code == 200:
@@ -144,7 +127,7 @@ class IBMWatsonXIntegration:
             
             try:
                 print(f"Trying to list models from: {endpoint}")
-                response = requests.get(endpoint, headers=headers)
+                response = self.http.get(endpoint, headers=headers)
                 print(f"Response status code: {response.status_code}")
                 
                 if response.status_code == 200:
@@ -204,7 +187,7 @@ class IBMWatsonXIntegration:
                 
                 try:
                     print(f"Trying endpoint: {endpoint} with model: {model}")
-                    response = requests.post(endpoint, headers=headers, json=payload)
+                    response = self.http.post(endpoint, headers=headers, json=payload)
                     print(f"Response status code: {response.status_code}")
                     
                     if response.status_code == 200:
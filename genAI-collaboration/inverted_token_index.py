@@ -0,0 +1,95 @@
+"""
+Inverted Token Index
+
+This module provides an inverted index from preprocessed tokens (bio and gallery description
+words) to the artists that contain them, so keyword overlap for the whole catalog comes from
+merging a few posting lists instead of re-tokenizing every artist on every request.
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Iterable, Set
+
+
+class InvertedTokenIndex:
+    """
+    Map each token to the set of artist IDs whose profile contains it.
+    """
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self._lock = threading.RLock()
+        self._postings = {}
+        self._artist_tokens = {}
+    
+    def __len__(self) -> int:
+        return len(self._postings)
+    
+    def replace(self, artist_id: str, tokens: Iterable[str]) -> None:
+        """
+        Index (or re-index) the tokens of an artist.
+        
+        Args:
+            artist_id: ID of the artist
+            tokens: Preprocessed tokens from the artist's bio and gallery descriptions; a set
+                    is kept as is (shared with the caller, who must not modify it afterwards)
+        """
+        new_tokens = tokens if isinstance(tokens, (set, frozenset)) else set(tokens)
+        
+        with self._lock:
+            old_tokens = self._artist_tokens.get(artist_id, set())
+            
+            for token in old_tokens - new_tokens:
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.discard(artist_id)
+                    if not postings:
+                        del self._postings[token]
+            
+            for token in new_tokens - old_tokens:
+                self._postings.setdefault(token, set()).add(artist_id)
+            
+            self._artist_tokens[artist_id] = new_tokens
+    
+    def remove(self, artist_id: str) -> None:
+        """
+        Remove an artist from the index.
+        
+        Args:
+            artist_id: ID of the artist
+        """
+        self.replace(artist_id, ())
+        with self._lock:
+            self._artist_tokens.pop(artist_id, None)
+    
+    def postings(self, token: str) -> Set[str]:
+        """
+        Get the artists whose profile contains a token.
+        
+        Args:
+            token: Preprocessed token
+        
+        Returns:
+            Set: Artist IDs (empty when the token is unknown)
+        """
+        with self._lock:
+            return set(self._postings.get(token, ()))
+    
+    def overlap_counts(self, tokens: Iterable[str]) -> Dict[str, int]:
+        """
+        Count, for every artist, how many of the given tokens their profile contains.
+        
+        Artists with no overlap are left out of the result.
+        
+        Args:
+            tokens: Tokens to look up (duplicates are counted once)
+        
+        Returns:
+            Dict: Number of matching tokens per artist ID
+        """
+        counts = Counter()
+        with self._lock:
+            for token in set(tokens):
+                counts.update(self._postings.get(token, ()))
+        
+        return dict(counts)
@@ -0,0 +1,326 @@
+"""
+Job Queue
+
+This module runs slow requests (e.g. watsonx.ai-backed matching) as background jobs. A job is
+submitted with its request parameters and gets an id right away; a bounded worker pool runs
+it, and its status and result are kept in a SQLite job store shared by all server workers.
+Identical requests are deduplicated by a hash of their parameters, and finished results expire
+after a TTL.
+
+Set the JOB_STORE_PATH environment variable to keep the job store somewhere else than next to
+this module. The store is only opened when a queue is first used, not when it is created.
+"""
+
+import os
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional
+
+# Default settings of the job queue
+JOB_STORE_PATH = os.environ.get(
+    "JOB_STORE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "match_jobs.sqlite3")
+)
+JOB_WORKERS = 4  # jobs running at once per process
+JOB_MAX_PENDING = 100  # queued jobs accepted before submissions are refused
+JOB_RESULT_TTL = 3600  # seconds a finished job and its result are kept
+JOB_POLL_INTERVAL = 0.5  # seconds between store checks while waiting on another process's job
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while max_pending jobs are already queued."""
+
+
+class JobQueue:
+    """
+    Bounded background job runner with a persistent SQLite job store.
+    
+    Use one queue per job store and process: on first use in a process, a queue opens the
+    store and fails the unfinished jobs of dead processes and of earlier queues with its own
+    pid. A queue created before the server forks its workers (preloaded app) does the same in
+    each worker.
+    """
+    
+    def __init__(self,
+                 handler: Callable[[Dict[str, Any]], Any],
+                 path: str = JOB_STORE_PATH,
+                 max_workers: int = JOB_WORKERS,
+                 max_pending: int = JOB_MAX_PENDING,
+                 result_ttl: float = JOB_RESULT_TTL):
+        """
+        Initialize the queue (the store is opened on first use).
+        
+        Args:
+            handler: Function running a job; takes the request parameters and returns a
+                     JSON-serializable result
+            path: Path of the SQLite job store
+            max_workers: Number of jobs running at once in this process
+            max_pending: Number of queued jobs accepted before submit() raises
+            result_ttl: Seconds a finished job is kept
+        """
+        self.handler = handler
+        self.path = path
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._finished = threading.Condition()
+        self._executor = None
+        self._executor_pid = None
+        # Tells this queue's jobs apart from those of an earlier process that had the same pid
+        self._owner_id = uuid.uuid4().hex
+        # Process the queue was last started in (see _start())
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+    
+    @staticmethod
+    def request_hash(params: Dict[str, Any]) -> str:
+        """
+        Build the deduplication key of a request.
+        
+        Args:
+            params: Request parameters
+        
+        Returns:
+            str: SHA-256 hex digest of the canonical JSON of the parameters
+        """
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, reopening it after a fork."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            # Autocommit mode, so submit() can take the write lock with BEGIN IMMEDIATE
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    request_hash TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner_pid INTEGER NOT NULL,
+                    owner_id TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    expires_at REAL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash)")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        """Get this process's worker pool, recreating it after a fork."""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="match-jobs")
+                self._executor_pid = os.getpid()
+            return self._executor
+    
+    def _start(self) -> None:
+        """On first use in a process, take a new owner id and recover interrupted jobs."""
+        if self._started_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._started_pid == os.getpid():
+                return
+            self._owner_id = uuid.uuid4().hex
+            self.recover_interrupted()
+            self._started_pid = os.getpid()
+    
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Submit a job, or get the existing job of an identical request.
+        
+        A queued or running job with the same request hash is reused, as is a finished job
+        whose result has not expired. Failed jobs are not reused, so a retry runs again.
+        
+        Args:
+            params: JSON-serializable request parameters passed to the handler
+        
+        Returns:
+            Dict: The job (see get())
+        
+        Raises:
+            JobQueueFullError: If max_pending jobs are already queued
+        """
+        self._start()
+        request_hash = self.request_hash(params)
+        now = time.time()
+        
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            
+            existing = connection.execute(
+                "SELECT job_id FROM jobs WHERE request_hash = ? AND status != ? ORDER BY created_at DESC LIMIT 1",
+                (request_hash, FAILED)
+            ).fetchone()
+            if existing is None:
+                pending = connection.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+                if pending >= self.max_pending:
+                    raise JobQueueFullError(f"{pending} jobs are already queued")
+                
+                job_id = uuid.uuid4().hex
+                connection.execute(
+                    "INSERT INTO jobs (job_id, request_hash, params, status, owner_pid, owner_id, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, request_hash, json.dumps(params, ensure_ascii=False), QUEUED, os.getpid(), self._owner_id, now)
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        
+        if existing is not None:
+            return self.get(existing["job_id"])
+        
+        self._pool().submit(self._run, job_id, params)
+        return self.get(job_id)
+    
+    def _run(self, job_id: str, params: Dict[str, Any]) -> None:
+        """Run a job and store its result or error."""
+        connection = self._connection()
+        connection.execute("UPDATE jobs SET status = ?, started_at = ? WHERE job_id = ?", (RUNNING, time.time(), job_id))
+        
+        try:
+            result = self.handler(params)
+            status, encoded_result, error = DONE, json.dumps(result, ensure_ascii=False), None
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            status, encoded_result, error = FAILED, None, str(e)
+        
+        finished_at = time.time()
+        connection.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ? WHERE job_id = ?",
+            (status, encoded_result, error, finished_at, finished_at + self.result_ttl, job_id)
+        )
+        
+        with self._finished:
+            self._finished.notify_all()
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a job.
+        
+        Args:
+            job_id: ID of the job
+        
+        Returns:
+            Dict: job_id, status, timestamps and, once finished, result or error; None if the
+                  job does not exist or has expired
+        """
+        self._start()
+        row = self._connection().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None or (row["expires_at"] is not None and row["expires_at"] <= time.time()):
+            return None
+        
+        return {
+            "job_id": row["job_id"],
+            "status": row["status"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "expires_at": row["expires_at"],
+            "result": json.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"]
+        }
+    
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait for a job to finish.
+        
+        Args:
+            job_id: ID of the job
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            Dict: The job (possibly still queued or running after the timeout), or None if it
+                  does not exist
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job["status"] in (DONE, FAILED) or remaining <= 0:
+                return job
+            
+            # Woken by jobs of this process; polled for jobs run by another worker process
+            with self._finished:
+                self._finished.wait(min(remaining, JOB_POLL_INTERVAL))
+    
+    def recover_interrupted(self) -> int:
+        """
+        Fail the queued and running jobs of processes that no longer exist.
+        
+        Returns:
+            int: Number of jobs marked as failed
+        """
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT job_id, owner_pid, owner_id FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+        ).fetchall()
+        
+        interrupted = [
+            row["job_id"] for row in rows
+            if (row["owner_id"] != self._owner_id if row["owner_pid"] == os.getpid() else not _process_alive(row["owner_pid"]))
+        ]
+        now = time.time()
+        connection.executemany(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, expires_at = ? WHERE job_id = ?",
+            [(FAILED, "Interrupted by a server restart", now, now + self.result_ttl, job_id) for job_id in interrupted]
+        )
+        return len(interrupted)
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get job counts.
+        
+        Returns:
+            Dict: Number of stored jobs per status, plus the queue settings
+        """
+        self._start()
+        rows = self._connection().execute(
+            "SELECT status, COUNT(*) FROM jobs WHERE expires_at IS NULL OR expires_at > ? GROUP BY status",
+            (time.time(),)
+        ).fetchall()
+        
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        counts.update({status: count for status, count in rows})
+        return dict(counts, max_workers=self.max_workers, max_pending=self.max_pending, result_ttl=self.result_ttl)
+
+
+def _process_alive(pid: int) -> bool:
+    """Check whether a process exists on this host."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
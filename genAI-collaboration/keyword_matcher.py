@@ -0,0 +1,81 @@
+"""
+Multi-pattern keyword matcher
+
+This module provides a compiled matcher that finds every tool and art type keyword in a
+text with a single regular expression pass, instead of one substring search per keyword.
+"""
+
+import re
+from typing import Iterable, List
+
+
+class KeywordMatcher:
+    """
+    Find all occurrences of a fixed set of keywords in one pass over a text.
+    
+    Keywords must start at a word boundary. Short keywords (3 characters or less, such as
+    "ar", "vr", "ui" or "3d") must also end at a word boundary, optionally followed by a
+    plural "s", so that "ar" no longer matches inside "art" or "year". Longer keywords
+    keep matching as prefixes, so "animate" still matches "animated".
+    """
+    
+    SHORT_KEYWORD_LENGTH = 3
+    
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Compile the matcher.
+        
+        Args:
+            keywords: Keywords to look for (matched case-insensitively)
+        """
+        # Longest first, so the alternation prefers "motion graphics" over "motion"
+        self.keywords = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+        
+        alternatives = "|".join(self._keyword_pattern(keyword) for keyword in self.keywords)
+        
+        # The lookahead makes the match zero-width, so overlapping keywords that start at
+        # different positions (e.g. "spark ar" and "ar") are all reported
+        self._pattern = re.compile(r"(?=(" + alternatives + r"))")
+        
+        # Map matched text (including a plural "s") back to the keyword
+        self._lookup = {}
+        for keyword in self.keywords:
+            self._lookup[keyword] = keyword
+            if len(keyword) <= self.SHORT_KEYWORD_LENGTH:
+                self._lookup.setdefault(keyword + "s", keyword)
+        
+        # Shorter keywords that also match at the start of a longer one
+        # (e.g. "motion" inside "motion graphics"), reported alongside it
+        self._nested = {}
+        for keyword in self.keywords:
+            self._nested[keyword] = [
+                other for other in self.keywords
+                if other != keyword and len(other) < len(keyword)
+                and re.match(self._keyword_pattern(other), keyword)
+            ]
+    
+    def _keyword_pattern(self, keyword: str) -> str:
+        """Build the regular expression for a single keyword."""
+        pattern = r"\b" + re.escape(keyword)
+        if len(keyword) <= self.SHORT_KEYWORD_LENGTH:
+            pattern += r"s?\b"
+        return pattern
+    
+    def find(self, text: str) -> List[str]:
+        """
+        Find the keywords present in a text.
+        
+        Args:
+            text: Text to search
+        
+        Returns:
+            List: Distinct keywords found, in order of first appearance
+        """
+        found = {}
+        for match in self._pattern.finditer(text.lower()):
+            keyword = self._lookup[match.group(1)]
+            found[keyword] = True
+            for nested_keyword in self._nested[keyword]:
+                found[nested_keyword] = True
+        
+        return list(found)
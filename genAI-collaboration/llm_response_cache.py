@@ -0,0 +1,251 @@
+"""
+LLM Response Cache
+
+This module provides a persistent, content-addressed cache of watsonx.ai responses backed by
+SQLite. Entries are keyed by a hash of the model id, the decoding parameters and the prompt;
+with greedy decoding the same key always produces the same response, so a hit skips the
+network call entirely. The database is shared across process restarts and server workers.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Any, Optional
+
+# Default settings of the shared LLM response cache
+LLM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_response_cache.sqlite3")
+LLM_CACHE_MAX_BYTES = 64 * 1024 * 1024
+LLM_CACHE_ACCESS_FLUSH_INTERVAL = 10  # seconds hits are batched before their last_access is written
+
+
+class LLMResponseCache:
+    """
+    A SQLite-backed response cache with size-based eviction.
+    
+    When the stored responses exceed max_bytes, the least recently used entries are deleted
+    until the cache is back under 90% of the limit. Responses are stored as JSON, so both raw
+    generated text and parsed REST responses can be cached.
+    
+    The total size is kept up to date by triggers, so writes do not scan the table, and hits
+    record their access time in memory, written in one batch every access_flush_interval
+    seconds (the LRU order may lag by that long).
+    """
+    
+    def __init__(self,
+                 path: str = LLM_CACHE_PATH,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 access_flush_interval: float = LLM_CACHE_ACCESS_FLUSH_INTERVAL):
+        """
+        Initialize the cache. The database is opened lazily on first use.
+        
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Maximum total size of the stored responses
+            access_flush_interval: Seconds hits are batched before their access times are written
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.access_flush_interval = access_flush_interval
+        self._local = threading.local()
+        self._hits = 0
+        self._misses = 0
+        self._stats_lock = threading.Lock()
+        # Access times of hits not written yet, by key
+        self._pending_access = {}
+        self._last_access_flush = time.monotonic()
+        self._access_lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(model_id: str, params: Dict[str, Any], prompt: str) -> str:
+        """
+        Build the content address of a request.
+        
+        Args:
+            model_id: ID of the model
+            params: Decoding parameters
+            prompt: Prompt text
+        
+        Returns:
+            str: SHA-256 hex digest identifying the request
+        """
+        payload = json.dumps([model_id, params or {}, prompt], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, reopening it after a fork."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # One transaction, so an existing cache's total is counted before the triggers exist
+            connection.executescript(
+                """
+                BEGIN IMMEDIATE;
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model_id TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+                CREATE TABLE IF NOT EXISTS cache_size (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    total INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM responses;
+                CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses BEGIN
+                    UPDATE cache_size SET total = total + NEW.size WHERE id = 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses BEGIN
+                    UPDATE cache_size SET total = total + NEW.size - OLD.size WHERE id = 0;
+                END;
+                CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses BEGIN
+                    UPDATE cache_size SET total = total - OLD.size WHERE id = 0;
+                END;
+                COMMIT;
+                """
+            )
+            
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def get(self, model_id: str, params: Dict[str, Any], prompt: str) -> Optional[Any]:
+        """
+        Look up a cached response.
+        
+        Args:
+            model_id: ID of the model
+            params: Decoding parameters
+            prompt: Prompt text
+        
+        Returns:
+            Any: Cached response, or None on a miss or database error
+        """
+        key = self.make_key(model_id, params, prompt)
+        try:
+            connection = self._connection()
+            row = connection.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._record_access(connection, key)
+        except sqlite3.Error as e:
+            print(f"LLM response cache lookup failed: {e}")
+            row = None
+        
+        with self._stats_lock:
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+        
+        return json.loads(row[0])
+    
+    def _record_access(self, connection: sqlite3.Connection, key: str) -> None:
+        """Remember a hit's access time, writing the batched access times once they are due."""
+        with self._access_lock:
+            self._pending_access[key] = time.time()
+            if time.monotonic() - self._last_access_flush < self.access_flush_interval:
+                return
+        self._flush_access(connection)
+    
+    def _flush_access(self, connection: sqlite3.Connection) -> None:
+        """Write the access times of the hits since the last flush."""
+        with self._access_lock:
+            pending, self._pending_access = self._pending_access, {}
+            self._last_access_flush = time.monotonic()
+        if not pending:
+            return
+        
+        connection.executemany(
+            "UPDATE responses SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(access_time, key) for key, access_time in pending.items()]
+        )
+        connection.commit()
+    
+    def set(self, model_id: str, params: Dict[str, Any], prompt: str, response: Any) -> None:
+        """
+        Store a response, evicting old entries if the cache grows past max_bytes.
+        
+        Args:
+            model_id: ID of the model
+            params: Decoding parameters
+            prompt: Prompt text
+            response: JSON-serializable response
+        """
+        key = self.make_key(model_id, params, prompt)
+        encoded_response = json.dumps(response, ensure_ascii=False)
+        size = len(encoded_response.encode("utf-8"))
+        now = time.time()
+        
+        try:
+            connection = self._connection()
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the size trigger
+            connection.execute(
+                "INSERT INTO responses (key, model_id, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET model_id = excluded.model_id, response = excluded.response, "
+                "size = excluded.size, created_at = excluded.created_at, last_access = excluded.last_access",
+                (key, model_id, encoded_response, size, now, now)
+            )
+            connection.commit()
+            self._evict(connection)
+        except sqlite3.Error as e:
+            print(f"LLM response cache write failed: {e}")
+    
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Delete least recently used entries while the cache is over its size limit."""
+        total_size = connection.execute("SELECT total FROM cache_size WHERE id = 0").fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+        
+        # Recent hits must count before the entries are ordered by last access
+        self._flush_access(connection)
+        
+        target_size = int(self.max_bytes * 0.9)
+        rows = connection.execute("SELECT key, size FROM responses ORDER BY last_access")
+        evicted_keys = []
+        for key, size in rows:
+            if total_size <= target_size:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        
+        connection.executemany("DELETE FROM responses WHERE key = ?", evicted_keys)
+        connection.commit()
+    
+    def clear(self) -> None:
+        """Delete every cached response."""
+        connection = self._connection()
+        connection.execute("DELETE FROM responses")
+        connection.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dict: Hits and misses of this process, plus entry count and size on disk
+        """
+        entries, total_size = self._connection().execute(
+            "SELECT COUNT(*), (SELECT total FROM cache_size WHERE id = 0) FROM responses"
+        ).fetchone()
+        
+        with self._stats_lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "entries": entries,
+                "size_bytes": total_size,
+                "max_bytes": self.max_bytes,
+                "path": self.path
+            }
+
+
+# Shared by every watsonx.ai caller in this process
+LLM_RESPONSE_CACHE = LLMResponseCache()
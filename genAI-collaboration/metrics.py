@@ -0,0 +1,295 @@
+"""
+Metrics
+
+This module provides the in-process instrumentation of the matchers and APIs: histograms and
+counters rendered in the Prometheus text format, a timer for the matching stages (preference
+analysis, feature extraction, candidate scoring, LLM calls, insight parsing, serialization),
+a Flask helper adding request timing and a /metrics endpoint to an app, and sampled
+structured (JSON line) logs for high-volume events such as raw LLM responses.
+
+Metrics are kept per process; with several server workers, each worker exposes its own.
+"""
+
+import json
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+# Latency buckets in seconds (from sub-millisecond rule-based stages to slow LLM calls)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# Share of sampled log events that are written, and the longest logged response text
+LOG_SAMPLE_RATE = 0.01
+LOG_TEXT_CHARS = 500
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Matching stages timed with timed()
+PREFERENCE_ANALYSIS = "preference_analysis"
+FEATURE_EXTRACTION = "feature_extraction"
+CANDIDATE_SCORING = "candidate_scoring"
+LLM_CALL = "llm_call"
+INSIGHT_PARSING = "insight_parsing"
+SERIALIZATION = "serialization"
+
+
+def _escape_label_value(value: Any) -> str:
+    """Escape a label value (backslashes, double quotes and newlines)."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    """Format a label set as {name="value",...} (empty when there are no labels)."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value (integers without a decimal point)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+    
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        """
+        Increase the counter.
+        
+        Args:
+            amount: Amount to add
+            **labels: Value of every label name
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        """Get the current value for a label set."""
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+    
+    def render(self) -> List[str]:
+        """Render the counter in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels.
+    """
+    
+    def __init__(self,
+                 name: str,
+                 help_text: str,
+                 labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record an observation.
+        
+        Args:
+            value: Observed value (seconds for latency histograms)
+            **labels: Value of every label name
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][position] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+    
+    def snapshot(self, **labels) -> Optional[Dict[str, Any]]:
+        """
+        Get the observations of a label set.
+        
+        Returns:
+            Dict: Per-bucket (non-cumulative) counts, sum and count, or None if nothing was observed
+        """
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return None if series is None else {
+                "counts": list(series["counts"]), "sum": series["sum"], "count": series["count"]
+            }
+    
+    def render(self) -> List[str]:
+        """Render the histogram in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_format_labels(dict(labels, le=_format_value(bound)))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(dict(labels, le='+Inf'))} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named collection of metrics rendered together.
+    """
+    
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter(name, help_text, labelnames))
+    
+    def histogram(self,
+                  name: str,
+                  help_text: str,
+                  labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+    
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+# The metrics of this process
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = METRICS.histogram(
+    "artist_matcher_stage_seconds", "Time spent in each matching stage.", ("stage",)
+)
+HTTP_REQUEST_SECONDS = METRICS.histogram(
+    "http_request_duration_seconds", "Time to handle an HTTP request.", ("app", "endpoint", "method", "status")
+)
+LOG_EVENTS = METRICS.counter(
+    "artist_matcher_log_events_total", "Sampled log events seen, whether written or not.", ("event",)
+)
+
+# Sampling has its own generator, so it does not move the global random state
+_log_sampler = random.Random()
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Time a matching stage into STAGE_SECONDS (also when it raises).
+    
+    Args:
+        stage: Stage name (PREFERENCE_ANALYSIS, FEATURE_EXTRACTION, ...)
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start_time, stage=stage)
+
+
+def log_sampled(event: str, sample_rate: float = LOG_SAMPLE_RATE, **fields) -> bool:
+    """
+    Write a structured log line for a sample of the occurrences of an event.
+    
+    Every occurrence is counted in LOG_EVENTS; the written line is one JSON object with the
+    event name, a timestamp, the sample rate and the given fields (strings are truncated to
+    LOG_TEXT_CHARS).
+    
+    Args:
+        event: Event name
+        sample_rate: Share of occurrences to write (0 to 1)
+        **fields: Event fields
+    
+    Returns:
+        bool: Whether this occurrence was written
+    """
+    LOG_EVENTS.inc(event=event)
+    if _log_sampler.random() >= sample_rate:
+        return False
+    
+    record = {"ts": round(time.time(), 3), "event": event, "sample_rate": sample_rate}
+    for name, value in fields.items():
+        record[name] = value[:LOG_TEXT_CHARS] if isinstance(value, str) else value
+    print(json.dumps(record, ensure_ascii=False, default=str))
+    return True
+
+
+def instrument_app(app, app_name: str) -> None:
+    """
+    Time every request of a Flask app into HTTP_REQUEST_SECONDS and add a GET /metrics
+    endpoint serving METRICS in the Prometheus text format.
+    
+    Streaming responses are timed until the response object is returned, not until the
+    stream ends.
+    
+    Args:
+        app: Flask application
+        app_name: Value of the "app" label of the app's requests
+    """
+    from flask import Response, g, request
+    
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start_time = time.perf_counter()
+    
+    @app.after_request
+    def _record_request_time(response):
+        start_time = g.pop("metrics_start_time", None)
+        if start_time is not None:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start_time,
+                app=app_name,
+                endpoint=request.url_rule.rule if request.url_rule is not None else "unmatched",
+                method=request.method,
+                status=response.status_code
+            )
+        return response
+    
+    def metrics_endpoint():
+        """Prometheus metrics endpoint"""
+        return Response(METRICS.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+    
+    app.add_url_rule('/metrics', 'metrics', metrics_endpoint, methods=['GET'])
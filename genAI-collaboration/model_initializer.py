@@ -0,0 +1,136 @@
+"""
+Background Model Initializer
+
+This module sets up the watsonx.ai models in a background thread, so constructing a
+matcher (e.g. when an API worker imports it) never blocks on LLM round trips. Every candidate
+model is probed and handed to a ModelRouter, which fails over between them at request time.
+Until a model is confirmed healthy, model is None and the matchers use their rule-based
+fallbacks.
+"""
+
+import threading
+from typing import Dict, List, Any, Optional
+
+from ibm_watsonx_ai import APIClient
+from ibm_watsonx_ai.foundation_models import ModelInference
+
+from model_router import ModelRouter
+
+# Seconds between selection attempts while no model is healthy
+MODEL_RETRY_INTERVAL = 300
+
+
+class BackgroundModelInitializer:
+    """
+    Probe the candidate models off the request path and publish a router over them.
+    """
+    
+    def __init__(self,
+                 credentials,
+                 project_id: str,
+                 model_ids: List[str],
+                 params: Dict[str, Any],
+                 probe_prompt: str = "Hello watsonx!",
+                 retry_interval: float = MODEL_RETRY_INTERVAL):
+        """
+        Start setting up the models in the background.
+        
+        Args:
+            credentials: watsonx.ai Credentials
+            project_id: watsonx.ai project ID
+            model_ids: Candidate models in order of preference
+            params: Generation parameters of the model
+            probe_prompt: Prompt used to check that a model answers
+            retry_interval: Seconds to wait before trying again when no model answered
+        """
+        self.credentials = credentials
+        self.project_id = project_id
+        self.model_ids = list(model_ids)
+        self.params = params
+        self.probe_prompt = probe_prompt
+        self.retry_interval = retry_interval
+        
+        self.client = None
+        self.model = None
+        self._ready = threading.Event()
+        self._stop_event = threading.Event()
+        
+        self._thread = threading.Thread(target=self._run, name="watsonx-model-init", daemon=True)
+        self._thread.start()
+    
+    @property
+    def model_id(self) -> Optional[str]:
+        """ID of the model the router currently prefers, or None."""
+        model = self.model
+        return model.model_id if model is not None else None
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the first setup attempt to finish.
+        
+        Args:
+            timeout: Maximum seconds to wait (forever when None)
+        
+        Returns:
+            bool: True if a model router is available
+        """
+        self._ready.wait(timeout)
+        return self.model is not None
+    
+    def stop(self) -> None:
+        """Stop retrying the setup."""
+        self._stop_event.set()
+    
+    def _run(self) -> None:
+        """Try to set up the models until one answers (or the initializer is stopped)."""
+        while not self._stop_event.is_set():
+            selected = self._select_model()
+            self._ready.set()
+            if selected or self._stop_event.wait(self.retry_interval):
+                return
+    
+    def _select_model(self) -> bool:
+        """
+        Probe every candidate model and publish a router once at least one answers.
+        
+        Models that fail the probe stay in the router with their circuit breaker open, so
+        they get a half-open trial request later instead of being dropped for good.
+        """
+        try:
+            if self.client is None:
+                self.client = APIClient(self.credentials)
+        except Exception as e:
+            print(f"Error creating watsonx.ai client: {e}")
+            return False
+        
+        models = {}
+        healthy = []
+        for model_id in self.model_ids:
+            try:
+                print(f"Trying to initialize with model: {model_id}")
+                models[model_id] = ModelInference(
+                    model_id=model_id,
+                    api_client=self.client,
+                    project_id=self.project_id,
+                    params=self.params
+                )
+            except Exception as e:
+                print(f"Error initializing model {model_id}: {e}")
+        
+        router = ModelRouter(models)
+        for model_id in models:
+            try:
+                # Test the model with a simple prompt (this also seeds its latency window)
+                router.generate_with(model_id, self.probe_prompt)
+                print(f"Model {model_id} initialized successfully")
+                healthy.append(model_id)
+            except Exception as e:
+                print(f"Error initializing model {model_id}: {e}")
+                router.trip(model_id)
+        
+        if not healthy:
+            print("WARNING: Could not initialize any watsonx.ai model. Using fallback methods.")
+            return False
+        
+        self.model = router
+        return True
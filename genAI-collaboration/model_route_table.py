@@ -0,0 +1,185 @@
+"""
+Model Route Table
+
+This module remembers which (model, endpoint) pairs of the watsonx text generation API work.
+Known-good routes are tried first, failing routes are skipped until their negative cache
+entry expires (or a background probe finds them working again), and the table is saved to
+disk so a restart does not have to rediscover the working route.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+# Default settings of the route table
+ROUTE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "watsonx_routes.json")
+ROUTE_FAILURE_TTL = 300  # seconds a failing route is skipped
+
+
+class ModelRouteTable:
+    """
+    Thread-safe, persistent table of working and failing (model, endpoint) routes.
+    """
+    
+    def __init__(self, path: Optional[str] = ROUTE_TABLE_PATH, failure_ttl: float = ROUTE_FAILURE_TTL):
+        """
+        Load the route table.
+        
+        Args:
+            path: JSON file the table is saved to (None keeps it in memory only)
+            failure_ttl: Seconds a failing route is skipped before it is tried again
+        """
+        self.path = path
+        self.failure_ttl = failure_ttl
+        
+        self._lock = threading.RLock()
+        self._routes = {}
+        self._prober = None
+        self._stop_event = threading.Event()
+        
+        self._load()
+    
+    @staticmethod
+    def _route_key(model: str, endpoint: str) -> str:
+        return f"{model} {endpoint}"
+    
+    def candidates(self, models: List[str], endpoints: List[str]) -> List[Tuple[str, str]]:
+        """
+        Order the routes to try for a request.
+        
+        Working routes come first, then routes never tried, then failed routes whose
+        negative cache entry has expired. Routes still within their failure TTL are left
+        out, unless that would leave nothing to try.
+        
+        Args:
+            models: Models in order of preference
+            endpoints: Endpoints in order of preference
+        
+        Returns:
+            List: (model, endpoint) pairs in the order they should be tried
+        """
+        now = time.time()
+        working, unknown, expired, failing = [], [], [], []
+        
+        with self._lock:
+            for model in models:
+                for endpoint in endpoints:
+                    route = self._routes.get(self._route_key(model, endpoint))
+                    if route is None:
+                        unknown.append((model, endpoint))
+                    elif route["ok"]:
+                        working.append((model, endpoint))
+                    elif now >= route["retry_at"]:
+                        expired.append((model, endpoint))
+                    else:
+                        failing.append((model, endpoint))
+        
+        return (working + unknown + expired) or failing
+    
+    def record_success(self, model: str, endpoint: str) -> None:
+        """
+        Remember a working route.
+        
+        Args:
+            model: ID of the model
+            endpoint: Endpoint URL
+        """
+        self._update(model, endpoint, {"ok": True, "checked_at": time.time(), "retry_at": 0})
+    
+    def record_failure(self, model: str, endpoint: str) -> None:
+        """
+        Remember a failing route, skipping it for failure_ttl seconds.
+        
+        Args:
+            model: ID of the model
+            endpoint: Endpoint URL
+        """
+        now = time.time()
+        self._update(model, endpoint, {"ok": False, "checked_at": now, "retry_at": now + self.failure_ttl})
+    
+    def _update(self, model: str, endpoint: str, route: Dict[str, Any]) -> None:
+        """Store a route's state and save the table if it changed."""
+        key = self._route_key(model, endpoint)
+        with self._lock:
+            previous = self._routes.get(key)
+            route = dict(route, model=model, endpoint=endpoint)
+            self._routes[key] = route
+            if previous is None or previous["ok"] != route["ok"]:
+                self._save()
+    
+    def failing_routes(self) -> List[Tuple[str, str]]:
+        """
+        Get every route currently marked as failing.
+        
+        Returns:
+            List: (model, endpoint) pairs
+        """
+        with self._lock:
+            return [(route["model"], route["endpoint"]) for route in self._routes.values() if not route["ok"]]
+    
+    def start_reprobe(self, probe: Callable[[str, str], bool], interval: Optional[float] = None) -> None:
+        """
+        Re-probe failing routes in a background thread, so recovered routes are used again
+        without a user request paying for the failed attempt.
+        
+        Args:
+            probe: Function sending a minimal request over a route, returning True on success
+            interval: Seconds between probe rounds (failure_ttl when None)
+        """
+        if interval is None:
+            interval = self.failure_ttl
+        
+        with self._lock:
+            if self._prober is not None and self._prober.is_alive():
+                return
+            self._prober = threading.Thread(
+                target=self._reprobe_loop, args=(probe, interval), name="watsonx-route-prober", daemon=True
+            )
+            self._prober.start()
+    
+    def stop(self) -> None:
+        """Stop the background prober."""
+        self._stop_event.set()
+    
+    def _reprobe_loop(self, probe: Callable[[str, str], bool], interval: float) -> None:
+        """Probe failing routes every interval seconds."""
+        while not self._stop_event.wait(interval):
+            for model, endpoint in self.failing_routes():
+                try:
+                    working = probe(model, endpoint)
+                except Exception as e:
+                    print(f"Probe of {model} at {endpoint} failed: {e}")
+                    working = False
+                
+                if working:
+                    self.record_success(model, endpoint)
+                else:
+                    self.record_failure(model, endpoint)
+    
+    def _load(self) -> None:
+        """Load the saved table, ignoring a missing or corrupt file."""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r") as f:
+                routes = json.load(f)
+            self._routes = {
+                self._route_key(route["model"], route["endpoint"]): route
+                for route in routes
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            self._routes = {}
+    
+    def _save(self) -> None:
+        """Atomically write the table to disk."""
+        if not self.path:
+            return
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump(list(self._routes.values()), f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save watsonx route table: {e}")
@@ -0,0 +1,279 @@
+"""
+Model Router
+
+This module routes watsonx.ai generation requests across several models. Each model has a
+circuit breaker (closed / open / half-open) and a rolling latency window; requests go to the
+fastest healthy model and fail over to the next one on errors. When every breaker is open,
+the router fails immediately, so callers drop to their rule-based fallbacks without waiting
+for another exception from the API.
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+# Default router settings
+BREAKER_FAILURE_THRESHOLD = 3  # consecutive failures that open a breaker
+BREAKER_RESET_TIMEOUT = 60  # seconds before an open breaker lets a trial request through
+LATENCY_WINDOW = 50  # recent calls kept per model for percentiles
+
+
+class ModelUnavailableError(Exception):
+    """Raised when no model can take a request (every circuit breaker is open)."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    
+    Closed: requests flow. Open: requests are rejected until reset_timeout has passed.
+    Half-open: a single trial request is let through; its outcome closes or re-opens the breaker.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self,
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT):
+        """
+        Initialize a closed breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds an open breaker waits before a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+    
+    def current_state(self) -> str:
+        """Get the state, moving an open breaker to half-open once its timeout has passed."""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self.state
+    
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (claims the trial slot when half-open)."""
+        state = self.current_state()
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+    
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+    
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold or after a failed trial."""
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+    
+    def trip(self) -> None:
+        """Open the breaker now."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Rolling window of call latencies with percentile lookups.
+    """
+    
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples = deque(maxlen=window)
+    
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+    
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Get a latency percentile (nearest-rank) over the window.
+        
+        Args:
+            percent: Percentile between 0 and 100
+        
+        Returns:
+            float: Latency in seconds, or None when no call has been measured
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+        return ordered[min(rank, len(ordered) - 1)]
+
+
+class ModelRouter:
+    """
+    Route generate_text() calls to the fastest healthy model, failing over on errors.
+    
+    The router can be used wherever a single ModelInference was used: it provides
+    generate_text() and model_id (the model currently preferred).
+    """
+    
+    def __init__(self,
+                 models: Dict[str, Any],
+                 failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 reset_timeout: float = BREAKER_RESET_TIMEOUT,
+                 latency_window: int = LATENCY_WINDOW):
+        """
+        Initialize the router.
+        
+        Args:
+            models: Model objects (with generate_text) by model ID, in order of preference
+            failure_threshold: Consecutive failures that open a model's breaker
+            reset_timeout: Seconds before an open breaker lets a trial request through
+            latency_window: Number of recent calls used for a model's latency percentiles
+        """
+        self.models = dict(models)
+        self.model_ids = list(models)
+        self.breakers = {
+            model_id: CircuitBreaker(failure_threshold, reset_timeout) for model_id in self.model_ids
+        }
+        self.latencies = {model_id: LatencyTracker(latency_window) for model_id in self.model_ids}
+        self._lock = threading.Lock()
+    
+    @property
+    def model_id(self) -> Optional[str]:
+        """ID of the model the next request would go to, or None if all breakers are open."""
+        route = self.route()
+        return route[0] if route else None
+    
+    def route(self) -> List[str]:
+        """
+        Order the models for the next request.
+        
+        Closed breakers come first, fastest median latency first (unmeasured models keep
+        their preference order ahead of measured ones, so they get measured); half-open
+        models follow. Models with an open breaker are left out.
+        
+        Returns:
+            List: Model IDs to try, in order
+        """
+        with self._lock:
+            closed, half_open = [], []
+            for position, model_id in enumerate(self.model_ids):
+                state = self.breakers[model_id].current_state()
+                if state == CircuitBreaker.CLOSED:
+                    median = self.latencies[model_id].percentile(50)
+                    closed.append((median is not None, median or 0.0, position, model_id))
+                elif state == CircuitBreaker.HALF_OPEN:
+                    half_open.append(model_id)
+        
+        return [model_id for *_, model_id in sorted(closed)] + half_open
+    
+    def generate(self, prompt: str, **kwargs) -> Tuple[Any, str]:
+        """
+        Generate text with the best available model.
+        
+        Args:
+            prompt: Prompt text
+            **kwargs: Other arguments of the models' generate_text (e.g. params)
+        
+        Returns:
+            Tuple: Generated text and the ID of the model that produced it
+        
+        Raises:
+            ModelUnavailableError: If every model is open or failed
+        """
+        errors = []
+        for model_id in self.route():
+            with self._lock:
+                allowed = self.breakers[model_id].allow_request()
+            if not allowed:
+                continue
+            
+            try:
+                return self.generate_with(model_id, prompt, **kwargs), model_id
+            except Exception as e:
+                print(f"Model {model_id} failed ({self.breakers[model_id].state}): {e}")
+                errors.append(f"{model_id}: {e}")
+        
+        raise ModelUnavailableError(
+            "No watsonx.ai model available" + (f" ({'; '.join(errors)})" if errors else ", all circuit breakers are open")
+        )
+    
+    def generate_with(self, model_id: str, prompt: str, **kwargs) -> Any:
+        """
+        Generate text with one specific model, recording the outcome on its breaker and
+        latency window (the breaker is not consulted, e.g. for health probes).
+        
+        Args:
+            model_id: ID of the model
+            prompt: Prompt text
+            **kwargs: Other arguments of the model's generate_text
+        
+        Returns:
+            Any: Generated text
+        """
+        start_time = time.perf_counter()
+        try:
+            response = self.models[model_id].generate_text(prompt, **kwargs)
+        except Exception:
+            with self._lock:
+                self.breakers[model_id].record_failure()
+            raise
+        
+        with self._lock:
+            self.breakers[model_id].record_success()
+            self.latencies[model_id].record(time.perf_counter() - start_time)
+        return response
+    
+    def generate_text(self, prompt: str, **kwargs) -> Any:
+        """
+        Generate text with the best available model (see generate()).
+        
+        Args:
+            prompt: Prompt text
+            **kwargs: Other arguments of the models' generate_text
+        
+        Returns:
+            Any: Generated text
+        """
+        return self.generate(prompt, **kwargs)[0]
+    
+    def trip(self, model_id: str) -> None:
+        """
+        Open a model's breaker (e.g. after a failed health probe).
+        
+        Args:
+            model_id: ID of the model
+        """
+        with self._lock:
+            self.breakers[model_id].trip()
+    
+    def available(self) -> bool:
+        """Whether any model can currently take a request."""
+        return bool(self.route())
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-model routing statistics.
+        
+        Returns:
+            Dict: Breaker state, consecutive failures, calls measured and p50/p95 latency per model
+        """
+        with self._lock:
+            return {
+                model_id: {
+                    "state": self.breakers[model_id].current_state(),
+                    "consecutive_failures": self.breakers[model_id].consecutive_failures,
+                    "calls_measured": len(self.latencies[model_id].samples),
+                    "p50_seconds": self.latencies[model_id].percentile(50),
+                    "p95_seconds": self.latencies[model_id].percentile(95)
+                }
+                for model_id in self.model_ids
+            }
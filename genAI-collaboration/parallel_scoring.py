@@ -0,0 +1,269 @@
+"""
+Parallel Compatibility Scoring
+
+This module spreads DigitalArtistMatcher's pure-Python candidate scoring over a persistent
+process pool, so one request on a large catalog uses every core instead of one. Each worker
+holds its own read-only copy of the feature index (handed over once, when the pool starts);
+a request sends only the compact preference analysis and a shard of candidate positions to
+each worker, and merges the local top-k lists the workers return.
+
+Artists invalidated or added after the copy was made are scored in the requesting process
+with their current features; once too many are, a new pool is started with a fresh copy, and
+the old one is closed once the requests still using it are done.
+"""
+
+import os
+import time
+import heapq
+import threading
+import multiprocessing
+from typing import Dict, List, Any, Callable, Optional, Set, Tuple
+
+# Default settings of the parallel scoring pool
+PARALLEL_SCORING_PROCESSES = os.cpu_count() or 1
+PARALLEL_MIN_CANDIDATES = 5000  # smaller catalogs are not worth the inter-process overhead
+PARALLEL_REFRESH_THRESHOLD = 256  # invalidated or added artists scored locally before the pool is restarted
+PARALLEL_SHARD_TIMEOUT = 60  # seconds to wait for a worker's shard before scoring it in-process
+
+# Feature index copy and scoring function of a pool worker
+_worker_state = {}
+
+
+def _init_worker(score_features: Callable, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Keep the scoring function and the feature index copy in a pool worker."""
+    _worker_state.update(score_features=score_features, items=items)
+
+
+def _score_entries(score_features: Callable,
+                   items: List[Tuple[str, Dict[str, Any]]],
+                   positions: range,
+                   preference_analysis: Dict[str, Any],
+                   exclude_artist_id: Optional[str],
+                   require_keyword_overlap: bool,
+                   skip_ids: Set[str]) -> List[Tuple[float, Dict[str, float], int, str]]:
+    """Score the candidates at some catalog positions as (score, breakdown, position, artist ID) entries."""
+    entries = []
+    for position in positions:
+        candidate_id, features = items[position]
+        if candidate_id == exclude_artist_id or candidate_id in skip_ids:
+            continue
+        
+        score, score_breakdown = score_features(features, preference_analysis)
+        if require_keyword_overlap and not score_breakdown["keyword_relevance"]:
+            continue
+        entries.append((score, score_breakdown, position, candidate_id))
+    return entries
+
+
+def _entry_order(entry: Tuple[float, Dict[str, float], int, str]) -> Tuple[float, int]:
+    return -entry[0], entry[2]
+
+
+def _top_entries(entries: List[Tuple[float, Dict[str, float], int, str]],
+                 top_k: Optional[int]) -> List[Tuple[float, Dict[str, float], int, str]]:
+    """Order entries by score, highest first with ties in catalog order, keeping at most top_k."""
+    if top_k is None:
+        return sorted(entries, key=_entry_order)
+    return heapq.nsmallest(top_k, entries, key=_entry_order)
+
+
+def _score_shard(start: int,
+                 stop: int,
+                 preference_analysis: Dict[str, Any],
+                 exclude_artist_id: Optional[str],
+                 top_k: Optional[int],
+                 require_keyword_overlap: bool,
+                 skip_ids: Set[str]) -> List[Tuple[float, Dict[str, float], int, str]]:
+    """Score a shard of the catalog in a pool worker and return its local top_k."""
+    entries = _score_entries(
+        _worker_state["score_features"], _worker_state["items"], range(start, stop),
+        preference_analysis, exclude_artist_id, require_keyword_overlap, skip_ids
+    )
+    return _top_entries(entries, top_k)
+
+
+class ParallelScoringPool:
+    """
+    Persistent process pool ranking the candidates of a feature index.
+    """
+    
+    def __init__(self,
+                 feature_index,
+                 score_features: Callable[[Dict[str, Any], Dict[str, Any]], Tuple[float, Dict[str, float]]],
+                 processes: int = PARALLEL_SCORING_PROCESSES,
+                 min_candidates: int = PARALLEL_MIN_CANDIDATES,
+                 refresh_threshold: int = PARALLEL_REFRESH_THRESHOLD,
+                 shard_timeout: float = PARALLEL_SHARD_TIMEOUT):
+        """
+        Initialize the pool (its processes start with the first parallel request).
+        
+        Args:
+            feature_index: ArtistFeatureIndex whose candidates are ranked
+            score_features: Function scoring a candidate's features against a preference
+                            analysis (a module-level or static function, so it can be pickled)
+            processes: Number of worker processes
+            min_candidates: Catalog size from which should_parallelize() is true
+            refresh_threshold: Number of invalidated or added artists after which the workers
+                               get a fresh copy of the feature index
+            shard_timeout: Seconds to wait for a shard before scoring it in this process
+                           (e.g. when its worker died)
+        """
+        self.feature_index = feature_index
+        self.score_features = score_features
+        self.processes = processes
+        self.min_candidates = min_candidates
+        self.refresh_threshold = refresh_threshold
+        self.shard_timeout = shard_timeout
+        
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._items = None
+        self._stale_ids = set()
+        # Requests in flight per pool of this process, and replaced pools still in use
+        self._pool_users = {}
+        self._retired_pools = set()
+        feature_index.add_listener(self._on_invalidate)
+    
+    def _on_invalidate(self, artist_id: str) -> None:
+        """Score an artist locally until the workers get a fresh copy of its features."""
+        with self._lock:
+            if self._items is not None:
+                self._stale_ids.add(artist_id)
+    
+    def _get_pool(self) -> Tuple[Any, List[Tuple[str, Dict[str, Any]]], Set[str]]:
+        """
+        Get this process's pool for a request, (re)starting it when needed.
+        
+        Every call must be paired with a _release_pool() call once the request is done.
+        
+        Returns:
+            Tuple: Pool, its feature index copy and the artists invalidated or added since
+                   the copy was made
+        """
+        with self._lock:
+            if self._pool_pid != os.getpid():
+                # A pool inherited through a fork belongs to the parent process
+                self._pool = None
+                self._pool_users = {}
+                self._retired_pools = set()
+            
+            if self._pool is None or len(self._stale_ids) > self.refresh_threshold:
+                if self._pool is not None:
+                    # Requests still scoring in the old pool keep it until they are done
+                    self._retired_pools.add(self._pool)
+                    self._close_retired(self._pool)
+                
+                self._items = self.feature_index.items()
+                self._stale_ids = set()
+                
+                # Forked workers share the copy's pages; otherwise it is pickled once per worker
+                start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+                self._pool = multiprocessing.get_context(start_method).Pool(
+                    self.processes, initializer=_init_worker, initargs=(self.score_features, self._items)
+                )
+                self._pool_pid = os.getpid()
+            
+            self._pool_users[self._pool] = self._pool_users.get(self._pool, 0) + 1
+            return self._pool, self._items, set(self._stale_ids)
+    
+    def _release_pool(self, pool) -> None:
+        """End a request's use of a pool from _get_pool(), closing the pool if it was replaced."""
+        with self._lock:
+            if self._pool_pid != os.getpid() or pool not in self._pool_users:
+                return
+            self._pool_users[pool] -= 1
+            self._close_retired(pool)
+    
+    def _close_retired(self, pool) -> None:
+        """Close a replaced pool with no requests left, letting its workers exit in the background."""
+        if pool not in self._retired_pools or self._pool_users.get(pool, 0) > 0:
+            return
+        self._retired_pools.discard(pool)
+        self._pool_users.pop(pool, None)
+        pool.close()
+        threading.Thread(target=pool.join, name="parallel-scoring-retire", daemon=True).start()
+    
+    def should_parallelize(self) -> bool:
+        """Whether requests are worth scoring in the pool (several processes and a large catalog)."""
+        return self.processes > 1 and len(self.feature_index) >= self.min_candidates
+    
+    def rank(self,
+             preference_analysis: Dict[str, Any],
+             top_k: Optional[int] = None,
+             exclude_artist_id: Optional[str] = None,
+             require_keyword_overlap: bool = False) -> List[Tuple[Tuple[float, Dict[str, float]], str]]:
+        """
+        Rank the candidates for a preference, highest score first.
+        
+        Ties keep catalog order, matching the stable sort of the single-process path.
+        
+        Args:
+            preference_analysis: Analyzed chatbot preference
+            top_k: Optional maximum number of candidates to return
+            exclude_artist_id: Optional artist to leave out (the requesting artist)
+            require_keyword_overlap: Leave out candidates sharing none of the preference keywords
+                                     (ignored when the preference has no keywords)
+        
+        Returns:
+            List: ((score, score breakdown), candidate ID) pairs
+        """
+        require_keyword_overlap = require_keyword_overlap and bool(preference_analysis.get("keywords"))
+        # Only the fields the score reads are sent to the workers
+        preference_analysis = {key: preference_analysis.get(key, []) for key in ("tools", "art_types", "keywords")}
+        
+        pool, items, stale_ids = self._get_pool()
+        try:
+            shard_size = -(-len(items) // self.processes)
+            shards = [
+                (start, min(start + shard_size, len(items)))
+                for start in range(0, len(items), shard_size)
+            ]
+            results = [
+                pool.apply_async(_score_shard, (
+                    start, stop, preference_analysis, exclude_artist_id, top_k, require_keyword_overlap, stale_ids
+                ))
+                for start, stop in shards
+            ]
+            
+            # Invalidated and added artists are scored here with their current features
+            stale_items = [
+                (artist_id, features) for artist_id, features in
+                ((artist_id, self.feature_index.get(artist_id)) for artist_id in stale_ids)
+                if features is not None
+            ]
+            entries = [
+                (score, score_breakdown, self.feature_index.position(candidate_id), candidate_id)
+                for score, score_breakdown, _, candidate_id in _score_entries(
+                    self.score_features, stale_items, range(len(stale_items)),
+                    preference_analysis, exclude_artist_id, require_keyword_overlap, set()
+                )
+            ]
+            
+            deadline = time.monotonic() + self.shard_timeout
+            for (start, stop), result in zip(shards, results):
+                try:
+                    entries.extend(result.get(timeout=max(deadline - time.monotonic(), 0)))
+                except multiprocessing.TimeoutError:
+                    print(f"Parallel scoring shard {start}-{stop} timed out, scoring it in-process")
+                    entries.extend(_score_entries(
+                        self.score_features, items, range(start, stop),
+                        preference_analysis, exclude_artist_id, require_keyword_overlap, stale_ids
+                    ))
+        finally:
+            self._release_pool(pool)
+        
+        return [
+            ((score, score_breakdown), candidate_id)
+            for score, score_breakdown, _, candidate_id in _top_entries(entries, top_k)
+        ]
+    
+    def close(self) -> None:
+        """Stop the worker processes (of the current and any replaced pool)."""
+        with self._lock:
+            if self._pool_pid == os.getpid():
+                for pool in self._retired_pools | ({self._pool} if self._pool is not None else set()):
+                    pool.terminate()
+            self._pool = None
+            self._pool_users = {}
+            self._retired_pools = set()
@@ -0,0 +1,184 @@
+"""
+Preference Analysis Cache
+
+This module provides a bounded, thread-safe cache with TTL expiry and LRU or FIFO eviction,
+and the cache shared by the chatbot preference analysis entry points. The same preference
+text (each artist's stored preference, or a message resent by the chatbot UI) is then only
+analyzed once per engine instead of on every request.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable, Optional
+
+# Default settings of the shared preference analysis cache
+PREFERENCE_CACHE_MAXSIZE = 1024
+PREFERENCE_CACHE_TTL = 3600  # seconds
+PREFERENCE_CACHE_POLICY = "lru"
+
+
+def normalize_preference_text(preference_text: str) -> str:
+    """
+    Normalize preference text for use as a cache key.
+    
+    Args:
+        preference_text: Raw chatbot preference text
+    
+    Returns:
+        str: Lowercased text with runs of whitespace collapsed to single spaces
+    """
+    return re.sub(r"\s+", " ", (preference_text or "").strip()).lower()
+
+
+class TTLCache:
+    """
+    A bounded key-value cache with per-entry expiry.
+    
+    With the "lru" policy, the least recently used entry is evicted when the cache is full;
+    with "fifo", the oldest inserted entry is. Entries older than ttl seconds are treated
+    as missing (ttl=None disables expiry).
+    """
+    
+    POLICIES = ("lru", "fifo")
+    
+    def __init__(self,
+                 maxsize: int = PREFERENCE_CACHE_MAXSIZE,
+                 ttl: Optional[float] = PREFERENCE_CACHE_TTL,
+                 policy: str = PREFERENCE_CACHE_POLICY,
+                 timer: Callable[[], float] = time.monotonic):
+        """
+        Initialize the cache.
+        
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Seconds an entry stays valid, or None for no expiry
+            policy: Eviction policy, "lru" or "fifo"
+            timer: Clock used for expiry (monotonic time by default)
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.policy = policy
+        self.timer = timer
+        
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get a cached value.
+        
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+        
+        Returns:
+            Any: Cached value, or default if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or self.timer() < expires_at:
+                    self._hits += 1
+                    if self.policy == "lru":
+                        self._entries.move_to_end(key)
+                    return value
+                
+                del self._entries[key]
+                self._expirations += 1
+            
+            self._misses += 1
+            return default
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting entries if the cache is full.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+        """
+        expires_at = self.timer() + self.ttl if self.ttl is not None else None
+        
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at, value)
+            
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+        
+        The lock is not held while computing, so a slow computation (such as an LLM call)
+        does not block lookups of other keys.
+        
+        Args:
+            key: Cache key
+            compute: Function producing the value on a miss
+        
+        Returns:
+            Any: Cached or freshly computed value
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.set(key, value)
+        return value
+    
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Remove an entry from the cache.
+        
+        Args:
+            key: Cache key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Remove every entry (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dict: Hits, misses, hit rate, evictions, expirations, size and settings
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "policy": self.policy
+            }
+
+
+# Shared by every preference analysis entry point; keys are (engine id, normalized text)
+PREFERENCE_ANALYSIS_CACHE = TTLCache()
@@ -0,0 +1,200 @@
+"""
+Production Server
+
+This script serves one of the Flask APIs with gunicorn prefork workers. The app module (with
+its matcher, feature index, artist repository and compiled taxonomies) is imported and warmed
+up once in the master process; the objects are then moved out of the garbage collector's
+reach with gc.freeze(), so the forked workers share their memory pages copy-on-write instead
+of each building and touching its own copy.
+
+GET /ready is the readiness probe (GET /api/health stays the liveness check). With
+--no-preload, each worker imports and warms up the app itself in the background: it accepts
+requests right away, answering /ready (and every other request) with 503 until its warmup
+finished, and 200 afterwards. With the default preload, the master warms up before the
+workers are forked and the port is opened, so the probe cannot connect until then and every
+worker answers 200.
+
+Usage:
+    python serve.py --app digital --workers 4 --threads 8
+    SERVE_WORKERS=8 python serve.py --app digital-basic --bind 0.0.0.0:8080
+"""
+
+import gc
+import os
+import json
+import time
+import argparse
+import importlib
+import threading
+import multiprocessing
+from typing import Dict, List, Any, Callable
+
+from gunicorn.app.base import BaseApplication
+
+# Default settings of the production server (overridden by the environment, then the command line)
+SERVE_BIND = os.environ.get("SERVE_BIND", "0.0.0.0:8080")
+SERVE_WORKERS = int(os.environ.get("SERVE_WORKERS", multiprocessing.cpu_count()))
+SERVE_THREADS = int(os.environ.get("SERVE_THREADS", 4))  # request threads per worker
+SERVE_TIMEOUT = int(os.environ.get("SERVE_TIMEOUT", 120))  # seconds before a silent worker is restarted
+
+# Served app modules (each defines a Flask "app" and a "matcher")
+APPS = {
+    "digital": "digital_artist_api_updated",
+    "digital-basic": "digital_artist_api",
+    "collaboration": "api"
+}
+
+# Readiness of this process (inherited by the workers forked after a preloaded warmup)
+READINESS = {"ready": False, "warmup_seconds": None, "error": None}
+
+
+def warm_up(module: Any) -> None:
+    """
+    Run a first request through an app's matcher, so the lazily built structures (feature
+    index, scoring tables, preference taxonomies) exist before the workers are forked.
+    
+    Args:
+        module: Imported app module
+    """
+    matcher = module.matcher
+    repository = getattr(matcher, "repository", None)
+    if repository is None:
+        # ArtistCollaborationMatcher keeps no catalog; it is ready once created
+        return
+    
+    artist = next(iter(repository), None)
+    if artist is not None:
+        matcher.find_collaborators(artist["artistId"], top_k=1)
+        matcher.find_collaborators(artist["artistId"], "digital illustration with Photoshop", top_k=1)
+        if hasattr(matcher, "find_collaborators_batch"):
+            # Encodes the catalog matrices of the batch endpoint
+            matcher.find_collaborators_batch([(artist["artistId"], None)], top_k=1)
+
+
+def load_app(module_name: str, freeze: bool) -> Any:
+    """
+    Import and warm up an app module, then mark this process as ready.
+    
+    Args:
+        module_name: Name of the app module
+        freeze: Whether to move the loaded objects to the permanent generation (before forking)
+    
+    Returns:
+        Flask: The app
+    """
+    start_time = time.perf_counter()
+    
+    # No collections while the index is built; freezing afterwards keeps the workers from
+    # touching (and so copying) the shared pages during their own collections
+    gc.disable()
+    try:
+        module = importlib.import_module(module_name)
+        warm_up(module)
+    finally:
+        gc.enable()
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    
+    READINESS.update(ready=True, warmup_seconds=round(time.perf_counter() - start_time, 3))
+    print(f"{module_name} warmed up in {READINESS['warmup_seconds']}s (pid {os.getpid()}, "
+          f"{gc.get_freeze_count()} objects frozen)")
+    return module.app
+
+
+class ReadinessApp:
+    """
+    WSGI app answering GET /ready itself and passing every other request to the API app
+    once it is loaded.
+    """
+    
+    def __init__(self, module_name: str, freeze: bool, background: bool):
+        """
+        Load the API app, in this thread or in a background thread.
+        
+        Args:
+            module_name: Name of the app module
+            freeze: Whether to freeze the loaded objects (see load_app())
+            background: Load in a background thread, so requests are answered (with 503)
+                        during the warmup
+        """
+        self.module_name = module_name
+        self.app = None
+        if background:
+            threading.Thread(target=self._load_in_background, args=(freeze,), name="warmup", daemon=True).start()
+        else:
+            self.app = load_app(module_name, freeze)
+    
+    def _load_in_background(self, freeze: bool) -> None:
+        try:
+            self.app = load_app(self.module_name, freeze)
+        except Exception as e:
+            # The worker keeps answering 503, with the error in its readiness
+            READINESS["error"] = str(e)
+            print(f"Warmup of {self.module_name} failed: {e}")
+    
+    @staticmethod
+    def _json_response(start_response: Callable, status: str, payload: Dict[str, Any]) -> List[bytes]:
+        body = json.dumps(payload).encode("utf-8")
+        start_response(status, [("Content-Type", "application/json"), ("Content-Length", str(len(body)))])
+        return [body]
+    
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Any:
+        if environ.get("PATH_INFO") == "/ready":
+            status = "200 OK" if READINESS["ready"] else "503 Service Unavailable"
+            return self._json_response(start_response, status, dict(READINESS, pid=os.getpid()))
+        
+        if self.app is None:
+            return self._json_response(start_response, "503 Service Unavailable", {"error": "Warming up"})
+        return self.app(environ, start_response)
+
+
+class MatcherServer(BaseApplication):
+    """
+    Gunicorn application serving one of the APIs.
+    """
+    
+    def __init__(self, module_name: str, options: Dict[str, Any]):
+        """
+        Initialize the server.
+        
+        Args:
+            module_name: Name of the app module (a value of APPS)
+            options: Gunicorn settings
+        """
+        self.module_name = module_name
+        self.options = options
+        super().__init__()
+    
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+    
+    def load(self):
+        preload = self.cfg.preload_app
+        return ReadinessApp(self.module_name, freeze=preload, background=not preload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve an artist matcher API with prefork workers")
+    parser.add_argument("--app", choices=sorted(APPS), default="digital", help="API to serve")
+    parser.add_argument("--bind", default=SERVE_BIND, help="address to listen on")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="worker processes")
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS, help="request threads per worker")
+    parser.add_argument("--timeout", type=int, default=SERVE_TIMEOUT, help="worker timeout in seconds")
+    parser.add_argument("--no-preload", action="store_true", help="load the app in every worker instead of the master")
+    args = parser.parse_args()
+    
+    options = {
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "worker_class": "gthread",
+        "timeout": args.timeout,
+        "preload_app": not args.no_preload
+    }
+    MatcherServer(APPS[args.app], options).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""
+SQLite Artist Repository
+
+This module stores the artist catalog in SQLite, with tables for artists, gallery items and
+the secondary index facets. It offers the same interface as ArtistRepository, but artists
+are read on demand and iteration streams the catalog in batches, so uploads survive restarts
+and server workers share one copy. Every write bumps the artist's version in a change log,
+which lets each worker find the artists other workers changed (see changes_since()).
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+
+from artist_repository import LOCATION, TOOL, ART_TYPE, location_terms, _normalize, gallery_item_id
+
+# Default settings of the SQLite artist repository
+ARTIST_DB_BATCH_SIZE = 500  # artists read per query while iterating
+
+
+class SQLiteArtistRepository:
+    """
+    Persistent artist catalog with indexes by artistId, location, primary tool and art type.
+    """
+    
+    def __init__(self,
+                 path: str,
+                 seed_artists: Optional[Iterable[Dict[str, Any]]] = None,
+                 batch_size: int = ARTIST_DB_BATCH_SIZE):
+        """
+        Open (and if needed create) the catalog database.
+        
+        Args:
+            path: Path of the SQLite database file
+            seed_artists: Optional artists imported when the catalog is empty
+            batch_size: Number of artists read per query while iterating
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        
+        if seed_artists is not None and len(self) == 0:
+            self.import_artists(seed_artists)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, reopening it after a fork."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS artists (
+                    position INTEGER PRIMARY KEY AUTOINCREMENT,
+                    artist_id TEXT NOT NULL UNIQUE,
+                    name TEXT NOT NULL DEFAULT '',
+                    location TEXT NOT NULL DEFAULT '',
+                    profile TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS gallery_items (
+                    artist_id TEXT NOT NULL REFERENCES artists (artist_id) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    item_id TEXT,
+                    title TEXT NOT NULL DEFAULT '',
+                    medium TEXT NOT NULL DEFAULT '',
+                    item TEXT NOT NULL,
+                    PRIMARY KEY (artist_id, position)
+                );
+                CREATE TABLE IF NOT EXISTS artist_facets (
+                    facet TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    artist_id TEXT NOT NULL REFERENCES artists (artist_id) ON DELETE CASCADE,
+                    PRIMARY KEY (facet, value, artist_id)
+                );
+                CREATE INDEX IF NOT EXISTS artist_facets_artist ON artist_facets (artist_id, facet);
+                CREATE TABLE IF NOT EXISTS artist_changes (
+                    artist_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS artist_changes_version ON artist_changes (version);
+                """
+            )
+            connection.commit()
+            
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def backup(self, path: str) -> "SQLiteArtistRepository":
+        """
+        Copy the catalog database to another file.
+        
+        Args:
+            path: Path of the copy
+        
+        Returns:
+            SQLiteArtistRepository: The copy
+        """
+        target = sqlite3.connect(path)
+        try:
+            self._connection().backup(target)
+        finally:
+            target.close()
+        return SQLiteArtistRepository(path, batch_size=self.batch_size)
+    
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM artists").fetchone()[0]
+    
+    def __contains__(self, artist_id: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM artists WHERE artist_id = ?", (artist_id,)).fetchone()
+        return row is not None
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_artists()
+    
+    def iter_artists(self, batch_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the catalog in catalog order, reading batch_size artists per query.
+        
+        Args:
+            batch_size: Number of artists per query (self.batch_size when None)
+        
+        Yields:
+            Dict: Artist profiles with their galleries
+        """
+        if batch_size is None:
+            batch_size = self.batch_size
+        
+        last_position = 0
+        while True:
+            rows = self._connection().execute(
+                "SELECT position, artist_id, profile FROM artists WHERE position > ? ORDER BY position LIMIT ?",
+                (last_position, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            
+            galleries = self._galleries([artist_id for _, artist_id, _ in rows])
+            for position, artist_id, profile in rows:
+                yield self._artist(profile, galleries.get(artist_id, []))
+            last_position = rows[-1][0]
+    
+    def _galleries(self, artist_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Read the gallery items of several artists with one query."""
+        placeholders = ", ".join("?" for _ in artist_ids)
+        rows = self._connection().execute(
+            f"SELECT artist_id, item FROM gallery_items WHERE artist_id IN ({placeholders}) "
+            "ORDER BY artist_id, position",
+            artist_ids
+        )
+        
+        galleries = {}
+        for artist_id, item in rows:
+            galleries.setdefault(artist_id, []).append(json.loads(item))
+        return galleries
+    
+    @staticmethod
+    def _artist(profile: str, gallery: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Rebuild an artist profile from its stored row and gallery items."""
+        artist = json.loads(profile)
+        artist["completeGallery"] = gallery
+        return artist
+    
+    def get(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an artist by ID.
+        
+        Args:
+            artist_id: ID of the artist
+        
+        Returns:
+            Dict: Artist profile (a fresh copy), or None if there is no such artist
+        """
+        row = self._connection().execute("SELECT profile FROM artists WHERE artist_id = ?", (artist_id,)).fetchone()
+        if row is None:
+            return None
+        return self._artist(row[0], self._galleries([artist_id]).get(artist_id, []))
+    
+    def add(self, artist: Dict[str, Any]) -> None:
+        """
+        Add an artist to the catalog, or replace its profile and gallery if it exists.
+        
+        Args:
+            artist: Artist profile
+        """
+        connection = self._connection()
+        with connection:
+            self._write_artist(connection, artist)
+    
+    def import_artists(self, artists: Iterable[Dict[str, Any]]) -> int:
+        """
+        Add or replace many artists in one transaction.
+        
+        Args:
+            artists: Artist profiles
+        
+        Returns:
+            int: Number of artists written
+        """
+        connection = self._connection()
+        count = 0
+        with connection:
+            for artist in artists:
+                self._write_artist(connection, artist)
+                count += 1
+        return count
+    
+    def _write_artist(self, connection: sqlite3.Connection, artist: Dict[str, Any]) -> None:
+        """Upsert an artist, its gallery and its location facets (inside a transaction)."""
+        artist_id = artist["artistId"]
+        basic_info = artist.get("basicInfo", {})
+        profile = {key: value for key, value in artist.items() if key != "completeGallery"}
+        
+        connection.execute(
+            "INSERT INTO artists (artist_id, name, location, profile) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (artist_id) DO UPDATE SET name = excluded.name, location = excluded.location, "
+            "profile = excluded.profile",
+            (artist_id, basic_info.get("name", ""), basic_info.get("location", ""), json.dumps(profile, ensure_ascii=False))
+        )
+        
+        connection.execute("DELETE FROM gallery_items WHERE artist_id = ?", (artist_id,))
+        connection.executemany(
+            "INSERT INTO gallery_items (artist_id, position, item_id, title, medium, item) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (artist_id, position, item.get("id"), item.get("title", ""), item.get("medium", ""),
+                 json.dumps(item, ensure_ascii=False))
+                for position, item in enumerate(artist.get("completeGallery", []))
+            ]
+        )
+        
+        self._write_facets(connection, artist_id, LOCATION, location_terms(basic_info.get("location", "")))
+        self._record_change(connection, artist_id)
+    
+    @staticmethod
+    def _record_change(connection: sqlite3.Connection, artist_id: str) -> None:
+        """Give a changed artist the next catalog version (inside a write transaction)."""
+        connection.execute(
+            "INSERT INTO artist_changes (artist_id, version) "
+            "SELECT ?, COALESCE(MAX(version), 0) + 1 FROM artist_changes WHERE true "
+            "ON CONFLICT (artist_id) DO UPDATE SET version = excluded.version",
+            (artist_id,)
+        )
+    
+    def change_version(self) -> int:
+        """Get the version of the latest change to the catalog (0 before any change)."""
+        return self._connection().execute("SELECT COALESCE(MAX(version), 0) FROM artist_changes").fetchone()[0]
+    
+    def changes_since(self, version: int) -> Tuple[int, List[str]]:
+        """
+        Get the artists whose profile or gallery changed after a catalog version, in any process.
+        
+        Args:
+            version: Catalog version of the last check (from change_version() or a previous call)
+        
+        Returns:
+            Tuple: The latest catalog version and the IDs of the changed artists
+        """
+        rows = self._connection().execute(
+            "SELECT artist_id, version FROM artist_changes WHERE version > ? ORDER BY version", (version,)
+        ).fetchall()
+        if not rows:
+            return version, []
+        return rows[-1][1], [artist_id for artist_id, _ in rows]
+    
+    def add_gallery_item(self, artist_id: str, artwork: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Append an artwork to an artist's gallery.
+        
+        Args:
+            artist_id: ID of the artist
+            artwork: Artwork entry; without an "id", the next gallery id (IMG001, ...) is used
+        
+        Returns:
+            Dict: The stored artwork, or None if there is no such artist
+        """
+        connection = self._connection()
+        with connection:
+            # Take the write lock before reading the gallery size, so concurrent uploads from
+            # other workers cannot pick the same position
+            connection.execute("BEGIN IMMEDIATE")
+            if artist_id not in self:
+                return None
+            gallery_size, position = connection.execute(
+                "SELECT COUNT(*), COALESCE(MAX(position) + 1, 0) FROM gallery_items WHERE artist_id = ?", (artist_id,)
+            ).fetchone()
+            
+            artwork = dict(artwork)
+            artwork.setdefault("id", gallery_item_id(gallery_size))
+            connection.execute(
+                "INSERT INTO gallery_items (artist_id, position, item_id, title, medium, item) VALUES (?, ?, ?, ?, ?, ?)",
+                (artist_id, position, artwork["id"], artwork.get("title", ""), artwork.get("medium", ""),
+                 json.dumps(artwork, ensure_ascii=False))
+            )
+            self._record_change(connection, artist_id)
+        return artwork
+    
+    def index_facets(self, artist_id: str, index: str, values: Iterable[str]) -> None:
+        """
+        Replace the values an artist is indexed under in a secondary index.
+        
+        Args:
+            artist_id: ID of the artist
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            values: The artist's values for that index
+        """
+        connection = self._connection()
+        with connection:
+            self._write_facets(connection, artist_id, index, values)
+    
+    def index_facets_many(self, index: str, facets: Iterable[Tuple[str, Iterable[str]]]) -> None:
+        """
+        Replace the values of many artists in a secondary index, in one transaction.
+        
+        Args:
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            facets: (artist ID, the artist's values for that index) pairs
+        """
+        connection = self._connection()
+        with connection:
+            for artist_id, values in facets:
+                self._write_facets(connection, artist_id, index, values)
+    
+    @staticmethod
+    def _write_facets(connection: sqlite3.Connection, artist_id: str, index: str, values: Iterable[str]) -> None:
+        """Store an artist's facet values, skipping the write when they did not change."""
+        values = {_normalize(value) for value in values if value}
+        current = {
+            value for (value,) in connection.execute(
+                "SELECT value FROM artist_facets WHERE artist_id = ? AND facet = ?", (artist_id, index)
+            )
+        }
+        if current == values:
+            return
+        
+        connection.execute("DELETE FROM artist_facets WHERE artist_id = ? AND facet = ?", (artist_id, index))
+        connection.executemany(
+            "INSERT INTO artist_facets (facet, value, artist_id) VALUES (?, ?, ?)",
+            [(index, value, artist_id) for value in values]
+        )
+    
+    def find(self, index: str, value: str) -> List[Dict[str, Any]]:
+        """
+        Get the artists indexed under a value, in catalog order.
+        
+        Args:
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            value: Value to look up (case-insensitive)
+        
+        Returns:
+            List: Matching artist profiles
+        """
+        return [self.get(artist_id) for artist_id in self.find_ids(index, value)]
+    
+    def find_ids(self, index: str, value: str) -> List[str]:
+        """
+        Get the IDs of the artists indexed under a value, in catalog order.
+        
+        Args:
+            index: Secondary index (LOCATION, TOOL or ART_TYPE)
+            value: Value to look up (case-insensitive)
+        
+        Returns:
+            List: Matching artist IDs
+        """
+        rows = self._connection().execute(
+            "SELECT a.artist_id FROM artist_facets f JOIN artists a ON a.artist_id = f.artist_id "
+            "WHERE f.facet = ? AND f.value = ? ORDER BY a.position",
+            (index, _normalize(value))
+        )
+        return [artist_id for (artist_id,) in rows]
+    
+    def search(self, criteria: Dict[str, Optional[str]]) -> List[Dict[str, Any]]:
+        """
+        Get the artists matching every given criterion, in catalog order.
+        
+        Args:
+            criteria: Value per secondary index (empty values are ignored)
+        
+        Returns:
+            List: Matching artist profiles (the whole catalog when no criterion is given)
+        """
+        selected_ids = None
+        for index, value in criteria.items():
+            if not value:
+                continue
+            ids = self.find_ids(index, value)
+            if selected_ids is None:
+                selected_ids = ids
+            else:
+                ids = set(ids)
+                selected_ids = [artist_id for artist_id in selected_ids if artist_id in ids]
+        
+        if selected_ids is None:
+            return list(self.iter_artists())
+        return [self.get(artist_id) for artist_id in selected_ids]
+    
+    def by_location(self, location: str) -> List[Dict[str, Any]]:
+        """Get the artists in a location (full location, city or country)."""
+        return self.find(LOCATION, location)
+    
+    def by_tool(self, tool: str) -> List[Dict[str, Any]]:
+        """Get the artists with a tool among their primary tools."""
+        return self.find(TOOL, tool)
+    
+    def by_art_type(self, art_type: str) -> List[Dict[str, Any]]:
+        """Get the artists with an art type among their primary art types."""
+        return self.find(ART_TYPE, art_type)
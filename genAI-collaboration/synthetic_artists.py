@@ -0,0 +1,245 @@
+"""
+Synthetic Artist Generator
+
+This module generates seeded synthetic artist catalogs for benchmarks, in the schema of
+DIGITAL_ARTISTS (digital_artist_data.py) or of MOCK_ARTISTS (mock_artists_data.py). Tools,
+art types and locations follow skewed popularity weights (a few tools such as Photoshop and
+Procreate are everywhere, most are niche), so keyword overlaps and index postings look like a
+real catalog rather than a uniform one. The same seed always gives the same artists, and a
+smaller catalog is a prefix of a larger one.
+"""
+
+import random
+import itertools
+from typing import Dict, List, Any, Iterator, Tuple
+
+# Tools by popularity weight (display names, as they appear in bios and gallery mediums)
+TOOL_WEIGHTS = {
+    "Photoshop": 30, "Procreate": 24, "Illustrator": 14, "Blender": 12, "After Effects": 10,
+    "Lightroom": 8, "Figma": 7, "ZBrush": 5, "Cinema 4D": 5, "Maya": 4, "Substance Painter": 4,
+    "Clip Studio": 4, "Unity": 3, "Unreal": 3, "Premiere": 3, "TouchDesigner": 2, "Spark AR": 2,
+    "Sketch": 2, "Capture One": 1, "Toonboom": 1, "Spine": 1, "Resolume": 1, "Ableton": 1,
+    "Lens Studio": 1
+}
+
+# Art types by popularity weight, with the tools artists of that type favour and example works
+ART_TYPES = {
+    "illustration": {"weight": 30, "tools": ["Procreate", "Photoshop", "Illustrator", "Clip Studio"],
+                     "works": ["book cover illustration", "editorial illustration", "character illustration"]},
+    "3d": {"weight": 16, "tools": ["Blender", "ZBrush", "Maya", "Substance Painter", "Cinema 4D"],
+           "works": ["3D character model", "3D environment render", "3D product visualization"]},
+    "animation": {"weight": 12, "tools": ["After Effects", "Toonboom", "Spine", "Blender"],
+                  "works": ["2D animation loop", "animated short", "character animation"]},
+    "photography": {"weight": 12, "tools": ["Lightroom", "Photoshop", "Capture One"],
+                    "works": ["documentary photo series", "portrait photography", "street photography"]},
+    "ui/ux": {"weight": 8, "tools": ["Figma", "Sketch", "Illustrator"],
+              "works": ["mobile app interface", "UI design system", "UX prototype"]},
+    "concept art": {"weight": 6, "tools": ["Photoshop", "Procreate", "Blender"],
+                    "works": ["concept art for a game", "environment concept art", "creature concept art"]},
+    "motion graphics": {"weight": 5, "tools": ["After Effects", "Cinema 4D", "Premiere"],
+                        "works": ["motion graphics title sequence", "motion graphics ad", "kinetic typography"]},
+    "mural": {"weight": 3, "tools": ["Procreate", "Photoshop"],
+              "works": ["mural concept", "street art mockup", "mural-to-digital piece"]},
+    "nft": {"weight": 3, "tools": ["Procreate", "Blender", "Photoshop"],
+            "works": ["NFT collection", "generative NFT drop", "NFT artwork"]},
+    "ar/vr": {"weight": 2, "tools": ["Spark AR", "Lens Studio", "Unity", "Unreal"],
+              "works": ["AR filter", "VR gallery experience", "augmented reality installation"]},
+    "video": {"weight": 2, "tools": ["Premiere", "After Effects", "TouchDesigner"],
+              "works": ["music video edit", "short film visuals", "video installation"]},
+    "music visual": {"weight": 1, "tools": ["TouchDesigner", "Resolume", "Ableton"],
+                     "works": ["live music visuals", "album art visualizer", "audio-reactive visuals"]}
+}
+
+# Locations by weight (big creative hubs are over-represented)
+LOCATION_WEIGHTS = {
+    "New York, USA": 10, "Los Angeles, USA": 8, "London, UK": 8, "Berlin, Germany": 6,
+    "Tokyo, Japan": 6, "Paris, France": 5, "Mexico City, Mexico": 4, "Mumbai, India": 4,
+    "Seoul, South Korea": 4, "Toronto, Canada": 4, "Sao Paulo, Brazil": 3, "Lagos, Nigeria": 3,
+    "Milan, Italy": 3, "Sydney, Australia": 3, "Nairobi, Kenya": 2, "Stockholm, Sweden": 2,
+    "Buenos Aires, Argentina": 2, "Cape Town, South Africa": 2, "Jakarta, Indonesia": 2,
+    "Reykjavik, Iceland": 1
+}
+
+FIRST_NAMES = ["Elena", "Raj", "Aisha", "Marcus", "Sofia", "Kenji", "Amara", "Lucas", "Mei", "Omar",
+               "Priya", "Diego", "Hana", "Noah", "Zara", "Ivan", "Leila", "Mateo", "Yuki", "Chloe"]
+LAST_NAMES = ["Vasquez", "Patel", "Thompson", "Chen", "Rossi", "Tanaka", "Okafor", "Silva", "Kim",
+              "Haddad", "Sharma", "Garcia", "Sato", "Muller", "Nguyen", "Petrov", "Ahmed", "Lopez"]
+
+# Portfolio highlights; some contain the matcher's quality indicators
+HIGHLIGHTS = ["Featured on Behance", "Award winner at a regional festival", "Shown at a group exhibition",
+              "Published in a magazine", "Went viral with 1M views", "Sold as NFT + Print",
+              "Client commission", "Personal project", "Licensed for a campaign", "10k+ downloads"]
+
+PREFERENCE_TEMPLATES = [
+    "Looking for {art_type} artists who work in {tool}. {extra}",
+    "Need a {art_type} collaborator with {tool} skills for a {project}. {extra}",
+    "Want digital artists who do {art_type} in {tool} and {tool2}. {extra}",
+    "Seeking {art_type} specialists for a {project}. {tool} experience preferred."
+]
+PREFERENCE_EXTRAS = ["AR/VR experience is a plus.", "Animation bonus.", "Mural experience preferred.",
+                     "Must have exhibition experience.", "NFT background welcome.", ""]
+PROJECTS = ["book cover series", "music video", "game", "museum exhibit", "brand campaign",
+            "album release", "public art project", "mobile app"]
+
+SKILLS_BY_ART_TYPE = {
+    "illustration": ["digital illustration", "character design", "color theory"],
+    "3d": ["3D modeling", "texturing", "rigging"],
+    "animation": ["animation", "storyboarding", "motion capture"],
+    "photography": ["photography", "photo editing", "lighting"],
+    "ui/ux": ["UI/UX design", "prototyping", "design systems"],
+    "concept art": ["concept art", "environment design", "visual development"],
+    "motion graphics": ["motion graphics", "compositing", "typography"],
+    "mural": ["mural painting", "large-scale composition", "street art"],
+    "nft": ["generative art", "NFT minting", "digital collectibles"],
+    "ar/vr": ["AR development", "VR environments", "real-time rendering"],
+    "video": ["video editing", "cinematography", "color grading"],
+    "music visual": ["live visuals", "audio-reactive design", "VJing"]
+}
+
+
+def _cumulative(weights: Dict[str, int]) -> Tuple[List[str], List[int]]:
+    """Turn a weight table into the population and cumulative weights random.choices takes."""
+    return list(weights), list(itertools.accumulate(weights.values()))
+
+
+TOOL_TABLE = _cumulative(TOOL_WEIGHTS)
+ART_TYPE_TABLE = _cumulative({name: spec["weight"] for name, spec in ART_TYPES.items()})
+LOCATION_TABLE = _cumulative(LOCATION_WEIGHTS)
+
+
+def _weighted_sample(rng: random.Random, table: Tuple[List[str], List[int]], k: int) -> List[str]:
+    """Pick k distinct keys of a cumulative weight table, each draw weighted by the weights."""
+    population, cum_weights = table
+    chosen = []
+    while len(chosen) < min(k, len(population)):
+        choice = rng.choices(population, cum_weights=cum_weights)[0]
+        if choice not in chosen:
+            chosen.append(choice)
+    return chosen
+
+
+def _artist_tools(rng: random.Random, art_types: List[str]) -> List[str]:
+    """Pick an artist's tools: mostly those of their art types, plus popular general ones."""
+    tools = []
+    for art_type in art_types:
+        tools.extend(rng.sample(ART_TYPES[art_type]["tools"], k=min(2, len(ART_TYPES[art_type]["tools"]))))
+    tools.extend(_weighted_sample(rng, TOOL_TABLE, rng.randint(0, 2)))
+    return list(dict.fromkeys(tools))
+
+
+def _preference_text(rng: random.Random) -> str:
+    """Write a chatbot preference asking for a (popularity-weighted) art type and tools."""
+    art_type = _weighted_sample(rng, ART_TYPE_TABLE, 1)[0]
+    tool, tool2 = (rng.sample(ART_TYPES[art_type]["tools"], k=2)
+                   if len(ART_TYPES[art_type]["tools"]) > 1 else ART_TYPES[art_type]["tools"] * 2)
+    return rng.choice(PREFERENCE_TEMPLATES).format(
+        art_type=art_type, tool=tool, tool2=tool2, project=rng.choice(PROJECTS), extra=rng.choice(PREFERENCE_EXTRAS)
+    ).strip()
+
+
+def generate_digital_artists(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Generate artists in the DIGITAL_ARTISTS schema.
+    
+    Args:
+        count: Number of artists
+        seed: Random seed
+    
+    Yields:
+        Dict: Artist profiles with artistId SYN0000001, SYN0000002, ...
+    """
+    rng = random.Random(seed)
+    item_number = 0
+    
+    for index in range(1, count + 1):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        art_types = _weighted_sample(rng, ART_TYPE_TABLE, rng.choices([1, 2, 3], weights=[5, 4, 1])[0])
+        tools = _artist_tools(rng, art_types)
+        years = rng.randint(1, 15)
+        
+        gallery = []
+        for _ in range(rng.randint(1, 8)):
+            item_number += 1
+            art_type = rng.choice(art_types)
+            medium_tools = rng.sample(tools, k=min(len(tools), rng.randint(1, 2)))
+            gallery.append({
+                "id": f"IMG{item_number:07d}",
+                "title": f"{rng.choice(['Untitled', 'Study', 'Series', 'Project'])} {item_number}",
+                "year": rng.randint(2018, 2025),
+                "medium": f"Digital ({' + '.join(medium_tools)})",
+                "url": f"https://example.com/artworks/{item_number}.jpg",
+                "description": f"{rng.choice(ART_TYPES[art_type]['works']).capitalize()} made in "
+                               f"{' and '.join(medium_tools)}. {rng.choice(HIGHLIGHTS)}."
+            })
+        
+        handle = f"{first_name}{last_name}{index}".lower()
+        yield {
+            "artistId": f"SYN{index:07d}",
+            "basicInfo": {
+                "name": f"{first_name} {last_name}",
+                "age": rng.randint(20, 60),
+                "location": _weighted_sample(rng, LOCATION_TABLE, 1)[0],
+                "email": f"{handle}@example.com",
+                "bio": f"Digital {' and '.join(art_types)} artist - {', '.join(tools)}. {years}+ years.",
+                "website": f"{handle}.example.com",
+                "social": [f"@{handle} (IG)"]
+            },
+            "chatbotPreferences": {
+                "preferenceText": _preference_text(rng)
+            },
+            "completeGallery": gallery
+        }
+
+
+def generate_mock_artists(count: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Generate artists in the MOCK_ARTISTS schema (used by ArtistCollaborationMatcher).
+    
+    Args:
+        count: Number of artists
+        seed: Random seed
+    
+    Yields:
+        Dict: Artist profiles with id artist1, artist2, ...
+    """
+    rng = random.Random(seed)
+    
+    for index in range(1, count + 1):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        art_types = _weighted_sample(rng, ART_TYPE_TABLE, rng.choices([1, 2, 3], weights=[5, 4, 1])[0])
+        tools = _artist_tools(rng, art_types)
+        skills = list(dict.fromkeys(
+            skill for art_type in art_types for skill in rng.sample(SKILLS_BY_ART_TYPE[art_type], k=2)
+        ))
+        wanted_types = _weighted_sample(rng, ART_TYPE_TABLE, 2)
+        
+        handle = f"{first_name}{last_name}{index}".lower()
+        yield {
+            "id": f"artist{index}",
+            "name": f"{first_name} {last_name}",
+            "profile_image": f"https://example.com/portraits/{index}.jpg",
+            "bio": f"{art_types[0].capitalize()} artist working in {', '.join(tools)}.",
+            "skills": skills,
+            "style": rng.choice(["Vibrant", "Minimal", "Dark", "Realistic", "Surreal"]) + " "
+                     + rng.choice(["sci-fi", "fantasy", "abstract", "documentary", "retro"])
+                     + " with " + rng.choice(["bold colors", "soft lighting", "clean lines", "rich textures"]),
+            "past_projects": [
+                {
+                    "title": f"{rng.choice(PROJECTS).title()} {project}",
+                    "role": rng.choice(["Lead Artist", "Contributor", "Designer", "Animator"]),
+                    "year": rng.randint(2018, 2025),
+                    "description": rng.choice(ART_TYPES[rng.choice(art_types)]["works"]).capitalize()
+                }
+                for project in range(1, rng.randint(1, 6) + 1)
+            ],
+            "collaboration_preferences": {
+                "preferred_skills": [rng.choice(SKILLS_BY_ART_TYPE[art_type]) for art_type in wanted_types],
+                "preferred_experience_level": rng.choice(["any", "intermediate", "intermediate to advanced"]),
+                "preferred_project_types": rng.sample(PROJECTS, k=2),
+                "communication_style": rng.choice(["regular check-ins", "async updates", "weekly calls"])
+            },
+            "portfolio_url": f"https://{handle}.example.com",
+            "location": _weighted_sample(rng, LOCATION_TABLE, 1)[0],
+            "availability": rng.choice(["Full-time", "Part-time, 20 hours/week", "Project-based"]),
+            "languages": rng.sample(["English", "Spanish", "French", "Japanese", "Hindi", "Portuguese"], k=rng.randint(1, 2))
+        }
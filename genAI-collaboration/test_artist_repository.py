@@ -0,0 +1,58 @@
+"""
+Test that re-adding an artist replaces its profile everywhere the catalog is read from
+"""
+
+import os
+import copy
+import shutil
+import tempfile
+
+from artist_repository import ArtistRepository
+from sqlite_artist_repository import SQLiteArtistRepository
+from digital_artist_data import DIGITAL_ARTISTS
+
+
+def relocated(artist, location):
+    """Copy an artist profile with another location."""
+    artist = copy.deepcopy(artist)
+    artist["basicInfo"]["location"] = location
+    return artist
+
+
+def check_readd(repository):
+    """Re-add the first artist with a new location and check every read path."""
+    artist_ids = [artist["artistId"] for artist in repository]
+    repository.add(relocated(DIGITAL_ARTISTS[0], "Tokyo, Japan"))
+    
+    assert len(repository) == len(DIGITAL_ARTISTS)
+    assert [artist["artistId"] for artist in repository] == artist_ids
+    assert repository.get("ART001")["basicInfo"]["location"] == "Tokyo, Japan"
+    
+    iterated = next(artist for artist in repository if artist["artistId"] == "ART001")
+    assert iterated["basicInfo"]["location"] == "Tokyo, Japan"
+    searched = next(artist for artist in repository.search({}) if artist["artistId"] == "ART001")
+    assert searched["basicInfo"]["location"] == "Tokyo, Japan"
+    
+    assert [artist["artistId"] for artist in repository.by_location("tokyo")] == ["ART001"]
+    assert repository.by_location("mexico city") == []
+
+
+def test_readd_in_memory():
+    """The in-memory catalog replaces a re-added artist in place"""
+    check_readd(ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS)))
+    print("Re-added artist replaces the in-memory profile")
+
+
+def test_readd_sqlite():
+    """The SQLite catalog replaces a re-added artist in place"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        check_readd(SQLiteArtistRepository(os.path.join(temp_dir, "artists.sqlite3"), seed_artists=DIGITAL_ARTISTS))
+    finally:
+        shutil.rmtree(temp_dir)
+    print("Re-added artist replaces the SQLite profile")
+
+
+if __name__ == "__main__":
+    test_readd_in_memory()
+    test_readd_sqlite()
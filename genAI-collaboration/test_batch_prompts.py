@@ -0,0 +1,105 @@
+"""
+Test the token-budget splitting and answer parsing of batched compatibility prompts
+"""
+
+from batch_prompts import (
+    build_batch_compatibility_prompt, candidate_profile_text, split_into_batches, parse_batch_response,
+    batch_max_new_tokens, estimate_tokens, context_tokens, DEFAULT_CONTEXT_TOKENS, OUTPUT_TOKENS_PER_CANDIDATE
+)
+
+REQUESTER = {"artistId": "REQ", "basicInfo": {"name": "Requester", "bio": "3D artist looking for a sound designer."}}
+PREFERENCE = "Looking for someone to score an animated short"
+
+
+def make_candidate(index, bio="Sound designer and composer."):
+    """Build a small candidate profile."""
+    return {
+        "artistId": f"C{index:03d}",
+        "basicInfo": {"name": f"Candidate {index}", "bio": bio},
+        "completeGallery": [{"title": "Track", "medium": "Audio", "description": "An ambient piece"}]
+    }
+
+
+def prompt_tokens(batch):
+    """Estimated tokens of a batch's prompt plus its reserved answer."""
+    prompt = build_batch_compatibility_prompt(REQUESTER, batch, PREFERENCE)
+    return estimate_tokens(prompt) + batch_max_new_tokens(batch)
+
+
+def test_split_by_batch_size():
+    """Candidates are split by batch size, in order, when the context is large enough"""
+    candidates = [make_candidate(i) for i in range(20)]
+    batches = split_into_batches(REQUESTER, candidates, PREFERENCE, batch_size=8, max_tokens=131072)
+    
+    assert [len(batch) for batch in batches] == [8, 8, 4]
+    assert [candidate for batch in batches for candidate in batch] == candidates
+    
+    try:
+        split_into_batches(REQUESTER, candidates, PREFERENCE, batch_size=0)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    
+    print("Batches are split by batch size")
+
+
+def test_split_by_token_budget():
+    """Batches are closed before the prompt plus the expected answer exceed the context window"""
+    candidates = [make_candidate(i) for i in range(10)]
+    base_tokens = estimate_tokens(build_batch_compatibility_prompt(REQUESTER, [], PREFERENCE))
+    candidate_tokens = estimate_tokens(candidate_profile_text(candidates[0])) + OUTPUT_TOKENS_PER_CANDIDATE
+    # Room for exactly three candidates
+    max_tokens = base_tokens + 3 * candidate_tokens + candidate_tokens // 2
+    
+    batches = split_into_batches(REQUESTER, candidates, PREFERENCE, batch_size=8, max_tokens=max_tokens)
+    assert [len(batch) for batch in batches] == [3, 3, 3, 1]
+    for batch in batches:
+        assert prompt_tokens(batch) <= max_tokens, (prompt_tokens(batch), max_tokens)
+    
+    # A candidate too large for any batch still gets a batch of its own
+    huge = make_candidate(99, bio="Composer. " * 2000)
+    batches = split_into_batches(REQUESTER, candidates[:2] + [huge] + candidates[2:4], PREFERENCE,
+                                 batch_size=8, max_tokens=max_tokens)
+    assert [[candidate["artistId"] for candidate in batch] for batch in batches] == [
+        ["C000", "C001"], ["C099"], ["C002", "C003"]
+    ]
+    
+    assert context_tokens(["ibm/granite-13b-instruct-v2", "ibm/granite-3-8b-instruct"]) == 4096
+    assert context_tokens(["unknown/model"]) == DEFAULT_CONTEXT_TOKENS
+    assert context_tokens([]) == DEFAULT_CONTEXT_TOKENS
+    
+    print("Batches fit the token budget")
+
+
+def test_parse_and_clamp():
+    """Scores are clamped to 0-100 and malformed or unexpected entries are dropped"""
+    text = """Here are the results:
+    [
+        {"artistId": "C001", "score": 150, "insights": ["Great match"]},
+        {"artistId": "C002", "score": -5, "insights": "Different styles"},
+        {"artistId": "C003", "score": "72.5", "insights": []},
+        {"artistId": "C004", "score": "high", "insights": []},
+        {"artistId": "C005", "insights": ["No score"]},
+        {"artistId": "C999", "score": 80, "insights": []},
+        "not an entry"
+    ]
+    Let me know if you need more."""
+    
+    results = parse_batch_response(text, ["C001", "C002", "C003", "C004", "C005"])
+    assert results == {
+        "C001": {"score": 100, "insights": ["Great match"]},
+        "C002": {"score": 0, "insights": ["Different styles"]},
+        "C003": {"score": 72.5, "insights": []}
+    }, results
+    
+    assert parse_batch_response("No JSON here", ["C001"]) == {}
+    assert parse_batch_response("[{\"artistId\": \"C001\", \"score\": ", ["C001"]) == {}
+    assert parse_batch_response("[1, 2]", ["C001"]) == {}
+    
+    print("Batch answers are parsed and clamped")
+
+
+if __name__ == "__main__":
+    test_split_by_batch_size()
+    test_split_by_token_budget()
+    test_parse_and_clamp()
@@ -0,0 +1,147 @@
+"""
+Test that artists added to the catalog after startup are matched by every scoring engine
+"""
+
+import os
+import copy
+import shutil
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+from artist_repository import ArtistRepository, TOOL
+from compatibility_matrix import CompatibilityMatrix
+from digital_artist_data import DIGITAL_ARTISTS
+from digital_artist_matcher import DigitalArtistMatcher
+from parallel_scoring import ParallelScoringPool
+from sqlite_artist_repository import SQLiteArtistRepository
+
+NEW_ARTIST_ID = "ART009"
+PREFERENCE = "Looking for 3D artists who work in Blender for an NFT project. Need someone with AR/VR experience."
+
+
+def new_artist():
+    """Build an artist that is not in the demo catalog."""
+    artist = copy.deepcopy(DIGITAL_ARTISTS[2])
+    artist["artistId"] = NEW_ARTIST_ID
+    artist["basicInfo"]["name"] = "New Artist"
+    artist["chatbotPreferences"] = {"preferenceText": "Need a photographer who edits in Lightroom for a book."}
+    return artist
+
+
+def summarize(matches):
+    """Reduce matches to the fields every engine must agree on"""
+    return [
+        (match["artist"]["artistId"], match["compatibility_score"], match["score_breakdown"])
+        for match in matches
+    ]
+
+
+def add_in_other_process(db_path):
+    """Add the new artist from another process, like another server worker would."""
+    SQLiteArtistRepository(db_path).add(new_artist())
+
+
+def test_cross_worker_add():
+    """An artist added by another worker is indexed and matched by every engine"""
+    temp_dir = tempfile.mkdtemp()
+    matchers = []
+    try:
+        db_path = os.path.join(temp_dir, "artists.sqlite3")
+        repository = SQLiteArtistRepository(db_path, seed_artists=DIGITAL_ARTISTS)
+        
+        python_matcher = DigitalArtistMatcher(repository=repository)
+        vectorized_matcher = DigitalArtistMatcher(scoring_engine="vectorized", repository=repository)
+        parallel_matcher = DigitalArtistMatcher(scoring_engine="parallel", repository=repository)
+        parallel_matcher.parallel_pool = ParallelScoringPool(
+            parallel_matcher.feature_index, parallel_matcher._score_features, processes=2, min_candidates=0
+        )
+        matrix_matcher = DigitalArtistMatcher(
+            repository=repository, compatibility_matrix_path=os.path.join(temp_dir, "matrix.npy")
+        )
+        matchers = [python_matcher, vectorized_matcher, parallel_matcher, matrix_matcher]
+        
+        # Start the pool and warm every engine before the catalog grows
+        for matcher in matchers:
+            assert NEW_ARTIST_ID not in [match["artist"]["artistId"] for match in matcher.find_collaborators("ART001")]
+        
+        process = multiprocessing.get_context("fork").Process(target=add_in_other_process, args=(db_path,))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        
+        fresh_matcher = DigitalArtistMatcher(repository=SQLiteArtistRepository(db_path))
+        for artist_id in ("ART001", "ART005", NEW_ARTIST_ID):
+            for preference in (None, PREFERENCE):
+                expected = summarize(fresh_matcher.find_collaborators(artist_id, preference))
+                assert NEW_ARTIST_ID in [entry[0] for entry in expected] or artist_id == NEW_ARTIST_ID
+                for matcher in matchers:
+                    actual = summarize(matcher.find_collaborators(artist_id, preference))
+                    assert actual == expected, (matcher.scoring_engine, artist_id, preference)
+        
+        # The new artist's primary tools are written to the shared facet index
+        features = python_matcher.feature_index.get(NEW_ARTIST_ID)
+        for tool in features["primary_tools"]:
+            assert NEW_ARTIST_ID in repository.find_ids(TOOL, tool)
+        
+        # The grown matrix equals one built for the larger catalog
+        rebuilt = CompatibilityMatrix(fresh_matcher, os.path.join(temp_dir, "rebuilt.npy"), processes=1)
+        assert matrix_matcher.compatibility_matrix.artist_ids == rebuilt.artist_ids
+        assert np.array_equal(np.array(matrix_matcher.compatibility_matrix.matrix), np.array(rebuilt.matrix))
+        
+        # Reopened by a restarted worker, the stored matrix is reused as it is
+        reopened = CompatibilityMatrix(fresh_matcher, os.path.join(temp_dir, "matrix.npy"))
+        assert np.array_equal(np.array(reopened.matrix), np.array(rebuilt.matrix))
+    finally:
+        for matcher in matchers:
+            if matcher.parallel_pool is not None:
+                matcher.parallel_pool.close()
+        shutil.rmtree(temp_dir)
+    
+    print("Artists added by another worker are matched")
+
+
+def test_reopen_grows_matrix():
+    """A matrix file of a smaller catalog grows instead of being rebuilt"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "matrix.npy")
+        DigitalArtistMatcher(repository=ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS)), compatibility_matrix_path=path)
+        
+        matcher = DigitalArtistMatcher(repository=ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS) + [new_artist()]))
+        grown = CompatibilityMatrix(matcher, path)
+        rebuilt = CompatibilityMatrix(matcher, os.path.join(temp_dir, "rebuilt.npy"), processes=1)
+        assert grown.artist_ids == rebuilt.artist_ids
+        assert np.array_equal(np.array(grown.matrix), np.array(rebuilt.matrix))
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Stored matrix grows with the catalog")
+
+
+def test_in_process_add():
+    """Invalidating an artist added to the in-memory catalog indexes it"""
+    repository = ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS))
+    matcher = DigitalArtistMatcher(scoring_engine="vectorized", repository=repository)
+    assert matcher.feature_index.get(NEW_ARTIST_ID) is None
+    
+    repository.add(new_artist())
+    matcher.feature_index.invalidate(NEW_ARTIST_ID)
+    assert matcher.feature_index.position(NEW_ARTIST_ID) == len(DIGITAL_ARTISTS)
+    
+    expected = summarize(DigitalArtistMatcher(repository=repository).find_collaborators("ART001", PREFERENCE))
+    assert summarize(matcher.find_collaborators("ART001", PREFERENCE)) == expected
+    assert NEW_ARTIST_ID in [entry[0] for entry in expected]
+    
+    # Unknown artists are still ignored
+    matcher.feature_index.invalidate("ART999")
+    assert "ART999" not in matcher.feature_index
+    
+    print("Artists added in this process are indexed on invalidation")
+
+
+if __name__ == "__main__":
+    test_cross_worker_add()
+    test_reopen_grows_matrix()
+    test_in_process_add()
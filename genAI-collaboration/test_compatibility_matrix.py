@@ -0,0 +1,88 @@
+"""
+Test that incremental compatibility matrix updates match a full rebuild
+"""
+
+import os
+import copy
+import shutil
+import tempfile
+
+import numpy as np
+
+from artist_repository import ArtistRepository
+from compatibility_matrix import CompatibilityMatrix, SELF_SCORE
+from digital_artist_data import DIGITAL_ARTISTS
+from digital_artist_matcher import DigitalArtistMatcher
+
+
+def change_artist(matcher, artist_id):
+    """Give an artist a new stored preference and a new artwork, then invalidate it."""
+    artist = matcher.repository.get(artist_id)
+    artist["chatbotPreferences"] = {
+        "preferenceText": "Need a 3D artist who works in Blender and Unity for an AR/VR installation."
+    }
+    matcher.repository.add_gallery_item(artist_id, {
+        "title": "Spark AR Portal",
+        "medium": "3D (Blender, Unity)",
+        "description": "Interactive AR filter and VR walkthrough. Featured in a museum exhibition."
+    })
+    matcher.feature_index.invalidate(artist_id)
+
+
+def test_update_matches_rebuild():
+    """Rows and columns recomputed after an invalidation equal a freshly built matrix"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        matcher = DigitalArtistMatcher(
+            repository=ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS)),
+            compatibility_matrix_path=os.path.join(temp_dir, "matrix.npy")
+        )
+        compatibility_matrix = matcher.compatibility_matrix
+        artist_id = "ART001"
+        row = compatibility_matrix.rows[artist_id]
+        before = np.array(compatibility_matrix.matrix)
+        
+        change_artist(matcher, artist_id)
+        # The next lookup recomputes the artist's row and column
+        ranking = compatibility_matrix.rank(artist_id)
+        updated = np.array(compatibility_matrix.matrix)
+        assert not np.array_equal(updated[row], before[row])
+        assert not np.array_equal(updated[:, row], before[:, row])
+        
+        rebuilt = CompatibilityMatrix(matcher, os.path.join(temp_dir, "rebuilt.npy"), processes=2)
+        assert np.array_equal(updated, np.array(rebuilt.matrix))
+        assert np.all(np.diag(updated) == SELF_SCORE)
+        assert sorted(score for _, score in ranking) == sorted(np.delete(updated[row], row))
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Updated rows and columns match a full rebuild")
+
+
+def test_reopen_updates_changed_rows():
+    """Reopening a matrix file recomputes the artists changed since it was written"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "matrix.npy")
+        DigitalArtistMatcher(
+            repository=ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS)), compatibility_matrix_path=path
+        )
+        original = np.load(path)
+        
+        # Another process changed the catalog while the matrix file was not in use
+        matcher = DigitalArtistMatcher(repository=ArtistRepository(copy.deepcopy(DIGITAL_ARTISTS)))
+        change_artist(matcher, "ART003")
+        reopened = CompatibilityMatrix(matcher, path)
+        assert not np.array_equal(np.array(reopened.matrix), original)
+        
+        rebuilt = CompatibilityMatrix(matcher, os.path.join(temp_dir, "rebuilt.npy"), processes=1)
+        assert np.array_equal(np.array(reopened.matrix), np.array(rebuilt.matrix))
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Reopened matrix is brought up to date")
+
+
+if __name__ == "__main__":
+    test_update_matches_rebuild()
+    test_reopen_updates_changed_rows()
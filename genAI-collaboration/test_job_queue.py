@@ -0,0 +1,159 @@
+"""
+Test deduplication, result expiry and crash recovery of the persistent job queue
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+import threading
+import subprocess
+import sys
+
+from job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED
+
+
+def make_handler():
+    """Build a handler that blocks until released and records its calls."""
+    calls = []
+    release = threading.Event()
+    
+    def handler(params):
+        calls.append(params)
+        release.wait(10)
+        if params.get("fail"):
+            raise ValueError("bad request")
+        return {"echo": params["value"]}
+    
+    return handler, calls, release
+
+
+def dead_pid():
+    """Get the pid of a process that has exited."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_deduplication():
+    """Identical requests share one job; failed jobs are not reused"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        handler, calls, release = make_handler()
+        queue = JobQueue(handler, path=os.path.join(temp_dir, "jobs.sqlite3"), max_workers=2)
+        
+        first = queue.submit({"value": 1})
+        assert first["status"] in (QUEUED, RUNNING)
+        assert queue.submit({"value": 1})["job_id"] == first["job_id"]
+        other = queue.submit({"value": 2})
+        assert other["job_id"] != first["job_id"]
+        
+        release.set()
+        job = queue.wait(first["job_id"], timeout=10)
+        assert job["status"] == DONE and job["result"] == {"echo": 1}, job
+        # A finished, unexpired job is still reused
+        assert queue.submit({"value": 1})["job_id"] == first["job_id"]
+        queue.wait(other["job_id"], timeout=10)
+        assert len(calls) == 2, calls
+        
+        failed = queue.submit({"value": 3, "fail": True})
+        job = queue.wait(failed["job_id"], timeout=10)
+        assert job["status"] == FAILED and job["error"] == "bad request", job
+        retry = queue.submit({"value": 3, "fail": True})
+        assert retry["job_id"] != failed["job_id"]
+        queue.wait(retry["job_id"], timeout=10)
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Identical requests are deduplicated")
+
+
+def test_result_ttl():
+    """Finished jobs expire after the result TTL and a new request runs again"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        handler, calls, release = make_handler()
+        release.set()
+        queue = JobQueue(handler, path=os.path.join(temp_dir, "jobs.sqlite3"), result_ttl=0.2)
+        
+        first = queue.submit({"value": 1})
+        assert queue.wait(first["job_id"], timeout=10)["status"] == DONE
+        assert queue.get(first["job_id"]) is not None
+        
+        time.sleep(0.3)
+        assert queue.get(first["job_id"]) is None
+        assert queue.stats()[DONE] == 0
+        
+        second = queue.submit({"value": 1})
+        assert second["job_id"] != first["job_id"]
+        assert queue.wait(second["job_id"], timeout=10)["result"] == {"echo": 1}
+        assert len(calls) == 2, calls
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Finished jobs expire after the TTL")
+
+
+def test_recover_interrupted():
+    """Unfinished jobs of dead processes and of earlier queues in this process are failed"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "jobs.sqlite3")
+        handler, calls, release = make_handler()
+        release.set()
+        JobQueue(handler, path=path).stats()
+        
+        now = time.time()
+        jobs = [
+            ("dead-owner", QUEUED, dead_pid(), "gone"),
+            ("same-pid-earlier-queue", RUNNING, os.getpid(), "earlier"),
+            ("live-owner", QUEUED, os.getppid(), "parent")
+        ]
+        connection = sqlite3.connect(path)
+        connection.executemany(
+            "INSERT INTO jobs (job_id, request_hash, params, status, owner_pid, owner_id, created_at) "
+            "VALUES (?, ?, '{}', ?, ?, ?, ?)",
+            [(job_id, job_id, status, pid, owner_id, now) for job_id, status, pid, owner_id in jobs]
+        )
+        connection.commit()
+        connection.close()
+        
+        queue = JobQueue(handler, path=path)
+        for job_id in ("dead-owner", "same-pid-earlier-queue"):
+            job = queue.get(job_id)
+            assert job["status"] == FAILED and job["error"] == "Interrupted by a server restart", job
+        assert queue.get("live-owner")["status"] == QUEUED
+        
+        # Recovering again leaves the live owner's job queued
+        assert queue.recover_interrupted() == 0
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Interrupted jobs of dead owners are failed")
+
+
+def test_lazy_store():
+    """Creating a queue does not touch the store; the first use opens it and recovers jobs"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "jobs.sqlite3")
+        handler, calls, release = make_handler()
+        release.set()
+        
+        queue = JobQueue(handler, path=path)
+        assert not os.path.exists(path)
+        
+        assert queue.get("missing") is None
+        assert os.path.exists(path)
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Job store is opened on first use")
+
+
+if __name__ == "__main__":
+    test_deduplication()
+    test_result_ttl()
+    test_recover_interrupted()
+    test_lazy_store()
@@ -0,0 +1,68 @@
+"""
+Test that the single-pass keyword matcher respects word boundaries
+"""
+
+from keyword_matcher import KeywordMatcher
+from digital_artist_matcher import DigitalArtistMatcher
+
+KEYWORDS = ["ar", "vr", "ui", "3d", "nft", "animate", "motion", "motion graphics", "spark ar", "after effects"]
+
+
+def test_short_keyword_false_hits():
+    """Short keywords no longer match inside longer words"""
+    matcher = KeywordMatcher(KEYWORDS)
+    
+    for text in ("I make art every year", "learn to guide", "a vivid artwork", "guitar solo"):
+        assert matcher.find(text) == [], (text, matcher.find(text))
+    
+    print("Short keywords do not match inside other words")
+
+
+def test_word_boundaries():
+    """Keywords match whole words, short ones with an optional plural, long ones as prefixes"""
+    matcher = KeywordMatcher(KEYWORDS)
+    
+    assert matcher.find("AR and VR filters") == ["ar", "vr"]
+    assert matcher.find("UIs and a ui kit") == ["ui"]
+    assert matcher.find("Selling NFTs") == ["nft"]
+    # Longer keywords keep matching as prefixes
+    assert matcher.find("animated 3D models") == ["animate", "3d"]
+    # ... but only from the start of a word
+    assert matcher.find("reanimated") == []
+    
+    print("Keywords match at word boundaries")
+
+
+def test_overlapping_keywords():
+    """Overlapping and nested keywords are all reported, in order of first appearance"""
+    matcher = KeywordMatcher(KEYWORDS)
+    
+    assert matcher.find("Spark AR lenses, then After Effects") == ["spark ar", "ar", "after effects"]
+    assert matcher.find("Motion Graphics") == ["motion graphics", "motion"]
+    assert matcher.find("VR first, AR second, VR again") == ["vr", "ar"]
+    
+    print("Overlapping keywords are all reported")
+
+
+def test_matcher_tool_extraction():
+    """The digital artist matcher no longer extracts AR from art-related bios"""
+    matcher = DigitalArtistMatcher()
+    artist = {
+        "artistId": "TEST001",
+        "basicInfo": {"bio": "Street art muralist painting large artworks for 6 years."},
+        "completeGallery": [{"title": "Year of art", "medium": "Acrylic", "description": "A mural"}]
+    }
+    
+    features = matcher.compute_artist_features(artist)
+    assert "ar" not in features["tools"], features["tools"]
+    assert "ar/vr" not in features["art_types"], features["art_types"]
+    assert "mural" in features["art_types"], features["art_types"]
+    
+    print("Tool extraction ignores AR inside other words")
+
+
+if __name__ == "__main__":
+    test_short_keyword_false_hits()
+    test_word_boundaries()
+    test_overlapping_keywords()
+    test_matcher_tool_extraction()
@@ -0,0 +1,194 @@
+"""
+Test the LLM response cache: size tracking, LRU eviction, batched access times and keys
+"""
+
+import os
+import time
+import shutil
+import sqlite3
+import tempfile
+
+from llm_response_cache import LLMResponseCache
+
+MODEL_ID = "ibm/granite-13b-instruct-v2"
+PARAMS = {"decoding_method": "greedy", "max_new_tokens": 300}
+
+
+def response_of_size(size):
+    """Build a response whose JSON encoding is size bytes long."""
+    return "x" * (size - 2)
+
+
+def stored_sizes(path):
+    """Read the size column of every stored response."""
+    with sqlite3.connect(path) as connection:
+        return [size for size, in connection.execute("SELECT size FROM responses")]
+
+
+def last_access(path, prompt):
+    """Read a response's stored access time."""
+    key = LLMResponseCache.make_key(MODEL_ID, PARAMS, prompt)
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT last_access FROM responses WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_size_tracking():
+    """The triggers keep the total size right through inserts, overwrites and deletes"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "llm_cache.sqlite3")
+        cache = LLMResponseCache(path, max_bytes=10000)
+        
+        cache.set(MODEL_ID, PARAMS, "a", response_of_size(100))
+        cache.set(MODEL_ID, PARAMS, "b", response_of_size(250))
+        assert cache.stats()["size_bytes"] == 350 == sum(stored_sizes(path))
+        assert cache.stats()["entries"] == 2
+        
+        # Overwriting a response replaces its size
+        cache.set(MODEL_ID, PARAMS, "a", response_of_size(40))
+        assert cache.stats()["size_bytes"] == 290 == sum(stored_sizes(path))
+        assert cache.stats()["entries"] == 2
+        
+        # Multi-byte characters are counted in bytes
+        cache.set(MODEL_ID, PARAMS, "c", "é")
+        assert cache.stats()["size_bytes"] == 294 == sum(stored_sizes(path))
+        
+        cache.clear()
+        assert cache.stats()["size_bytes"] == 0
+        assert cache.stats()["entries"] == 0
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Cache size is tracked by the triggers")
+
+
+def test_existing_database_size():
+    """A database written before the size table existed is counted when it is opened"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "llm_cache.sqlite3")
+        with sqlite3.connect(path) as connection:
+            connection.execute(
+                "CREATE TABLE responses (key TEXT PRIMARY KEY, model_id TEXT NOT NULL, response TEXT NOT NULL, "
+                "size INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.executemany(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                [("k1", MODEL_ID, '"a"', 3, 0, 0), ("k2", MODEL_ID, '"bb"', 4, 0, 0)]
+            )
+        
+        cache = LLMResponseCache(path, max_bytes=10000)
+        assert cache.stats()["size_bytes"] == 7
+        
+        # Reopening does not count the responses twice
+        cache.set(MODEL_ID, PARAMS, "a", response_of_size(10))
+        assert LLMResponseCache(path, max_bytes=10000).stats()["size_bytes"] == 17
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Existing databases are counted once")
+
+
+def test_lru_eviction():
+    """Past max_bytes, the least recently used responses are evicted down to 90% of the limit"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "llm_cache.sqlite3")
+        cache = LLMResponseCache(path, max_bytes=1000, access_flush_interval=0)
+        
+        for prompt in ("a", "b", "c"):
+            cache.set(MODEL_ID, PARAMS, prompt, response_of_size(300))
+            time.sleep(0.01)
+        assert cache.get(MODEL_ID, PARAMS, "a") is not None
+        time.sleep(0.01)
+        
+        # 1200 bytes: "b" is the least recently used, and evicting it reaches 900
+        cache.set(MODEL_ID, PARAMS, "d", response_of_size(300))
+        assert cache.get(MODEL_ID, PARAMS, "b") is None
+        for prompt in ("a", "c", "d"):
+            assert cache.get(MODEL_ID, PARAMS, prompt) == response_of_size(300)
+        assert cache.stats()["size_bytes"] == 900
+        
+        # A response larger than the limit evicts everything older, then itself
+        cache.set(MODEL_ID, PARAMS, "e", response_of_size(1200))
+        assert cache.stats()["entries"] == 0
+        assert cache.stats()["size_bytes"] == 0
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Least recently used responses are evicted")
+
+
+def test_batched_access_times():
+    """Hits are written in batches, and always before entries are evicted"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(temp_dir, "llm_cache.sqlite3")
+        cache = LLMResponseCache(path, max_bytes=1000, access_flush_interval=3600)
+        
+        for prompt in ("a", "b", "c"):
+            cache.set(MODEL_ID, PARAMS, prompt, response_of_size(300))
+            time.sleep(0.01)
+        stored_a, stored_b = last_access(path, "a"), last_access(path, "b")
+        
+        # Within the flush interval, hits stay in memory
+        assert cache.get(MODEL_ID, PARAMS, "a") is not None
+        assert cache.get(MODEL_ID, PARAMS, "a") is not None
+        assert last_access(path, "a") == stored_a
+        
+        # The first hit after the interval writes every pending access time at once
+        cache.access_flush_interval = 0
+        assert cache.get(MODEL_ID, PARAMS, "b") is not None
+        assert last_access(path, "a") > stored_a
+        assert last_access(path, "b") > stored_b
+        
+        # An eviction first writes the pending hits, so a recent hit is not evicted
+        cache.access_flush_interval = 3600
+        time.sleep(0.01)
+        assert cache.get(MODEL_ID, PARAMS, "c") is not None
+        cache.set(MODEL_ID, PARAMS, "d", response_of_size(300))
+        assert cache.get(MODEL_ID, PARAMS, "a") is None
+        assert cache.get(MODEL_ID, PARAMS, "c") is not None
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Access times are written in batches")
+
+
+def test_keys():
+    """Responses are keyed by model, decoding parameters and prompt"""
+    key = LLMResponseCache.make_key(MODEL_ID, PARAMS, "prompt")
+    assert key == LLMResponseCache.make_key(MODEL_ID, dict(reversed(list(PARAMS.items()))), "prompt")
+    assert LLMResponseCache.make_key(MODEL_ID, None, "prompt") == LLMResponseCache.make_key(MODEL_ID, {}, "prompt")
+    for other_key in (
+        LLMResponseCache.make_key("ibm/granite-3-8b-instruct", PARAMS, "prompt"),
+        LLMResponseCache.make_key(MODEL_ID, dict(PARAMS, max_new_tokens=100), "prompt"),
+        LLMResponseCache.make_key(MODEL_ID, PARAMS, "prompt "),
+    ):
+        assert other_key != key
+    
+    temp_dir = tempfile.mkdtemp()
+    try:
+        cache = LLMResponseCache(os.path.join(temp_dir, "llm_cache.sqlite3"))
+        response = {"results": [{"generated_text": "{\"tools\": [\"Blender\"]}"}]}
+        cache.set(MODEL_ID, PARAMS, "prompt", response)
+        
+        assert cache.get(MODEL_ID, dict(reversed(list(PARAMS.items()))), "prompt") == response
+        assert cache.get("ibm/granite-3-8b-instruct", PARAMS, "prompt") is None
+        assert cache.get(MODEL_ID, dict(PARAMS, max_new_tokens=100), "prompt") is None
+        assert cache.get(MODEL_ID, PARAMS, "another prompt") is None
+        
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+    finally:
+        shutil.rmtree(temp_dir)
+    
+    print("Responses are keyed by model, parameters and prompt")
+
+
+if __name__ == "__main__":
+    test_size_tracking()
+    test_existing_database_size()
+    test_lru_eviction()
+    test_batched_access_times()
+    test_keys()
@@ -0,0 +1,116 @@
+"""
+Test the circuit breakers and failover of the watsonx.ai model router
+"""
+
+import time
+
+from model_router import CircuitBreaker, ModelRouter, ModelUnavailableError
+
+
+class FakeModel:
+    """Model stand-in that fails while failing is set."""
+    
+    def __init__(self, name):
+        self.name = name
+        self.failing = False
+        self.calls = 0
+    
+    def generate_text(self, prompt, **kwargs):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError(f"{self.name} is down")
+        return f"{self.name}: {prompt}"
+
+
+def test_breaker_transitions():
+    """A breaker opens at the threshold, goes half-open after the timeout and closes on success"""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    assert breaker.current_state() == CircuitBreaker.CLOSED
+    
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.current_state() == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+    
+    breaker.record_failure()
+    assert breaker.current_state() == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    
+    time.sleep(0.06)
+    assert breaker.current_state() == CircuitBreaker.HALF_OPEN
+    # A single trial request is let through
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    
+    breaker.record_success()
+    assert breaker.current_state() == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow_request()
+    
+    print("Breaker opens, goes half-open and closes again")
+
+
+def test_failed_trial_reopens():
+    """A failed half-open trial re-opens the breaker for another full timeout"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    
+    breaker.record_failure()
+    assert breaker.current_state() == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    
+    time.sleep(0.06)
+    assert breaker.current_state() == CircuitBreaker.HALF_OPEN
+    
+    # A success resets the failure count, so the threshold applies again
+    breaker.allow_request()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.current_state() == CircuitBreaker.CLOSED
+    
+    print("Failed trial re-opens the breaker")
+
+
+def test_router_failover():
+    """The router fails over to the next model, skips open breakers and fails fast when all are open"""
+    primary, secondary = FakeModel("primary"), FakeModel("secondary")
+    router = ModelRouter({"primary": primary, "secondary": secondary}, failure_threshold=2, reset_timeout=0.05)
+    
+    assert router.route() == ["primary", "secondary"]
+    
+    # Unmeasured models keep their preference order, so the failing primary is tried first
+    primary.failing = True
+    assert router.generate("hi") == ("secondary: hi", "secondary")
+    assert router.generate("hi") == ("secondary: hi", "secondary")
+    assert router.breakers["primary"].current_state() == CircuitBreaker.OPEN
+    
+    # The open primary is no longer called
+    calls = primary.calls
+    assert router.route() == ["secondary"]
+    assert router.generate("hi") == ("secondary: hi", "secondary")
+    assert primary.calls == calls
+    
+    secondary.failing = True
+    router.breakers["secondary"].trip()
+    try:
+        router.generate("hi")
+        assert False, "expected ModelUnavailableError"
+    except ModelUnavailableError:
+        pass
+    
+    # Once recovered, the half-open primary takes the trial request and closes
+    primary.failing = False
+    time.sleep(0.06)
+    assert router.generate("hi") == ("primary: hi", "primary")
+    assert router.breakers["primary"].current_state() == CircuitBreaker.CLOSED
+    
+    print("Router fails over between models")
+
+
+if __name__ == "__main__":
+    test_breaker_transitions()
+    test_failed_trial_reopens()
+    test_router_failover()
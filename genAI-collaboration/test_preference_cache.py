@@ -0,0 +1,176 @@
+"""
+Test the preference analysis cache: expiry, eviction policies, statistics and keys
+"""
+
+from preference_cache import TTLCache, normalize_preference_text
+from digital_artist_matcher import DigitalArtistMatcher
+from final_digital_artist_matcher import FinalDigitalArtistMatcher
+
+
+class FakeTimer:
+    """Clock advanced by hand, injected as the cache timer."""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_expiry():
+    """Entries expire ttl seconds after they were stored"""
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=4, ttl=10, timer=timer)
+    cache.set("a", 1)
+    
+    timer.now = 9.9
+    assert cache.get("a") == 1
+    
+    # A hit does not extend the entry's lifetime
+    timer.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    
+    # Storing again restarts it
+    cache.set("a", 2)
+    timer.now = 19.9
+    assert cache.get("a") == 2
+    
+    # Without a ttl, entries never expire
+    cache = TTLCache(maxsize=4, ttl=None, timer=timer)
+    cache.set("a", 1)
+    timer.now = 1e9
+    assert cache.get("a") == 1
+    
+    print("Entries expire after their ttl")
+
+
+def test_lru_eviction():
+    """The LRU policy evicts the least recently used entry"""
+    cache = TTLCache(maxsize=2, ttl=None, policy="lru")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    
+    # Re-storing a key also counts as a use
+    cache.set("a", 10)
+    cache.set("d", 4)
+    assert cache.get("c") is None
+    assert cache.get("a") == 10
+    
+    print("LRU evicts the least recently used entry")
+
+
+def test_fifo_eviction():
+    """The FIFO policy evicts the oldest inserted entry, even if it was just read"""
+    cache = TTLCache(maxsize=2, ttl=None, policy="fifo")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("c") == 3
+    
+    print("FIFO evicts the oldest inserted entry")
+
+
+def test_settings_are_validated():
+    """A non-positive maxsize or an unknown policy is rejected"""
+    for kwargs in ({"maxsize": 0}, {"policy": "random"}):
+        try:
+            TTLCache(**kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"TTLCache({kwargs}) was accepted")
+    
+    print("Invalid cache settings are rejected")
+
+
+def test_stats():
+    """Hits, misses, evictions and expirations are counted"""
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=2, ttl=5, timer=timer)
+    
+    computed = []
+    
+    def compute():
+        computed.append("a")
+        return "value"
+    
+    assert cache.get_or_compute("a", compute) == "value"
+    assert cache.get_or_compute("a", compute) == "value"
+    assert computed == ["a"]
+    
+    cache.set("b", 2)
+    cache.set("c", 3)  # evicts "a"
+    assert cache.get("a") is None
+    
+    timer.now = 5
+    assert cache.get("b") is None  # expired
+    
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["hit_rate"] == 0.25
+    assert stats["evictions"] == 1
+    assert stats["expirations"] == 1
+    assert stats["size"] == 1
+    assert (stats["maxsize"], stats["ttl"], stats["policy"]) == (2, 5, "lru")
+    
+    # Clearing the entries keeps the statistics
+    cache.clear()
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["hits"] == 1
+    
+    print("Cache statistics are counted")
+
+
+def test_keys():
+    """Analyses are cached per engine and normalized preference text"""
+    assert normalize_preference_text("  Need a  Blender\n artist ") == "need a blender artist"
+    assert normalize_preference_text(None) == ""
+    
+    cache = TTLCache(maxsize=16, ttl=None)
+    digital_matcher = DigitalArtistMatcher()
+    final_matcher = FinalDigitalArtistMatcher()
+    digital_matcher.preference_cache = cache
+    final_matcher.preference_cache = cache
+    
+    first = digital_matcher.analyze_chatbot_preference("Need a Blender artist for an NFT project")
+    second = digital_matcher.analyze_chatbot_preference("  need a blender   ARTIST for an nft project")
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 1
+    assert ("DigitalArtistMatcher", "need a blender artist for an nft project") in cache._entries
+    
+    # Each caller gets its own copy, with the text it passed
+    assert first["original_text"] == "Need a Blender artist for an NFT project"
+    assert second["original_text"] == "  need a blender   ARTIST for an nft project"
+    first["tools"].append("changed")
+    assert "changed" not in digital_matcher.analyze_chatbot_preference("Need a Blender artist for an NFT project")["tools"]
+    
+    # Another engine does not reuse the analysis
+    final_matcher.analyze_chatbot_preference("Need a Blender artist for an NFT project")
+    assert cache.stats()["misses"] == 2
+    assert ("FinalDigitalArtistMatcher", "need a blender artist for an nft project") in cache._entries
+    
+    # Different text is a different entry
+    digital_matcher.analyze_chatbot_preference("Need a Blender artist for a game")
+    assert cache.stats()["misses"] == 3
+    assert len(cache) == 3
+    
+    print("Analyses are keyed by engine and normalized text")
+
+
+if __name__ == "__main__":
+    test_ttl_expiry()
+    test_lru_eviction()
+    test_fifo_eviction()
+    test_settings_are_validated()
+    test_stats()
+    test_keys()
@@ -0,0 +1,158 @@
+"""
+Test that the vectorized scoring engine ranks artists exactly like the pure-Python path
+"""
+
+import time
+import threading
+
+from digital_artist_matcher import DigitalArtistMatcher
+from digital_artist_data import DIGITAL_ARTISTS
+from parallel_scoring import ParallelScoringPool
+
+TEST_PREFERENCES = [
+    None,  # Each artist's own stored chatbot preference
+    "Looking for 3D artists who work in Blender for an NFT project. Need someone with AR/VR experience.",
+    "Need photographers who edit cultural photos for books. Lightroom experience required.",
+    "Need a 2D animator who can create a music video with a surreal, dreamlike aesthetic.",
+    "Anyone creative"
+]
+
+
+def summarize(matches):
+    """Reduce matches to the fields both engines must agree on"""
+    return [
+        (match["artist"]["artistId"], match["compatibility_score"], match["score_breakdown"])
+        for match in matches
+    ]
+
+
+def test_vectorized_scoring():
+    """Compare python and vectorized rankings for every artist, preference and top_k"""
+    python_matcher = DigitalArtistMatcher()
+    vectorized_matcher = DigitalArtistMatcher(scoring_engine="vectorized")
+    
+    for artist in DIGITAL_ARTISTS:
+        for preference in TEST_PREFERENCES:
+            expected = summarize(python_matcher.find_collaborators(artist["artistId"], preference))
+            actual = summarize(vectorized_matcher.find_collaborators(artist["artistId"], preference))
+            assert actual == expected, (artist["artistId"], preference)
+            
+            for top_k in range(len(DIGITAL_ARTISTS)):
+                actual = summarize(vectorized_matcher.find_collaborators(
+                    artist["artistId"], preference, top_k=top_k
+                ))
+                assert actual == expected[:top_k], (artist["artistId"], preference, top_k)
+            
+            # Skipping candidates without keyword overlap only drops zero-relevance matches
+            stored_preference = artist.get("chatbotPreferences", {}).get("preferenceText", "")
+            analysis = python_matcher.analyze_chatbot_preference(
+                stored_preference if preference is None else preference
+            )
+            if analysis["keywords"]:
+                expected = [entry for entry in expected if entry[2]["keyword_relevance"] > 0]
+            for matcher in (python_matcher, vectorized_matcher):
+                actual = summarize(matcher.find_collaborators(
+                    artist["artistId"], preference, require_keyword_overlap=True
+                ))
+                assert actual == expected, (artist["artistId"], preference, matcher.scoring_engine)
+    
+    print("Vectorized scores match the python engine")
+
+
+def test_batch_matching():
+    """Compare batch matches with one find_collaborators call per request"""
+    matcher = DigitalArtistMatcher()
+    queries = [(artist["artistId"], preference) for artist in DIGITAL_ARTISTS for preference in TEST_PREFERENCES]
+    queries.append(("UNKNOWN", None))
+    
+    for top_k in (None, 1, 3):
+        for require_keyword_overlap in (False, True):
+            batch_matches = matcher.find_collaborators_batch(
+                queries, top_k=top_k, require_keyword_overlap=require_keyword_overlap
+            )
+            assert len(batch_matches) == len(queries)
+            for (artist_id, preference), matches in zip(queries, batch_matches):
+                expected = matcher.find_collaborators(
+                    artist_id, preference, top_k=top_k, require_keyword_overlap=require_keyword_overlap
+                )
+                assert summarize(matches) == summarize(expected), (artist_id, preference, top_k)
+                assert [match["insights"] for match in matches] == [match["insights"] for match in expected]
+    
+    print("Batch matches match single requests")
+
+
+def test_parallel_scoring():
+    """Compare process-pool rankings with the python engine"""
+    python_matcher = DigitalArtistMatcher()
+    parallel_matcher = DigitalArtistMatcher(scoring_engine="parallel")
+    # Use the pool even for the small demo catalog
+    parallel_matcher.parallel_pool = ParallelScoringPool(
+        parallel_matcher.feature_index, parallel_matcher._score_features, processes=2, min_candidates=0
+    )
+    
+    try:
+        for artist in DIGITAL_ARTISTS:
+            for preference in TEST_PREFERENCES:
+                for top_k in (None, 1, 3):
+                    expected = summarize(python_matcher.find_collaborators(artist["artistId"], preference, top_k=top_k))
+                    actual = summarize(parallel_matcher.find_collaborators(artist["artistId"], preference, top_k=top_k))
+                    assert actual == expected, (artist["artistId"], preference, top_k)
+    finally:
+        parallel_matcher.parallel_pool.close()
+    
+    print("Parallel scores match the python engine")
+
+
+def test_parallel_pool_refresh():
+    """Restart the pool while other threads are scoring in it, and fall back when shards time out"""
+    python_matcher = DigitalArtistMatcher()
+    parallel_matcher = DigitalArtistMatcher(scoring_engine="parallel")
+    # Every invalidation replaces the pool
+    parallel_matcher.parallel_pool = ParallelScoringPool(
+        parallel_matcher.feature_index, parallel_matcher._score_features, processes=2, min_candidates=0,
+        refresh_threshold=0
+    )
+    preference = TEST_PREFERENCES[1]
+    expected = {
+        artist["artistId"]: summarize(python_matcher.find_collaborators(artist["artistId"], preference))
+        for artist in DIGITAL_ARTISTS
+    }
+    
+    errors = []
+    
+    def match_repeatedly():
+        try:
+            for _ in range(5):
+                for artist in DIGITAL_ARTISTS:
+                    actual = summarize(parallel_matcher.find_collaborators(artist["artistId"], preference))
+                    assert actual == expected[artist["artistId"]], artist["artistId"]
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=match_repeatedly) for _ in range(4)]
+    try:
+        for thread in threads:
+            thread.start()
+        for artist in DIGITAL_ARTISTS * 3:
+            parallel_matcher.feature_index.invalidate(artist["artistId"])
+            time.sleep(0.01)
+        for thread in threads:
+            thread.join()
+        assert not errors, errors
+        
+        # Shards that do not arrive in time are scored in the requesting process
+        parallel_matcher.parallel_pool.shard_timeout = 0
+        for artist in DIGITAL_ARTISTS:
+            actual = summarize(parallel_matcher.find_collaborators(artist["artistId"], preference))
+            assert actual == expected[artist["artistId"]], artist["artistId"]
+    finally:
+        parallel_matcher.parallel_pool.close()
+    
+    print("Parallel pool restarts keep in-flight requests working")
+
+
+if __name__ == "__main__":
+    test_vectorized_scoring()
+    test_batch_matching()
+    test_parallel_scoring()
+    test_parallel_pool_refresh()
@@ -0,0 +1,347 @@
+"""
+Vectorized Compatibility Scoring
+
+This module provides a NumPy scoring engine that encodes every artist in the feature index
+as a row of a feature matrix and computes the rule-based compatibility score of all
+candidates for a preference in a few array operations. Batches of preferences are scored
+together as query-matrix by artist-matrix products.
+"""
+
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Preferences scored together by rank_batch() (each needs a few int16 rows per artist)
+BATCH_CHUNK_SIZE = 64
+
+
+def top_rows(scores: np.ndarray, candidates: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Order candidate rows by score, highest first, keeping at most top_k.
+    
+    Ties keep row (catalog) order, matching the stable sort of the pure-Python path.
+    
+    Args:
+        scores: Score per row
+        candidates: Increasing array of the rows to rank
+        top_k: Optional maximum number of rows to return
+    
+    Returns:
+        np.ndarray: Ranked rows
+    """
+    candidate_scores = scores[candidates]
+    if top_k is not None and top_k < len(candidates):
+        if top_k <= 0:
+            return candidates[:0]
+        
+        # Keep everything above the k-th best score, then fill up with ties in row order
+        kth_score = np.partition(candidate_scores, len(candidate_scores) - top_k)[len(candidate_scores) - top_k]
+        above = candidates[candidate_scores > kth_score]
+        tied = candidates[candidate_scores == kth_score][:top_k - len(above)]
+        candidates = np.concatenate([above, tied])
+    
+    return candidates[np.lexsort((candidates, -scores[candidates].astype(np.int64)))]
+
+
+class VectorizedScoringEngine:
+    """
+    Vectorized version of DigitalArtistMatcher's five-part compatibility score.
+    
+    Each artist is encoded as a tool bit-vector, an art type bit-vector, experience years,
+    gallery size and quality-indicator count. Scores are identical to the pure-Python path.
+    """
+    
+    def __init__(self,
+                 feature_index,
+                 tool_vocabulary: Iterable[str],
+                 art_type_vocabulary: Iterable[str]):
+        """
+        Encode the feature index into matrices.
+        
+        Args:
+            feature_index: ArtistFeatureIndex to encode
+            tool_vocabulary: All known tool names
+            art_type_vocabulary: All known art type names
+        """
+        self.feature_index = feature_index
+        self.tool_columns = {tool: column for column, tool in enumerate(sorted(tool_vocabulary))}
+        self.art_type_columns = {art_type: column for column, art_type in enumerate(art_type_vocabulary)}
+        
+        self._lock = threading.RLock()
+        self._dirty_artist_ids = set()
+        feature_index.add_listener(self._on_invalidate)
+        
+        self.rebuild()
+    
+    def _on_invalidate(self, artist_id: str) -> None:
+        """Remember an artist whose row must be re-encoded before the next scoring call."""
+        with self._lock:
+            self._dirty_artist_ids.add(artist_id)
+    
+    def rebuild(self) -> None:
+        """Encode every artist of the feature index from scratch."""
+        with self._lock:
+            self.artist_ids = []
+            self.rows = {}
+            
+            self.tool_matrix = np.zeros((0, len(self.tool_columns)), dtype=np.int8)
+            self.art_type_matrix = np.zeros((0, len(self.art_type_columns)), dtype=np.int8)
+            self.experience_years = np.zeros(0, dtype=np.int64)
+            self.has_experience = np.zeros(0, dtype=bool)
+            self.gallery_sizes = np.zeros(0, dtype=np.int64)
+            self.quality_counts = np.zeros(0, dtype=np.int64)
+            
+            # Row arrays of the feature index's token postings, for keyword relevance
+            self._row_tokens = []
+            self._token_rows = {}
+            
+            self._append_rows(self.feature_index.items())
+            self._dirty_artist_ids.clear()
+    
+    def _append_rows(self, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Grow the matrices by one row per artist and encode the new rows."""
+        first_row, added = len(self.artist_ids), len(items)
+        
+        self.tool_matrix = np.concatenate([self.tool_matrix, np.zeros((added, len(self.tool_columns)), dtype=np.int8)])
+        self.art_type_matrix = np.concatenate(
+            [self.art_type_matrix, np.zeros((added, len(self.art_type_columns)), dtype=np.int8)]
+        )
+        self.experience_years = np.concatenate([self.experience_years, np.zeros(added, dtype=np.int64)])
+        self.has_experience = np.concatenate([self.has_experience, np.zeros(added, dtype=bool)])
+        self.gallery_sizes = np.concatenate([self.gallery_sizes, np.zeros(added, dtype=np.int64)])
+        self.quality_counts = np.concatenate([self.quality_counts, np.zeros(added, dtype=np.int64)])
+        
+        for row, (artist_id, features) in enumerate(items, start=first_row):
+            self.artist_ids.append(artist_id)
+            self.rows[artist_id] = row
+            self._row_tokens.append(set())
+            self._encode_row(row, features)
+    
+    def _encode_row(self, row: int, features: Dict[str, Any]) -> None:
+        """Write one artist's features into its matrix row."""
+        self.tool_matrix[row] = 0
+        for tool in features["primary_tools"]:
+            self.tool_matrix[row, self.tool_columns[tool]] = 1
+        
+        self.art_type_matrix[row] = 0
+        for art_type in features["primary_art_types"]:
+            self.art_type_matrix[row, self.art_type_columns[art_type]] = 1
+        
+        years = features["experience_years"]
+        self.has_experience[row] = years is not None
+        self.experience_years[row] = years if years is not None else 0
+        self.gallery_sizes[row] = features["gallery_size"]
+        self.quality_counts[row] = features["quality_count"]
+        
+        # Drop cached row arrays of every token the row gained or lost
+        old_tokens = self._row_tokens[row]
+        new_tokens = set(features["tokens"])
+        for token in old_tokens ^ new_tokens:
+            self._token_rows.pop(token, None)
+        self._row_tokens[row] = new_tokens
+    
+    def _sync(self) -> None:
+        """Encode artists added and re-encode rows of artists invalidated since the last scoring call."""
+        with self._lock:
+            if len(self.feature_index) > len(self.artist_ids):
+                # Added artists are at the end of the catalog order
+                added_ids = self.feature_index.artist_ids()[len(self.artist_ids):]
+                self._append_rows([(artist_id, self.feature_index.get(artist_id)) for artist_id in added_ids])
+                self._dirty_artist_ids.difference_update(added_ids)
+            
+            for artist_id in self._dirty_artist_ids:
+                row = self.rows.get(artist_id)
+                features = self.feature_index.get(artist_id)
+                if row is not None and features is not None:
+                    self._encode_row(row, features)
+            self._dirty_artist_ids.clear()
+    
+    def _rows_with_token(self, token: str) -> np.ndarray:
+        """Get the rows containing a token as an index array, from the inverted token index."""
+        rows = self._token_rows.get(token)
+        if rows is None:
+            # Artists added since the last sync are left out until their rows are encoded
+            rows = np.fromiter(
+                sorted(
+                    self.rows[artist_id] for artist_id in self.feature_index.token_index.postings(token)
+                    if artist_id in self.rows
+                ),
+                dtype=np.int64
+            )
+            self._token_rows[token] = rows
+        return rows
+    
+    def _query_matrix(self,
+                      preference_analyses: List[Dict[str, Any]],
+                      key: str,
+                      columns: Dict[str, int]) -> np.ndarray:
+        """Encode the tools or art types of several preferences as rows of a query matrix."""
+        queries = np.zeros((len(preference_analyses), len(columns)), dtype=np.int16)
+        for position, preference_analysis in enumerate(preference_analyses):
+            for value in set(preference_analysis.get(key, [])):
+                if value in columns:
+                    queries[position, columns[value]] = 1
+        return queries
+    
+    def score(self, preference_analysis: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Score every artist in the index against a preference.
+        
+        Args:
+            preference_analysis: Analyzed chatbot preference
+        
+        Returns:
+            Tuple: Total score per row and score breakdown arrays per category
+        """
+        total_scores, score_breakdown = self.score_batch([preference_analysis])
+        return total_scores[0], {category: values[0] for category, values in score_breakdown.items()}
+    
+    def score_batch(self, preference_analyses: List[Dict[str, Any]]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Score every artist in the index against several preferences at once.
+        
+        The requested tools and art types of all preferences are encoded as query matrices
+        and multiplied with the artist matrices, so the catalog is scanned once per batch.
+        
+        Args:
+            preference_analyses: Analyzed chatbot preferences
+        
+        Returns:
+            Tuple: Total scores (one row per preference, one column per artist) and score
+                   breakdown arrays per category of the same shape
+        """
+        self._sync()
+        
+        with self._lock:
+            query_count = len(preference_analyses)
+            shape = (query_count, len(self.artist_ids))
+            
+            # Encode the preferences as query matrices over the tool and art type columns
+            tool_queries = self._query_matrix(preference_analyses, "tools", self.tool_columns)
+            art_type_queries = self._query_matrix(preference_analyses, "art_types", self.art_type_columns)
+            requests_tools = np.array([bool(analysis.get("tools")) for analysis in preference_analyses])
+            requests_art_types = np.array([bool(analysis.get("art_types")) for analysis in preference_analyses])
+            
+            # 1. Tool match (30%), or a partial score for digital tools when none are requested
+            tool_match = np.where(
+                requests_tools[:, None],
+                np.minimum((tool_queries @ self.tool_matrix.T) * 10, 30),
+                np.minimum(self.tool_matrix.sum(axis=1, dtype=np.int16) * 5, 15)
+            )
+            
+            # 2. Art type match (30%)
+            art_type_match = np.where(
+                requests_art_types[:, None],
+                np.minimum((art_type_queries @ self.art_type_matrix.T) * 10, 30),
+                np.minimum(self.art_type_matrix.sum(axis=1, dtype=np.int16) * 5, 15)
+            )
+            
+            # 3. Keyword relevance (20%)
+            keyword_counts = np.zeros(shape, dtype=np.int16)
+            for position, preference_analysis in enumerate(preference_analyses):
+                for keyword in set(preference_analysis.get("keywords", [])):
+                    keyword_counts[position, self._rows_with_token(keyword)] += 1
+            keyword_relevance = np.minimum(keyword_counts * 5, 20)
+            
+            # 4. Experience level (10%), the same for every preference
+            experience = np.where(self.has_experience, np.minimum(self.experience_years * 2, 10), 0).astype(np.int16)
+            
+            # 5. Portfolio quality (10%)
+            portfolio_quality = (
+                np.minimum(self.gallery_sizes * 2, 5) + np.minimum(self.quality_counts, 5)
+            ).astype(np.int16)
+        
+        score_breakdown = {
+            "tool_match": tool_match,
+            "art_type_match": art_type_match,
+            "keyword_relevance": keyword_relevance,
+            "experience": np.broadcast_to(experience, shape),
+            "portfolio_quality": np.broadcast_to(portfolio_quality, shape)
+        }
+        total_scores = tool_match + art_type_match + keyword_relevance + experience + portfolio_quality
+        
+        return total_scores, score_breakdown
+    
+    def rank(self,
+             preference_analysis: Dict[str, Any],
+             top_k: Optional[int] = None,
+             exclude_artist_id: Optional[str] = None,
+             require_keyword_overlap: bool = False) -> List[Tuple[str, int, Dict[str, int]]]:
+        """
+        Rank artists for a preference, highest score first.
+        
+        Ties keep catalog order, matching the stable sort of the pure-Python path.
+        
+        Args:
+            preference_analysis: Analyzed chatbot preference
+            top_k: Optional maximum number of artists to return
+            exclude_artist_id: Optional artist to leave out (the requesting artist)
+            require_keyword_overlap: Leave out artists sharing none of the preference keywords
+                                     (ignored when the preference has no keywords)
+        
+        Returns:
+            List: (artist_id, total score, score breakdown) tuples
+        """
+        return self.rank_batch([preference_analysis], top_k, [exclude_artist_id], require_keyword_overlap)[0]
+    
+    def rank_batch(self,
+                   preference_analyses: List[Dict[str, Any]],
+                   top_k: Optional[int] = None,
+                   exclude_artist_ids: Optional[List[Optional[str]]] = None,
+                   require_keyword_overlap: bool = False,
+                   chunk_size: int = BATCH_CHUNK_SIZE) -> List[List[Tuple[str, int, Dict[str, int]]]]:
+        """
+        Rank artists for several preferences, scoring chunk_size preferences per matrix product.
+        
+        Args:
+            preference_analyses: Analyzed chatbot preferences
+            top_k: Optional maximum number of artists to return per preference
+            exclude_artist_ids: Optional artist to leave out per preference (the requesting artists)
+            require_keyword_overlap: Leave out artists sharing none of a preference's keywords
+            chunk_size: Number of preferences scored together (bounds the score matrix memory)
+        
+        Returns:
+            List: One ranking per preference, as returned by rank()
+        """
+        if exclude_artist_ids is None:
+            exclude_artist_ids = [None] * len(preference_analyses)
+        
+        rankings = []
+        for start in range(0, len(preference_analyses), chunk_size):
+            chunk = preference_analyses[start:start + chunk_size]
+            total_scores, score_breakdown = self.score_batch(chunk)
+            for position, preference_analysis in enumerate(chunk):
+                rankings.append(self._select(
+                    total_scores[position],
+                    {category: values[position] for category, values in score_breakdown.items()},
+                    top_k,
+                    exclude_artist_ids[start + position],
+                    require_keyword_overlap and bool(preference_analysis.get("keywords"))
+                ))
+        return rankings
+    
+    def _select(self,
+                total_scores: np.ndarray,
+                score_breakdown: Dict[str, np.ndarray],
+                top_k: Optional[int],
+                exclude_artist_id: Optional[str],
+                require_keyword_overlap: bool) -> List[Tuple[str, int, Dict[str, int]]]:
+        """Select and order the best rows of one preference's scores."""
+        candidates = np.arange(len(total_scores))
+        excluded_row = self.rows.get(exclude_artist_id)
+        if excluded_row is not None:
+            candidates = candidates[candidates != excluded_row]
+        if require_keyword_overlap:
+            candidates = candidates[score_breakdown["keyword_relevance"][candidates] > 0]
+        
+        ranked_rows = top_rows(total_scores, candidates, top_k)
+        
+        return [
+            (
+                self.artist_ids[row],
+                int(total_scores[row]),
+                {category: int(values[row]) for category, values in score_breakdown.items()}
+            )
+            for row in ranked_rows
+        ]
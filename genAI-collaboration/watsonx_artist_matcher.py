@@ -8,13 +8,15 @@ for more advanced and nuanced artist matching.
 import os
 import json
 from typing import Dict, List, Any, Tuple
-import requests
 from ibm_watson import IAMAuthenticator
 from ibm_watson.natural_language_understanding_v1 import NaturalLanguageUnderstandingV1
 from ibm_watson.natural_language_understanding_v1 import Features, EntitiesOptions, KeywordsOptions, CategoriesOptions
 from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
-from digital_artist_data import DIGITAL_ARTISTS
+from artist_repository import ARTIST_REPOSITORY
 from config import WATSON_API_KEY, WATSON_API_URL, WATSON_PROJECT_ID, WATSON_PLATFORM_URL
+from http_transport import HTTP_TRANSPORT
+from batch_prompts import (COMPATIBILITY_BATCH_SIZE, build_batch_compatibility_prompt, split_into_batches,
+                           parse_batch_response, batch_max_new_tokens, context_tokens)
 
 class WatsonXArtistMatcher:
     """
@@ -23,7 +25,8 @@ class WatsonXArtistMatcher:
     
     def __init__(self):
         """Initialize the WatsonXArtistMatcher with IBM watsonx credentials."""
-        self.artists = DIGITAL_ARTISTS
+        self.repository = ARTIST_REPOSITORY
+        self.artists = self.repository
         self.api_key = WATSON_API_KEY
         self.api_url = WATSON_API_URL
         self.project_id = WATSON_PROJECT_ID
@@ -43,6 +46,9 @@ class WatsonXArtistMatcher:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        
+        # Pooled keep-alive connections shared by all Watson clients
+        self.http = HTTP_TRANSPORT
     
     def analyze_artist_with_nlu(self, artist: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -134,7 +140,7 @@ class WatsonXArtistMatcher:
                 "project_id": self.project_id
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.platform_url}/ml/v1-beta/generation/text",
                 headers=self.headers,
                 json=payload
@@ -258,19 +264,21 @@ class WatsonXArtistMatcher:
     
     def find_collaborators_with_watsonx(self, 
                                        artist_id: str, 
-                                       chatbot_preference: str = None) -> List[Dict[str, Any]]:
+                                       chatbot_preference: str = None,
+                                       batch_size: int = None) -> List[Dict[str, Any]]:
         """
         Find suitable collaborators using watsonx-powered analysis.
         
         Args:
             artist_id: ID of the artist seeking collaborators
             chatbot_preference: Optional custom chatbot preference text
+            batch_size: Score this many candidates per prompt (one prompt per candidate when None)
             
         Returns:
             List: Ranked list of potential collaborators with compatibility scores and insights
         """
         # Find the requesting artist
-        requesting_artist = next((a for a in self.artists if a["artistId"] == artist_id), None)
+        requesting_artist = self.repository.get(artist_id)
         if not requesting_artist:
             return []
         
@@ -292,14 +300,26 @@ class WatsonXArtistMatcher:
                 analyzed_available_artists.append(analyzed_artist)
         
         # Generate compatibility scores and insights using watsonx
-        collaborator_matches = []
-        for candidate in analyzed_available_artists:
-            compatibility_score, insights = self._generate_compatibility_with_watsonx(
-                analyzed_requesting_artist, 
-                candidate, 
+        if batch_size is not None:
+            batch_results = self._generate_compatibility_batch_with_watsonx(
+                analyzed_requesting_artist,
+                analyzed_available_artists,
                 preference_analysis,
-                chatbot_preference
+                chatbot_preference,
+                batch_size
             )
+        
+        collaborator_matches = []
+        for candidate in analyzed_available_artists:
+            if batch_size is not None:
+                compatibility_score, insights = batch_results[candidate["artistId"]]
+            else:
+                compatibility_score, insights = self._generate_compatibility_with_watsonx(
+                    analyzed_requesting_artist, 
+                    candidate, 
+                    preference_analysis,
+                    chatbot_preference
+                )
             
             collaborator_matches.append({
                 "artist": candidate,
@@ -394,7 +414,7 @@ class WatsonXArtistMatcher:
                 "project_id": self.project_id
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.platform_url}/ml/v1-beta/generation/text",
                 headers=self.headers,
                 json=payload
@@ -439,6 +459,85 @@ class WatsonXArtistMatcher:
             # Fallback to rule-based scoring
             return self._fallback_compatibility_score(artist1, artist2, preference_text)
     
+    def _generate_compatibility_batch_with_watsonx(self, 
+                                                  artist1: Dict[str, Any], 
+                                                  candidates: List[Dict[str, Any]], 
+                                                  preference_analysis: Dict[str, Any],
+                                                  preference_text: str,
+                                                  batch_size: int = COMPATIBILITY_BATCH_SIZE) -> Dict[str, Tuple[float, List[str]]]:
+        """
+        Generate compatibility scores and insights for several candidates with batched prompts.
+        
+        Each prompt carries the requesting artist and the preference once, followed by up to
+        batch_size candidates, and asks for a JSON array of {artistId, score, insights}.
+        Batches are split further when they would exceed the model's context window.
+        Candidates missing from a parsed answer are scored with their own prompt; when the
+        request itself fails, the batch gets the rule-based scores.
+        
+        Args:
+            artist1: First artist profile with analysis
+            candidates: Candidate artist profiles with analysis
+            preference_analysis: Analyzed chatbot preference
+            preference_text: Original preference text
+            batch_size: Maximum number of candidates per prompt
+            
+        Returns:
+            Dict: Compatibility score (0-100) and list of insights per candidate artistId
+        """
+        model_id = "ibm/granite-13b-instruct-v2"
+        max_tokens = context_tokens([model_id])
+        
+        results = {}
+        for batch in split_into_batches(artist1, candidates, preference_text, batch_size, max_tokens):
+            prompt = build_batch_compatibility_prompt(artist1, batch, preference_text)
+            
+            try:
+                # Call watsonx.ai for the whole batch
+                payload = {
+                    "model_id": model_id,
+                    "input": prompt,
+                    "parameters": {
+                        "decoding_method": "greedy",
+                        "max_new_tokens": batch_max_new_tokens(batch),
+                        "min_new_tokens": 100,
+                        "stop_sequences": [],
+                        "repetition_penalty": 1.0
+                    },
+                    "project_id": self.project_id
+                }
+                
+                response = self.http.post(
+                    f"{self.platform_url}/ml/v1-beta/generation/text",
+                    headers=self.headers,
+                    json=payload
+                )
+                
+                if response.status_code != 200:
+                    raise Exception(f"{response.status_code} - {response.text}")
+                
+                result = response.json()
+                generated_text = result.get("results", [{}])[0].get("generated_text", "")
+            
+            except Exception as e:
+                print(f"Error calling watsonx.ai: {e}")
+                # Fallback to rule-based scoring
+                for candidate in batch:
+                    results[candidate["artistId"]] = self._fallback_compatibility_score(artist1, candidate, preference_text)
+                continue
+            
+            parsed = parse_batch_response(generated_text, [candidate["artistId"] for candidate in batch])
+            for candidate in batch:
+                entry = parsed.get(candidate["artistId"])
+                if entry is None:
+                    # Not (properly) answered in the batch: ask for this candidate alone
+                    results[candidate["artistId"]] = self._generate_compatibility_with_watsonx(
+                        artist1, candidate, preference_analysis, preference_text
+                    )
+                else:
+                    results[candidate["artistId"]] = (entry["score"], entry["insights"])
+        
+        return results
+    
     def _extract_score_from_text(self, text: str) -> float:
         """Extract compatibility score from text."""
         import re
@@ -595,7 +694,7 @@ def run_example():
     matches = matcher.find_collaborators_with_watsonx(artist_id, chatbot_preference)
     
     # Get the requesting artist
-    requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+    requesting_artist = matcher.repository.get(artist_id)
     
     # Print the requesting artist
     print(f"\nREQUESTING ARTIST: {requesting_artist['basicInfo']['name']}")
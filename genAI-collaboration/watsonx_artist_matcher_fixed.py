@@ -8,12 +8,12 @@ for more advanced and nuanced artist matching.
 import os
 import json
 from typing import Dict, List, Any, Tuple
-import requests
 from ibm_cloud_sdk_core.authenticators import IAMAuthenticator
 from ibm_watson.natural_language_understanding_v1 import NaturalLanguageUnderstandingV1
 from ibm_watson.natural_language_understanding_v1 import Features, EntitiesOptions, KeywordsOptions, CategoriesOptions
-from digital_artist_data import DIGITAL_ARTISTS
+from artist_repository import ARTIST_REPOSITORY
 from config import WATSON_API_KEY, WATSON_API_URL, WATSON_PROJECT_ID, WATSON_PLATFORM_URL
+from http_transport import HTTP_TRANSPORT
 
 class WatsonXArtistMatcher:
     """
@@ -22,7 +22,8 @@ class WatsonXArtistMatcher:
     
     def __init__(self):
         """Initialize the WatsonXArtistMatcher with IBM watsonx credentials."""
-        self.artists = DIGITAL_ARTISTS
+        self.repository = ARTIST_REPOSITORY
+        self.artists = self.repository
         self.api_key = WATSON_API_KEY
         self.api_url = WATSON_API_URL
         self.project_id = WATSON_PROJECT_ID
@@ -42,6 +43,9 @@ class WatsonXArtistMatcher:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        
+        # Pooled keep-alive connections shared by all Watson clients
+        self.http = HTTP_TRANSPORT
     
     def analyze_artist_with_nlu(self, artist: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -133,7 +137,7 @@ class WatsonXArtistMatcher:
                 "project_id": self.project_id
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.platform_url}/ml/v1-beta/generation/text",
                 headers=self.headers,
                 json=payload
@@ -269,7 +273,7 @@ class WatsonXArtistMatcher:
             List: Ranked list of potential collaborators with compatibility scores and insights
         """
         # Find the requesting artist
-        requesting_artist = next((a for a in self.artists if a["artistId"] == artist_id), None)
+        requesting_artist = self.repository.get(artist_id)
         if not requesting_artist:
             return []
         
@@ -393,7 +397,7 @@ class WatsonXArtistMatcher:
                 "project_id": self.project_id
             }
             
-            response = requests.post(
+            response = self.http.post(
                 f"{self.platform_url}/ml/v1-beta/generation/text",
                 headers=self.headers,
                 json=payload
@@ -594,7 +598,7 @@ def run_example():
     matches = matcher.find_collaborators_with_watsonx(artist_id, chatbot_preference)
     
     # Get the requesting artist
-    requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+    requesting_artist = matcher.repository.get(artist_id)
     
     # Print the requesting artist
     print(f"\nREQUESTING ARTIST: {requesting_artist['basicInfo']['name']}")
@@ -4,21 +4,36 @@ Using the official IBM watsonx.ai Python SDK
 """
 
 import json
+import time
+import threading
 from typing import Dict, List, Any
-from ibm_watsonx_ai import APIClient
 from ibm_watsonx_ai import Credentials
-from ibm_watsonx_ai.foundation_models import ModelInference
-from digital_artist_data import DIGITAL_ARTISTS
+from artist_repository import ARTIST_REPOSITORY
+from digital_artist_matcher import DigitalArtistMatcher
 from config_updated import WATSON_API_KEY, WATSON_PROJECT_ID
+from llm_response_cache import LLM_RESPONSE_CACHE
+from model_initializer import BackgroundModelInitializer
+from metrics import timed, log_sampled, PREFERENCE_ANALYSIS, CANDIDATE_SCORING, LLM_CALL, INSIGHT_PARSING
+from batch_prompts import (COMPATIBILITY_BATCH_SIZE, build_batch_compatibility_prompt, split_into_batches,
+                           parse_batch_response, batch_max_new_tokens, context_tokens)
+
+# Rule-based matchers for the recall stage, created on first use per scoring engine and
+# shared by every WatsonXArtistMatcherSDK in this process
+_RECALL_MATCHERS = {}
+_RECALL_MATCHERS_LOCK = threading.Lock()
 
 class WatsonXArtistMatcherSDK:
     """
     A class to match digital artists using IBM watsonx.ai SDK.
     """
     
+    # Default number of candidates recalled by the rule-based stage of the two-stage pipeline
+    RECALL_SIZE = 10
+    
     def __init__(self):
         """Initialize the WatsonXArtistMatcherSDK with IBM watsonx credentials."""
-        self.artists = DIGITAL_ARTISTS
+        self.repository = ARTIST_REPOSITORY
+        self.artists = self.repository
         self.api_key = WATSON_API_KEY
         self.project_id = WATSON_PROJECT_ID
         
@@ -28,8 +43,6 @@ class WatsonXArtistMatcherSDK:
             url="https://us-south.ml.cloud.ibm.com"  # Using the US South region endpoint
         )
         
-        self.client = APIClient(self.credentials)
-        
         # List of supported models to try
         self.models = [
             "ibm/granite-13b-instruct-v2",
@@ -37,31 +50,67 @@ class WatsonXArtistMatcherSDK:
             "meta-llama/llama-3-3-70b-instruct"
         ]
         
-        # Try to initialize with a working model
-        self.model = None
-        for model_id in self.models:
-            try:
-                print(f"Trying to initialize with model: {model_id}")
-                self.model = ModelInference(
-                    model_id=model_id,
-                    api_client=self.client,
-                    project_id=self.project_id,
-                    params={
-                        "decoding_method": "greedy",
-                        "max_new_tokens": 500,
-                        "min_new_tokens": 50
-                    }
-                )
-                # Test the model with a simple prompt
-                test_response = self.model.generate_text("Hello watsonx!")
-                print(f"Model {model_id} initialized successfully")
-                break
-            except Exception as e:
-                print(f"Error initializing model {model_id}: {e}")
-                self.model = None
+        # Greedy decoding, so responses can be cached per model, parameters and prompt
+        self.model_params = {
+            "decoding_method": "greedy",
+            "max_new_tokens": 500,
+            "min_new_tokens": 50
+        }
+        self.llm_cache = LLM_RESPONSE_CACHE
         
-        if self.model is None:
-            print("WARNING: Could not initialize any watsonx.ai model. Using fallback methods.")
+        # Probe the models in the background and route requests across them; until one is
+        # confirmed healthy, self.model is None and the rule-based fallbacks are used
+        self.model_initializer = BackgroundModelInitializer(
+            self.credentials, self.project_id, self.models, self.model_params
+        )
+    
+    @property
+    def model(self):
+        """
+        Router over the watsonx.ai models, or None until one is confirmed healthy or while
+        every model's circuit breaker is open (the rule-based fallbacks are used then).
+        """
+        model = self.model_initializer.model
+        if model is None or not model.available():
+            return None
+        return model
+    
+    @property
+    def model_id(self) -> str:
+        """ID of the watsonx.ai model requests are currently routed to, or None."""
+        return self.model_initializer.model_id
+    
+    @property
+    def client(self):
+        """The watsonx.ai API client, or None until it has been created."""
+        return self.model_initializer.client
+    
+    def _generate_text(self, prompt: str, params: Dict[str, Any] = None) -> str:
+        """
+        Generate text with the fastest healthy model, reusing a cached response when a
+        routable model was sent the same decoding parameters and prompt before.
+        
+        Args:
+            prompt: Prompt text
+            params: Decoding parameters of this request (self.model_params when None)
+            
+        Returns:
+            str: Generated text
+        """
+        if params is None:
+            params = self.model_params
+        
+        router = self.model_initializer.model
+        for model_id in router.route():
+            cached_response = self.llm_cache.get(model_id, params, prompt)
+            if cached_response is not None:
+                return cached_response
+        
+        # Raises ModelUnavailableError when every breaker is open; callers fall back to rules
+        with timed(LLM_CALL):
+            response, model_id = router.generate(prompt, params=params)
+        self.llm_cache.set(model_id, params, prompt, response)
+        return response
     
     def analyze_artist_preference(self, preference_text: str) -> Dict[str, Any]:
         """
@@ -92,9 +141,8 @@ class WatsonXArtistMatcherSDK:
         """
         
         try:
-            response = self.model.generate_text(prompt)
-            print("Raw response from watsonx.ai:")
-            print(response)
+            response = self._generate_text(prompt)
+            log_sampled("watsonx_raw_response", request="preference_analysis", response=response)
             
             # Try to extract JSON from the response
             try:
@@ -251,30 +299,41 @@ class WatsonXArtistMatcherSDK:
         """
         
         try:
-            response = self.model.generate_text(prompt)
-            print("Raw response from watsonx.ai:")
-            print(response)
+            response = self._generate_text(prompt)
+            log_sampled("watsonx_raw_response", request="compatibility", response=response)
             
-            # Try to extract JSON from the response
-            try:
-                # Find JSON in the response
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    analysis = json.loads(json_str)
-                    
-                    score = float(analysis.get("score", 50))
-                    insights = analysis.get("insights", [])
+            with timed(INSIGHT_PARSING):
+                # Try to extract JSON from the response
+                try:
+                    # Find JSON in the response
+                    json_start = response.find('{')
+                    json_end = response.rfind('}') + 1
                     
-                    return {
-                        "score": score,
-                        "insights": insights,
-                        "raw_response": response
-                    }
-                else:
-                    # Extract score and insights manually
+                    if json_start >= 0 and json_end > json_start:
+                        json_str = response[json_start:json_end]
+                        analysis = json.loads(json_str)
+                        
+                        score = float(analysis.get("score", 50))
+                        insights = analysis.get("insights", [])
+                        
+                        return {
+                            "score": score,
+                            "insights": insights,
+                            "raw_response": response
+                        }
+                    else:
+                        # Extract score and insights manually
+                        score = self._extract_score_from_text(response)
+                        insights = self._extract_insights_from_text(response)
+                        
+                        return {
+                            "score": score,
+                            "insights": insights,
+                            "raw_response": response
+                        }
+                
+                except json.JSONDecodeError:
+                    print("Error parsing JSON from watsonx response")
                     score = self._extract_score_from_text(response)
                     insights = self._extract_insights_from_text(response)
                     
@@ -283,22 +342,82 @@ class WatsonXArtistMatcherSDK:
                         "insights": insights,
                         "raw_response": response
                     }
-            
-            except json.JSONDecodeError:
-                print("Error parsing JSON from watsonx response")
-                score = self._extract_score_from_text(response)
-                insights = self._extract_insights_from_text(response)
-                
-                return {
-                    "score": score,
-                    "insights": insights,
-                    "raw_response": response
-                }
         
         except Exception as e:
             print(f"Error calling watsonx.ai: {e}")
             return self._fallback_compatibility_score(artist1, artist2, preference_text)
     
+    def generate_compatibility_scores_batch(self, 
+                                            artist1: Dict[str, Any], 
+                                            candidates: List[Dict[str, Any]], 
+                                            preference_text: str,
+                                            batch_size: int = COMPATIBILITY_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate compatibility scores for several candidates with batched watsonx.ai prompts.
+        
+        Each prompt carries the requesting artist and the preference once, followed by up to
+        batch_size candidates, and asks for a JSON array of {artistId, score, insights}.
+        Batches are split further when they would exceed the context window of the models.
+        Candidates missing from a parsed answer are scored with their own prompt; when the
+        request itself fails, the batch gets the rule-based scores.
+        
+        Args:
+            artist1: Requesting artist profile
+            candidates: Candidate artist profiles
+            preference_text: Preference text
+            batch_size: Maximum number of candidates per prompt
+            
+        Returns:
+            Dict: Compatibility score and insights per candidate artistId
+        """
+        if self.model is None:
+            return {
+                candidate["artistId"]: self._fallback_compatibility_score(artist1, candidate, preference_text)
+                for candidate in candidates
+            }
+        
+        results = {}
+        max_tokens = context_tokens(self.models)
+        for batch in split_into_batches(artist1, candidates, preference_text, batch_size, max_tokens):
+            prompt = build_batch_compatibility_prompt(artist1, batch, preference_text)
+            params = dict(self.model_params, max_new_tokens=batch_max_new_tokens(batch))
+            
+            try:
+                response = self._generate_text(prompt, params)
+            except Exception as e:
+                print(f"Error calling watsonx.ai: {e}")
+                for candidate in batch:
+                    results[candidate["artistId"]] = self._fallback_compatibility_score(artist1, candidate, preference_text)
+                continue
+            
+            with timed(INSIGHT_PARSING):
+                parsed = parse_batch_response(response, [candidate["artistId"] for candidate in batch])
+            for candidate in batch:
+                result = parsed.get(candidate["artistId"])
+                if result is None:
+                    # Not (properly) answered in the batch: ask for this candidate alone
+                    result = self.generate_compatibility_score(artist1, candidate, preference_text)
+                else:
+                    result["raw_response"] = response
+                results[candidate["artistId"]] = result
+        
+        return results
+    
+    def _score_candidates(self, 
+                          artist1: Dict[str, Any], 
+                          candidates: List[Dict[str, Any]], 
+                          preference_text: str,
+                          batch_size: int = None) -> Dict[str, Dict[str, Any]]:
+        """Score candidates one prompt each, or batch_size per prompt when batch_size is set."""
+        with timed(CANDIDATE_SCORING):
+            if batch_size is not None:
+                return self.generate_compatibility_scores_batch(artist1, candidates, preference_text, batch_size)
+            
+            return {
+                candidate["artistId"]: self.generate_compatibility_score(artist1, candidate, preference_text)
+                for candidate in candidates
+            }
+    
     def _extract_score_from_text(self, text: str) -> float:
         """Extract compatibility score from text."""
         import re
@@ -430,19 +549,21 @@ class WatsonXArtistMatcherSDK:
     
     def find_collaborators(self, 
                          artist_id: str, 
-                         chatbot_preference: str = None) -> List[Dict[str, Any]]:
+                         chatbot_preference: str = None,
+                         batch_size: int = None) -> List[Dict[str, Any]]:
         """
         Find suitable collaborators using watsonx.ai-powered analysis.
         
         Args:
             artist_id: ID of the artist seeking collaborators
             chatbot_preference: Optional custom chatbot preference text
+            batch_size: Score this many candidates per prompt (one prompt per candidate when None)
             
         Returns:
             List: Ranked list of potential collaborators with compatibility scores and insights
         """
         # Find the requesting artist
-        requesting_artist = next((a for a in self.artists if a["artistId"] == artist_id), None)
+        requesting_artist = self.repository.get(artist_id)
         if not requesting_artist:
             return []
         
@@ -451,30 +572,128 @@ class WatsonXArtistMatcherSDK:
             chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
         
         # Analyze the chatbot preference with watsonx
-        preference_analysis = self.analyze_artist_preference(chatbot_preference)
+        with timed(PREFERENCE_ANALYSIS):
+            preference_analysis = self.analyze_artist_preference(chatbot_preference)
         
         # Generate compatibility scores and insights using watsonx
+        candidates = [candidate for candidate in self.artists if candidate["artistId"] != artist_id]
+        compatibility_results = self._score_candidates(requesting_artist, candidates, chatbot_preference, batch_size)
+        
         collaborator_matches = []
-        for candidate in self.artists:
-            if candidate["artistId"] != artist_id:
-                compatibility_result = self.generate_compatibility_score(
-                    requesting_artist, 
-                    candidate, 
-                    chatbot_preference
-                )
-                
-                collaborator_matches.append({
-                    "artist": candidate,
-                    "compatibility_score": compatibility_result.get("score", 50),
-                    "insights": compatibility_result.get("insights", []),
-                    "preference_text": chatbot_preference,
-                    "preference_analysis": preference_analysis
-                })
+        for candidate in candidates:
+            compatibility_result = compatibility_results[candidate["artistId"]]
+            
+            collaborator_matches.append({
+                "artist": candidate,
+                "compatibility_score": compatibility_result.get("score", 50),
+                "insights": compatibility_result.get("insights", []),
+                "preference_text": chatbot_preference,
+                "preference_analysis": preference_analysis
+            })
         
         # Sort by compatibility score (highest first)
         collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
         
         return collaborator_matches
+    
+    def _get_recall_matcher(self, recall_engine: str) -> DigitalArtistMatcher:
+        """Get (or create) the rule-based matcher used for the recall stage."""
+        with _RECALL_MATCHERS_LOCK:
+            matcher = _RECALL_MATCHERS.get(recall_engine)
+            if matcher is None:
+                # Every scoring engine reads the same feature index, extracted only once
+                shared_matcher = next(iter(_RECALL_MATCHERS.values()), None)
+                matcher = DigitalArtistMatcher(
+                    scoring_engine=recall_engine,
+                    feature_index=shared_matcher.feature_index if shared_matcher is not None else None
+                )
+                _RECALL_MATCHERS[recall_engine] = matcher
+            return matcher
+    
+    def find_collaborators_two_stage(self, 
+                                     artist_id: str, 
+                                     chatbot_preference: str = None,
+                                     recall_size: int = None,
+                                     recall_engine: str = "python",
+                                     batch_size: int = None) -> Dict[str, Any]:
+        """
+        Find suitable collaborators with a retrieve-then-rerank pipeline.
+        
+        Stage one ranks the whole catalog with the rule-based matcher and keeps the top
+        recall_size candidates. Stage two scores only those candidates with watsonx.ai, so
+        the number of LLM calls no longer grows with the size of the catalog.
+        
+        Args:
+            artist_id: ID of the artist seeking collaborators
+            chatbot_preference: Optional custom chatbot preference text
+            recall_size: Number of candidates passed to watsonx.ai (RECALL_SIZE when None)
+            recall_engine: Scoring engine of the recall stage, "python" or "vectorized"
+            batch_size: Rerank this many candidates per prompt (one prompt per candidate when None)
+            
+        Returns:
+            Dict: Ranked matches, plus the recall settings and per-stage timings in seconds
+        """
+        if recall_size is None:
+            recall_size = self.RECALL_SIZE
+        if recall_size <= 0:
+            raise ValueError("recall_size must be a positive integer")
+        
+        total_start = time.perf_counter()
+        timings = {}
+        
+        # Find the requesting artist
+        requesting_artist = self.repository.get(artist_id)
+        if not requesting_artist:
+            return {"matches": [], "recall_engine": recall_engine, "recall_size": recall_size, "timings": timings}
+        
+        # Use provided chatbot preference or the one from the artist profile
+        if chatbot_preference is None:
+            chatbot_preference = requesting_artist.get("chatbotPreferences", {}).get("preferenceText", "")
+        
+        # Analyze the chatbot preference with watsonx
+        stage_start = time.perf_counter()
+        with timed(PREFERENCE_ANALYSIS):
+            preference_analysis = self.analyze_artist_preference(chatbot_preference)
+        timings["preference_analysis"] = time.perf_counter() - stage_start
+        
+        # Stage 1: cheap rule-based recall over the whole catalog
+        stage_start = time.perf_counter()
+        recall_matcher = self._get_recall_matcher(recall_engine)
+        recalled = recall_matcher.find_collaborators(artist_id, chatbot_preference, top_k=recall_size)
+        timings["recall"] = time.perf_counter() - stage_start
+        
+        # Stage 2: watsonx.ai scores and insights for the recalled candidates only
+        stage_start = time.perf_counter()
+        candidates = [
+            recall_matcher.feature_index.get_artist(recalled_match["artist"]["artistId"])
+            for recalled_match in recalled
+        ]
+        compatibility_results = self._score_candidates(requesting_artist, candidates, chatbot_preference, batch_size)
+        
+        collaborator_matches = []
+        for recalled_match, candidate in zip(recalled, candidates):
+            compatibility_result = compatibility_results[candidate["artistId"]]
+            
+            collaborator_matches.append({
+                "artist": candidate,
+                "compatibility_score": compatibility_result.get("score", 50),
+                "recall_score": recalled_match["compatibility_score"],
+                "insights": compatibility_result.get("insights", []),
+                "preference_text": chatbot_preference,
+                "preference_analysis": preference_analysis
+            })
+        
+        # Sort by compatibility score (highest first)
+        collaborator_matches.sort(key=lambda x: x["compatibility_score"], reverse=True)
+        timings["rerank"] = time.perf_counter() - stage_start
+        timings["total"] = time.perf_counter() - total_start
+        
+        return {
+            "matches": collaborator_matches,
+            "recall_engine": recall_engine,
+            "recall_size": recall_size,
+            "timings": timings
+        }
 
 
 def run_example():
@@ -484,6 +703,9 @@ def run_example():
     # Create the matcher
     matcher = WatsonXArtistMatcherSDK()
     
+    # The demo wants watsonx.ai results, so wait for model selection to finish
+    matcher.model_initializer.wait_until_ready()
+    
     # Select a requesting artist
     artist_id = "ART001"  # Elena Vasquez
     
@@ -506,7 +728,7 @@ def run_example():
     matches = matcher.find_collaborators(artist_id, chatbot_preference)
     
     # Get the requesting artist
-    requesting_artist = next((a for a in matcher.artists if a["artistId"] == artist_id), None)
+    requesting_artist = matcher.repository.get(artist_id)
     
     # Print the requesting artist
     print(f"\nREQUESTING ARTIST: {requesting_artist['basicInfo']['name']}")
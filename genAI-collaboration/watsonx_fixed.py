@@ -2,10 +2,12 @@
 watsonx integration with proper IAM token authentication and supported models
 """
 
-import requests
 import json
-import time
 from config_updated import WATSON_API_KEY, WATSONX_URL, WATSONX_INSTANCE_ID, WATSONX_VERSION, WATSON_PROJECT_ID
+from http_transport import HTTP_TRANSPORT
+from llm_response_cache import LLM_RESPONSE_CACHE
+from iam_token_manager import get_token_manager
+from model_route_table import ModelRouteTable
 
 class WatsonXIntegration:
     """Class to handle watsonx API integration with proper authentication"""
@@ -17,8 +19,10 @@ class WatsonXIntegration:
         self.instance_id = WATSONX_INSTANCE_ID
         self.version = WATSONX_VERSION
         self.project_id = WATSON_PROJECT_ID
-        self.token = None
-        self.token_expiry = 0
+        # Shared, background-refreshed IAM token
+        self.token_manager = get_token_manager(self.api_key)
+        self.llm_cache = LLM_RESPONSE_CACHE
+        self.http = HTTP_TRANSPORT
         
         # List of supported models to try
         self.models = [
@@ -28,36 +32,20 @@ class WatsonXIntegration:
             "bigscience/bloom",
             "meta-llama/llama-2-70b-chat"
         ]
+        
+        # Endpoints to try
+        self.endpoints = [
+            f"{self.watsonx_url}?version={self.version}",
+            f"https://us-south.ml.cloud.ibm.com/ml/v1-beta/generation/text?version={self.version}"
+        ]
+        
+        # Remembered working (model, endpoint) routes; failing ones are re-probed in the background
+        self.route_table = ModelRouteTable()
+        self.route_table.start_reprobe(self._probe_route)
     
     def get_iam_token(self):
         """Get an IAM token from IBM Cloud"""
-        if self.token and time.time() < self.token_expiry:
-            return self.token
-            
-        print("Getting new IAM token...")
-        url = "https://iam.cloud.ibm.com/identity/token"
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json"
-        }
-        data = {
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": self.api_key
-        }
-        
-        response = requests.post(url, headers=headers, data=data)
-        
-        if response.status_code == 200:
-            result = response.json()
-            self.token = result.get("access_token")
-            # Set token expiry to 10 minutes before actual expiry
-            expires_in = result.get("expires_in", 3600)
-            self.token_expiry = time.time() + expires_in - 600
-            return self.token
-        else:
-            print(f"Error getting IAM token: {response.status_code}")
-            print(response.text)
-            return None
+        return self.token_manager.get_token()
     
     def list_available_models(self):
         """List available models in watsonx"""
@@ -80,7 +68,7 @@ class WatsonXIntegration:
         for endpoint in endpoints:
             print(f"Trying to list models from: {endpoint}")
             try:
-                response = requests.get(
+                response = self.http.get(
                     endpoint,
                     headers=headers
                 )
@@ -100,6 +88,23 @@ class WatsonXIntegration:
     
     def generate_text(self, prompt, model_id=None, max_tokens=100):
         """Generate text using watsonx API"""
+        # If no model specified, try all models in the list
+        models_to_try = [model_id] if model_id else self.models
+        
+        parameters = {
+            "decoding_method": "greedy",
+            "max_new_tokens": max_tokens,
+            "min_new_tokens": 10,
+            "stop_sequences": [],
+            "repetition_penalty": 1.0
+        }
+        
+        # Decoding is greedy, so a cached response is reused without calling the API
+        for model in models_to_try:
+            cached_response = self.llm_cache.get(model, parameters, prompt)
+            if cached_response is not None:
+                return cached_response
+        
         token = self.get_iam_token()
         if not token:
             return {"error": "Failed to get IAM token"}
@@ -114,55 +119,70 @@ class WatsonXIntegration:
         if self.instance_id:
             headers["X-IBM-Client-Id"] = self.instance_id
         
-        # If no model specified, try all models in the list
-        models_to_try = [model_id] if model_id else self.models
-        
-        # Endpoints to try
-        endpoints = [
-            f"{self.watsonx_url}?version={self.version}",
-            f"https://us-south.ml.cloud.ibm.com/ml/v1-beta/generation/text?version={self.version}"
-        ]
-        
-        for model in models_to_try:
+        # Known working routes first; routes that failed recently are skipped
+        for model, endpoint in self.route_table.candidates(models_to_try, self.endpoints):
             print(f"\nTrying model: {model}")
             
             payload = {
                 "model_id": model,
                 "input": prompt,
-                "parameters": {
-                    "decoding_method": "greedy",
-                    "max_new_tokens": max_tokens,
-                    "min_new_tokens": 10,
-                    "stop_sequences": [],
-                    "repetition_penalty": 1.0
-                },
+                "parameters": parameters,
                 "project_id": self.project_id
             }
             
-            for endpoint in endpoints:
-                print(f"  Trying endpoint: {endpoint}")
-                try:
-                    response = requests.post(
-                        endpoint,
-                        headers=headers,
-                        json=payload
-                    )
-                    
-                    print(f"  Response status code: {response.status_code}")
+            print(f"  Trying endpoint: {endpoint}")
+            try:
+                response = self.http.post(
+                    endpoint,
+                    headers=headers,
+                    json=payload
+                )
+                
+                print(f"  Response status code: {response.status_code}")
+                
+                if response.status_code == 200:
+                    self.route_table.record_success(model, endpoint)
+                    result = response.json()
+                    self.llm_cache.set(model, parameters, prompt, result)
+                    return result
+                else:
+                    print(f"  Error response: {response.text}")
+                    # Authentication errors are not the route's fault
+                    if response.status_code not in (401, 403):
+                        self.route_table.record_failure(model, endpoint)
+                    # Only continue to next route if this one failed
+                    continue
                     
-                    if response.status_code == 200:
-                        return response.json()
-                    else:
-                        print(f"  Error response: {response.text}")
-                        # Only continue to next endpoint if this one failed
-                        continue
-                        
-                except Exception as e:
-                    print(f"  Exception with endpoint {endpoint}: {e}")
+            except Exception as e:
+                print(f"  Exception with endpoint {endpoint}: {e}")
+                self.route_table.record_failure(model, endpoint)
         
         # If we get here, all models and endpoints failed
         return {"error": "All models and endpoints failed"}
     
+    def _probe_route(self, model_id, endpoint):
+        """Send a minimal generation request over a route, returning whether it works"""
+        token = self.get_iam_token()
+        if not token:
+            return False
+        
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        if self.instance_id:
+            headers["X-IBM-Client-Id"] = self.instance_id
+        
+        payload = {
+            "model_id": model_id,
+            "input": "Hello",
+            "parameters": {"decoding_method": "greedy", "max_new_tokens": 1},
+            "project_id": self.project_id
+        }
+        response = self.http.post(endpoint, headers=headers, json=payload)
+        return response.status_code == 200
+    
     def analyze_artist_preference(self, preference_text):
         """Analyze artist preference using watsonx"""
         prompt = f"""
@@ -2,10 +2,11 @@
 watsonx integration with proper IAM token authentication
 """
 
-import requests
 import json
-import time
 from config_updated import WATSON_API_KEY, WATSONX_URL, WATSONX_INSTANCE_ID, WATSONX_VERSION, WATSON_PROJECT_ID
+from http_transport import HTTP_TRANSPORT
+from llm_response_cache import LLM_RESPONSE_CACHE
+from iam_token_manager import get_token_manager
 
 class WatsonXIntegration:
     """Class to handle watsonx API integration with proper authentication"""
@@ -17,41 +18,30 @@ class WatsonXIntegration:
         self.instance_id = WATSONX_INSTANCE_ID
         self.version = WATSONX_VERSION
         self.project_id = WATSON_PROJECT_ID
-        self.token = None
-        self.token_expiry = 0
+        # Shared, background-refreshed IAM token
+        self.token_manager = get_token_manager(self.api_key)
+        self.llm_cache = LLM_RESPONSE_CACHE
+        self.http = HTTP_TRANSPORT
     
     def get_iam_token(self):
         """Get an IAM token from IBM Cloud"""
-        if self.token and time.time() < self.token_expiry:
-            return self.token
-            
-        print("Getting new IAM token...")
-        url = "https://iam.cloud.ibm.com/identity/token"
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Accept": "application/json"
-        }
-        data = {
-            "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-            "apikey": self.api_key
-        }
-        
-        response = requests.post(url, headers=headers, data=data)
-        
-        if response.status_code == 200:
-            result = response.json()
-            self.token = result.get("access_token")
-            # Set token expiry to 10 minutes before actual expiry
-            expires_in = result.get("expires_in", 3600)
-            self.token_expiry = time.time() + expires_in - 600
-            return self.token
-        else:
-            print(f"Error getting IAM token: {response.status_code}")
-            print(response.text)
-            return None
+        return self.token_manager.get_token()
     
     def generate_text(self, prompt, model_id="ibm/granite-13b-instruct-v2", max_tokens=100):
         """Generate text using watsonx API"""
+        parameters = {
+            "decoding_method": "greedy",
+            "max_new_tokens": max_tokens,
+            "min_new_tokens": 10,
+            "stop_sequences": [],
+            "repetition_penalty": 1.0
+        }
+        
+        # Decoding is greedy, so a cached response is reused without calling the API
+        cached_response = self.llm_cache.get(model_id, parameters, prompt)
+        if cached_response is not None:
+            return cached_response
+        
         token = self.get_iam_token()
         if not token:
             return {"error": "Failed to get IAM token"}
@@ -69,13 +59,7 @@ class WatsonXIntegration:
         payload = {
             "model_id": model_id,
             "input": prompt,
-            "parameters": {
-                "decoding_method": "greedy",
-                "max_new_tokens": max_tokens,
-                "min_new_tokens": 10,
-                "stop_sequences": [],
-                "repetition_penalty": 1.0
-            },
+            "parameters": parameters,
             "project_id": self.project_id
         }
         
@@ -88,7 +72,7 @@ class WatsonXIntegration:
         for endpoint in endpoints:
             print(f"Trying endpoint: {endpoint}")
             try:
-                response = requests.post(
+                response = self.http.post(
                     endpoint,
                     headers=headers,
                     json=payload
@@ -97,7 +81,9 @@ class WatsonXIntegration:
                 print(f"Response status code: {response.status_code}")
                 
                 if response.status_code == 200:
-                    return response.json()
+                    result = response.json()
+                    self.llm_cache.set(model_id, parameters, prompt, result)
+                    return result
                 else:
                     print(f"Error response: {response.text}")
                     # Only continue to next endpoint if this one failed